@@ -0,0 +1,309 @@
+"""
+Async Yahoo client
+Optional asyncio-native fetch path for the high-volume datasets (chart
+history, quoteSummary for `.info`, fundamentals timeseries). Uses one pooled,
+keep-alive, HTTP/2-capable httpx client per event loop, so a worker can await
+thousands of fetches without holding an OS thread for each round trip.
+
+Enabled with `async_http_client` (env ASYNC_HTTP_CLIENT=true). `yahoo_base_url`
+and `yahoo_cookie_url` can point at a local mock server in tests.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Annotated, Any, Dict, List, Optional
+
+import pandas as pd
+
+from .config import get_settings
+from .vendor_gateway import get_gateway
+
+INFO_MODULES = ["financialData", "quoteType", "defaultKeyStatistics", "assetProfile", "summaryDetail"]
+
+# Statement name -> yfinance fundamentals_keys group and timeseries key prefix
+STATEMENTS = {
+    "balance_sheet": "balance-sheet",
+    "income_stmt": "financials",
+    "cashflow": "cash-flow",
+}
+FREQUENCY_PREFIX = {"annual": "annual", "quarterly": "quarterly"}
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+
+class AsyncYahooError(Exception):
+    """Raised on throttling or server errors from Yahoo (retried by the gateway)."""
+
+
+def enabled() -> bool:
+    """True when the async path is switched on and stock data is routed to Yahoo Finance."""
+    settings = get_settings()
+    return (
+        settings.async_http_client
+        and settings.vendors.stock_data == "yfinance"
+    )
+
+
+class AsyncYahooClient:
+    """Pooled async client for the Yahoo Finance JSON endpoints."""
+
+    def __init__(self, base_url: str, cookie_url: Optional[str], max_connections: int, timeout: float):
+        try:
+            import httpx
+        except ImportError as e:
+            raise RuntimeError(
+                "The async HTTP client requires httpx (pip install 'httpx[http2]')"
+            ) from e
+
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+
+        self.base_url = base_url.rstrip("/")
+        self.cookie_url = cookie_url
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=timeout,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._crumb: Optional[str] = None
+        self._crumb_lock = asyncio.Lock()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _get_json(self, path: str, params: Dict[str, Any]) -> dict:
+        response = await self._client.get(self.base_url + path, params=params)
+        if response.status_code == 401:
+            # Crumb expired; fetch a new one on the retry
+            self._crumb = None
+        if response.status_code in (401, 429) or response.status_code >= 500:
+            # Throttling / auth expiry / server errors are retried by the gateway
+            raise AsyncYahooError(f"Yahoo returned HTTP {response.status_code} for {path}")
+        if response.status_code == 404:
+            # Unknown symbol: Yahoo sends an error payload, treated as no data
+            return {}
+        response.raise_for_status()
+        return response.json()
+
+    async def _ensure_crumb(self) -> Optional[str]:
+        """quoteSummary needs a session cookie plus crumb; fetched once per client."""
+        if self._crumb is not None or not self.cookie_url:
+            return self._crumb
+        async with self._crumb_lock:
+            if self._crumb is None:
+                await self._client.get(self.cookie_url)
+                response = await self._client.get(self.base_url + "/v1/test/getcrumb")
+                response.raise_for_status()
+                self._crumb = response.text.strip()
+        return self._crumb
+
+    async def fetch_chart(self, symbol: str, start_date: str, end_date: str) -> dict:
+        period1 = int(datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+        period2 = int(datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+        payload = await self._get_json(
+            f"/v8/finance/chart/{symbol}",
+            {
+                "period1": period1,
+                "period2": period2,
+                "interval": "1d",
+                "events": "div,splits",
+                "includeAdjustedClose": "true",
+            },
+        )
+        chart = payload.get("chart") or {}
+        return (chart.get("result") or [{}])[0]
+
+    async def fetch_quote_summary(self, symbol: str, modules: List[str]) -> dict:
+        params = {"modules": ",".join(modules), "formatted": "false", "symbol": symbol}
+        crumb = await self._ensure_crumb()
+        if crumb:
+            params["crumb"] = crumb
+        payload = await self._get_json(f"/v10/finance/quoteSummary/{symbol}", params)
+        summary = payload.get("quoteSummary") or {}
+        return (summary.get("result") or [{}])[0]
+
+    async def fetch_timeseries(self, symbol: str, types: List[str]) -> list:
+        start = int(datetime(2016, 12, 31, tzinfo=timezone.utc).timestamp())
+        end = int(pd.Timestamp.utcnow().ceil("D").timestamp())
+        payload = await self._get_json(
+            f"/ws/fundamentals-timeseries/v1/finance/timeseries/{symbol}",
+            {"symbol": symbol, "type": ",".join(types), "period1": start, "period2": end},
+        )
+        return payload.get("timeseries", {}).get("result") or []
+
+
+_clients: Dict[Any, AsyncYahooClient] = {}
+
+
+def get_client() -> AsyncYahooClient:
+    """Get the pooled client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        settings = get_settings()
+        client = _clients[loop] = AsyncYahooClient(
+            base_url=settings.yahoo_base_url,
+            cookie_url=settings.yahoo_cookie_url,
+            max_connections=settings.async_http_max_connections,
+            timeout=settings.async_http_timeout,
+        )
+    return client
+
+
+async def close_clients() -> None:
+    """Close the client bound to the running loop (called on shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def chart_to_frame(result: dict) -> pd.DataFrame:
+    """
+    Convert a chart result into a frame shaped like `Ticker.history()`:
+    auto-adjusted OHLC, Volume, Dividends and Stock Splits indexed by Date.
+    """
+    timestamps = result.get("timestamp") or []
+    if not timestamps:
+        return pd.DataFrame()
+    quote = result["indicators"]["quote"][0]
+    data = pd.DataFrame(
+        {col.capitalize(): quote.get(col) for col in ("open", "high", "low", "close", "volume")},
+        index=pd.DatetimeIndex(pd.to_datetime(timestamps, unit="s").normalize(), name="Date"),
+        dtype="float64",
+    )
+    adjclose = (result["indicators"].get("adjclose") or [{}])[0].get("adjclose")
+    if adjclose is not None:
+        ratio = pd.Series(adjclose, index=data.index, dtype="float64") / data["Close"]
+        for col in ("Open", "High", "Low", "Close"):
+            data[col] = data[col] * ratio
+
+    events = result.get("events") or {}
+    data["Dividends"] = 0.0
+    for event in (events.get("dividends") or {}).values():
+        day = pd.to_datetime(event["date"], unit="s").normalize()
+        if day in data.index:
+            data.loc[day, "Dividends"] = event["amount"]
+    data["Stock Splits"] = 0.0
+    for event in (events.get("splits") or {}).values():
+        day = pd.to_datetime(event["date"], unit="s").normalize()
+        if day in data.index and event.get("denominator"):
+            data.loc[day, "Stock Splits"] = event["numerator"] / event["denominator"]
+
+    data = data.dropna(subset=["Close"])
+    data["Volume"] = data["Volume"].fillna(0).astype("int64")
+    return data
+
+
+def _flatten_quote_summary(result: dict) -> dict:
+    """Flatten quoteSummary modules into one dict like `Ticker.info`."""
+    def _format(value):
+        if isinstance(value, dict) and "raw" in value:
+            return value["raw"]
+        if isinstance(value, list):
+            return [_format(x) for x in value]
+        if isinstance(value, dict):
+            return {k: _format(v) for k, v in value.items()}
+        if isinstance(value, str):
+            return value.replace("\xa0", " ")
+        return value
+
+    info = {}
+    for module in result.values():
+        if isinstance(module, dict):
+            for key, value in module.items():
+                if value is not None:
+                    info[key] = _format(value)
+    return info
+
+
+def timeseries_to_frame(results: list, prefix: str, keys: List[str]) -> pd.DataFrame:
+    """Reshape timeseries results into line items x period dates, newest first."""
+    rows: Dict[str, Dict[pd.Timestamp, float]] = {}
+    for item in results:
+        for name, points in item.items():
+            if name in ("meta", "timestamp") or not points:
+                continue
+            rows[name[len(prefix):]] = {
+                pd.Timestamp(point["asOfDate"]): point["reportedValue"]["raw"]
+                for point in points
+                if point and point.get("reportedValue")
+            }
+    if not rows:
+        return pd.DataFrame()
+    data = pd.DataFrame.from_dict(rows, orient="index", dtype="float64")
+    data = data.reindex([k for k in keys if k in data.index])
+    return data[sorted(data.columns, reverse=True)]
+
+
+async def get_history(
+    symbol: Annotated[str, "ticker symbol"],
+    start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
+    end_date: Annotated[str, "End date in yyyy-mm-dd format"],
+) -> pd.DataFrame:
+    """Async equivalent of `Ticker.history(start, end)` through the gateway."""
+    symbol = symbol.upper()
+    result = await get_gateway().acall(
+        (symbol, "chart", start_date, end_date),
+        get_client().fetch_chart, symbol, start_date, end_date,
+    )
+    return chart_to_frame(result)
+
+
+async def get_info(symbol: Annotated[str, "ticker symbol"]) -> dict:
+    """Async equivalent of `Ticker.info` through the gateway."""
+    symbol = symbol.upper()
+    result = await get_gateway().acall(
+        (symbol, "info"), get_client().fetch_quote_summary, symbol, INFO_MODULES
+    )
+    return _flatten_quote_summary(result)
+
+
+async def get_statement(
+    symbol: Annotated[str, "ticker symbol"],
+    statement: Annotated[str, "balance_sheet, income_stmt or cashflow"],
+    frequency: Annotated[str, "annual or quarterly"],
+) -> pd.DataFrame:
+    """Async equivalent of `Ticker.[quarterly_]balance_sheet` etc. through the gateway."""
+    from yfinance.const import fundamentals_keys
+
+    symbol = symbol.upper()
+    prefix = FREQUENCY_PREFIX[frequency.lower()]
+    keys = fundamentals_keys[STATEMENTS[statement]]
+    results = await get_gateway().acall(
+        (symbol, statement, prefix),
+        get_client().fetch_timeseries, symbol, [prefix + k for k in keys],
+    )
+    return timeseries_to_frame(results, prefix, keys)
+
+
+async def get_YFin_data_async(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
+    end_date: Annotated[str, "End date in yyyy-mm-dd format"],
+) -> str:
+    """Stock data from the async Yahoo client, in the same CSV string format as `y_finance.get_YFin_data`."""
+    datetime.strptime(start_date, "%Y-%m-%d")
+    datetime.strptime(end_date, "%Y-%m-%d")
+
+    data = await get_history(symbol, start_date, end_date)
+    if data.empty:
+        return (
+            f"No data found for symbol '{symbol}' between {start_date} and {end_date}"
+        )
+
+    for col in ["Open", "High", "Low", "Close"]:
+        data[col] = data[col].round(2)
+
+    header = f"# Stock data for {symbol.upper()} from {start_date} to {end_date}\n"
+    header += f"# Total records: {len(data)}\n"
+    header += f"# Data retrieved on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    return header + data.to_csv()
@@ -0,0 +1,149 @@
+"""
+Background cache refresh
+Every `cache_refresh_interval` seconds, brings each symbol in the shared cache
+index up to date: new price sessions, corporate actions and financial
+statements past their TTL. With several workers only the leader runs it: the
+worker holding the `leader` file lock, which the OS releases if it exits, so
+another worker takes over on its next attempt.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .config import get_settings
+from .shared_cache import acquire, get_index, lock_path, release
+
+LEADER_LOCK = "leader"
+
+
+class CacheRefresher:
+    """Leader election and the refresh loop of one worker."""
+
+    def __init__(self):
+        self._leader_fd: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_refresh: Optional[float] = None
+        self.last_duration_s: Optional[float] = None
+        self.refreshed = 0
+        self.errors = 0
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader_fd is not None
+
+    def try_lead(self) -> bool:
+        """Become the leader if no other worker is (the lock file records the leader's pid)."""
+        if self._leader_fd is None:
+            fd = acquire(LEADER_LOCK, blocking=False)
+            if fd is not None:
+                os.ftruncate(fd, 0)
+                os.write(fd, str(os.getpid()).encode())
+                self._leader_fd = fd
+                print(f"Worker {os.getpid()} is the cache refresh leader")
+        return self.is_leader
+
+    def refresh_symbol(self, symbol: str, datasets: Dict[str, float]) -> None:
+        """
+        Refresh the cached datasets of one symbol (each skips work within its
+        TTL), stopping between datasets once `stop` has been called.
+        """
+        from . import corporate_actions, fundamentals_store, price_store
+
+        loads = []
+        if "prices" in datasets:
+            loads.append((price_store.load_raw_history, symbol))
+        if corporate_actions.ACTIONS_DATASET in datasets:
+            loads.append((corporate_actions.load_actions, symbol))
+        for frequency in fundamentals_store.YF_FREQUENCY:
+            if f"fundamentals-{frequency}" in datasets:
+                loads.append((fundamentals_store.load_statements, symbol, frequency))
+        for load, *args in loads:
+            if self._stop.is_set():
+                return
+            load(*args)
+
+    def refresh_all(self) -> None:
+        started = time.perf_counter()
+        for symbol, datasets in sorted(get_index().symbols().items()):
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh_symbol(symbol, datasets)
+                self.refreshed += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Background refresh failed for {symbol}: {e}")
+        self.last_refresh = time.time()
+        self.last_duration_s = round(time.perf_counter() - started, 3)
+
+    def _resign(self) -> None:
+        if self._leader_fd is not None:
+            release(self._leader_fd)
+            self._leader_fd = None
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                interval = get_settings().cache_refresh_interval
+                if self.try_lead():
+                    self.refresh_all()
+                # Followers retry the election sooner, so a dead leader is replaced quickly
+                self._stop.wait(interval if self.is_leader else min(interval, 30.0))
+        finally:
+            # Only once no refresh is running, so a new leader never overlaps it
+            self._resign()
+
+    def start(self) -> None:
+        """Start the refresh loop in a daemon thread (no-op when the interval is 0)."""
+        if get_settings().cache_refresh_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cache-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the loop. The loop gives up leadership when it exits; a refresh
+        still inside an upstream call after the join timeout keeps it until then.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            if self._thread.is_alive():
+                print("Cache refresh still finishing; leadership is released when it exits")
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            with open(lock_path(LEADER_LOCK)) as f:
+                leader_pid = int(f.read() or 0) or None
+            if leader_pid is not None:
+                os.kill(leader_pid, 0)  # still running?
+        except (OSError, ValueError):
+            leader_pid = None
+        return {
+            "enabled": self._thread is not None,
+            "interval_s": get_settings().cache_refresh_interval,
+            "pid": os.getpid(),
+            "leader": self.is_leader,
+            "leader_pid": leader_pid,
+            "last_refresh": self.last_refresh,
+            "last_duration_s": self.last_duration_s,
+            "symbols_refreshed": self.refreshed,
+            "errors": self.errors,
+            "index": get_index().stats(),
+        }
+
+
+_refresher: Optional[CacheRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def get_refresher() -> CacheRefresher:
+    """Get this worker's cache refresher."""
+    global _refresher
+    if _refresher is None:
+        with _refresher_lock:
+            if _refresher is None:
+                _refresher = CacheRefresher()
+    return _refresher
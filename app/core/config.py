@@ -1,26 +1,201 @@
-from typing import Dict, Optional
+"""
+Configuration
+`DEFAULT_CONFIG` (environment overrides applied) merged with the values
+passed to `set_config`. Service code reads the typed, immutable `Settings`
+from `get_settings()`: built once per change, plain attribute access, no
+copying. `get_config()` still returns a dict copy of the full configuration.
+"""
+import importlib
+import threading
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
 from . import default_config
 
+LOCAL = "local"
+
+# Tool -> (VendorRoutes field, data_vendors category); tool_vendors entries
+# take precedence over the category
+TOOL_ROUTES = {
+    "get_stock_data": ("stock_data", "core_stock_apis"),
+    "get_dividends": ("dividends", "core_stock_apis"),
+    "get_indicators": ("indicators", "technical_indicators"),
+    "get_fundamentals": ("fundamentals", "fundamental_data"),
+    "get_news": ("news", "news_data"),
+    "get_quote": ("quotes", "core_stock_apis"),
+}
+
+# Tools the local files can answer exactly (a file covering the requested range)
+LOCAL_FIRST_TOOLS = ("get_stock_data",)
+
+
+@dataclass(frozen=True, slots=True)
+class VendorRoutes:
+    """Vendor serving each tool, resolved from tool_vendors and data_vendors."""
+
+    stock_data: str
+    dividends: str
+    indicators: str
+    fundamentals: str
+    news: str
+    quotes: str
+
+    @classmethod
+    def resolve(cls, data_vendors: Mapping[str, str], tool_vendors: Mapping[str, str]) -> "VendorRoutes":
+        return cls(**{
+            name: tool_vendors.get(tool) or data_vendors[category]
+            for tool, (name, category) in TOOL_ROUTES.items()
+        })
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Typed snapshot of the service configuration (see default_config for each key)."""
+
+    data_dir: str
+    data_cache_dir: str
+    results_dir: str
+    cache_refresh_interval: float
+    # Price store
+    shared_price_store: bool
+    shared_memory_dir: str
+    corporate_actions_ttl: int
+    fundamentals_ttl: int
+    # Memory budget and indicator cache
+    memory_budget_mb: float
+    request_memory_limit_mb: float
+    memory_admission: str
+    memory_queue_timeout: float
+    memory_float32_rtol: float
+    indicator_cache_size: int
+    indicator_error_ttl: float
+    # Response cache
+    response_cache_enabled: bool
+    response_cache_max_bytes: int
+    response_cache_immutable_ttl: int
+    response_cache_intraday_ttl: int
+    response_cache_default_ttl: int
+    # Vendor gateway
+    web_concurrency: int
+    vendor_rate_limit_per_sec: float
+    vendor_rate_limit_burst: int
+    vendor_max_concurrency: int
+    vendor_max_retries: int
+    vendor_backoff_base: float
+    vendor_backoff_max: float
+    vendor_circuit_failure_threshold: int
+    vendor_circuit_reset_seconds: float
+    vendor_fallback_cache_size: int
+    # Vendor routing
+    vendor_local_first: bool
+    vendor_latency_alpha: float
+    vendor_error_penalty: float
+    vendor_demote_ratio: float
+    vendor_min_samples: int
+    vendor_recheck_seconds: float
+    stub_vendor_latency_ms: float
+    stub_vendor_error_rate: float
+    # Async HTTP client
+    async_http_client: bool
+    async_http_max_connections: int
+    async_http_timeout: float
+    yahoo_base_url: str
+    yahoo_cookie_url: str
+    # Universe summary
+    universe_max_workers: int
+    universe_max_symbols: int
+    analyst_cache_ttl: float
+    company_cache_ttl: float
+    company_cache_size: int
+    # Live streaming
+    stream_poll_interval: float
+    stream_max_symbols: int
+    stream_queue_size: int
+    stream_heartbeat_seconds: float
+    # Request profiling
+    debug_profile_enabled: bool
+    debug_profile_token: str
+    debug_profile_sample_rate: float
+    debug_profile_dump_ms: float
+    debug_profile_max_dumps: int
+    debug_profile_dir: str
+    preload_imports: bool
+    # Vendor per tool, and the full chain each tool tries in order
+    vendors: VendorRoutes
+    vendor_chains: Mapping[str, Tuple[str, ...]]
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "Settings":
+        """Build from a config mapping, coercing each value to its field's type."""
+        values = {}
+        for field in fields(cls):
+            if field.name in ("vendors", "vendor_chains"):
+                continue
+            values[field.name] = _coerce(field.name, config[field.name], field.type)
+        vendors = VendorRoutes.resolve(config["data_vendors"], config.get("tool_vendors") or {})
+        fallbacks = config.get("vendor_fallbacks") or {}
+        chains = {}
+        for tool, (name, _) in TOOL_ROUTES.items():
+            chain = [LOCAL] if values["vendor_local_first"] and tool in LOCAL_FIRST_TOOLS else []
+            chain += [getattr(vendors, name), *fallbacks.get(tool, ())]
+            chains[tool] = tuple(dict.fromkeys(chain))  # drop repeats, keep order
+        return cls(**values, vendors=vendors, vendor_chains=MappingProxyType(chains))
+
+
+def _coerce(name: str, value: Any, kind: type) -> Any:
+    if kind is bool and isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for setting {name!r}: {value!r} (expected {kind.__name__})")
+
+
 # Use default config but allow it to be overridden
 _config: Optional[Dict] = None
+_overrides: Dict = {}
+_settings: Optional[Settings] = None
+_lock = threading.Lock()
 DATA_DIR: Optional[str] = None
 
 
+def _apply(config: Dict) -> None:
+    """Swap in a new configuration (validated by building its Settings first)."""
+    global _config, _settings, DATA_DIR
+    settings = Settings.from_config(config)
+    _config, _settings = config, settings
+    DATA_DIR = config["data_dir"]
+
+
 def initialize_config():
     """Initialize the configuration with default values."""
-    global _config, DATA_DIR
-    if _config is None:
-        _config = default_config.DEFAULT_CONFIG.copy()
-        DATA_DIR = _config["data_dir"]
+    with _lock:
+        if _config is None:
+            _apply(default_config.DEFAULT_CONFIG.copy())
 
 
 def set_config(config: Dict):
     """Update the configuration with custom values."""
-    global _config, DATA_DIR
-    if _config is None:
-        _config = default_config.DEFAULT_CONFIG.copy()
-    _config.update(config)
-    DATA_DIR = _config["data_dir"]
+    with _lock:
+        merged = dict(_config if _config is not None else default_config.DEFAULT_CONFIG)
+        merged.update(config)
+        _apply(merged)
+        _overrides.update(config)
+
+
+def reload_config() -> Settings:
+    """
+    Re-read the environment overrides of the defaults and re-apply the values
+    passed to `set_config`. Components already built from the settings (vendor
+    gateway, memory budget, response cache) keep the values they started with.
+    """
+    with _lock:
+        importlib.reload(default_config)
+        merged = default_config.DEFAULT_CONFIG.copy()
+        merged.update(_overrides)
+        _apply(merged)
+        return _settings
 
 
 def get_config() -> Dict:
@@ -30,5 +205,12 @@ def get_config() -> Dict:
     return _config.copy()
 
 
+def get_settings() -> Settings:
+    """Get the current typed settings (shared and immutable; not copied)."""
+    if _settings is None:
+        initialize_config()
+    return _settings
+
+
 # Initialize with default config
 initialize_config()
@@ -0,0 +1,294 @@
+"""
+Corporate actions
+Per-symbol table of dividends and stock splits, persisted next to the price
+cache and refreshed on a TTL. Refreshes only fetch the actions since the last
+one, and the file is rewritten only when something changed. Adjustment
+factors are derived from it at read time, so a new split or dividend only
+rewrites this small table while the cached raw price bars stay valid.
+"""
+import os
+import threading
+import time
+from typing import Annotated, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import get_settings
+from .profiling import CACHE_READ, stage
+from .shared_cache import atomic_write, file_lock, get_index
+from .vendor_gateway import VendorUnavailableError, get_ticker
+
+ACTION_COLUMNS = ("Dividends", "Stock Splits")
+# Dataset name in the shared cache index
+ACTIONS_DATASET = "actions"
+
+# Adjustment modes for price reads
+ADJUST_ALL = "all"        # splits and dividends (same as yfinance auto_adjust=True)
+ADJUST_SPLITS = "splits"  # splits only (Yahoo's "Close")
+ADJUST_NONE = "none"      # prices as traded
+ADJUSTMENTS = (ADJUST_ALL, ADJUST_SPLITS, ADJUST_NONE)
+
+# path -> (mtime_ns, frame)
+_tables: Dict[str, Tuple[int, pd.DataFrame]] = {}
+# symbol -> time before which a failed fetch is not retried (no table on disk)
+_retry_after: Dict[str, float] = {}
+# symbol -> time of the last refresh that found nothing new (the file is not rewritten)
+_checked_at: Dict[str, float] = {}
+
+# Days before the last refresh that an incremental refresh fetches again, so
+# actions that Yahoo publishes late or corrects are picked up
+REFRESH_OVERLAP_DAYS = 10
+_lock = threading.Lock()
+
+
+def actions_file_path(symbol: Annotated[str, "ticker symbol"]) -> str:
+    """Path of the persisted actions table for a symbol."""
+    return os.path.join(get_settings().data_cache_dir, f"{symbol.upper()}-actions.csv")
+
+
+def empty_actions() -> pd.DataFrame:
+    return pd.DataFrame(
+        {col: pd.Series(dtype="float64") for col in ACTION_COLUMNS},
+        index=pd.DatetimeIndex([], name="Date"),
+    )
+
+
+def _read(path: str, mtime_ns: int) -> pd.DataFrame:
+    with _lock:
+        cached = _tables.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+    with stage(CACHE_READ):
+        actions = pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+        actions = actions.reindex(columns=list(ACTION_COLUMNS), fill_value=0.0).fillna(0.0)
+    with _lock:
+        _tables[path] = (mtime_ns, actions)
+    return actions
+
+
+def _normalize(actions: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Keep dividend/split rows only, indexed by tz-naive trading date."""
+    if actions is None or actions.empty:
+        return empty_actions()
+    actions = actions.reindex(columns=list(ACTION_COLUMNS), fill_value=0.0).fillna(0.0)
+    actions = actions[(actions["Dividends"] != 0) | (actions["Stock Splits"] != 0)]
+    if actions.index.tz is not None:
+        actions.index = actions.index.tz_localize(None)
+    actions.index = actions.index.normalize().rename("Date")
+    return actions.sort_index()
+
+
+def _write(symbol: str, actions: pd.DataFrame) -> None:
+    with atomic_write(actions_file_path(symbol)) as tmp_path:
+        actions.to_csv(tmp_path)
+    get_index().record(symbol, ACTIONS_DATASET)
+
+
+def fetch_actions(symbol: Annotated[str, "ticker symbol"]) -> pd.DataFrame:
+    """Fetch the full dividend/split history through the gateway and persist it."""
+    actions = _normalize(get_ticker(symbol).actions)
+    _write(symbol, actions)
+    return actions
+
+
+def refresh_actions(
+    symbol: Annotated[str, "ticker symbol"],
+    current: Annotated[Optional[pd.DataFrame], "persisted table, None if there is none"],
+    last_refresh: Annotated[float, "epoch seconds of the last refresh"] = 0.0,
+) -> pd.DataFrame:
+    """
+    Bring the table up to date. Only the actions since the last refresh are
+    fetched, except after a new split: Yahoo restates every earlier dividend
+    in post-split units, so the full history is fetched again.
+    """
+    if current is None:
+        return fetch_actions(symbol)
+
+    since = pd.Timestamp(last_refresh, unit="s").normalize() - pd.Timedelta(days=REFRESH_OVERLAP_DAYS)
+    recent = _normalize(
+        get_ticker(symbol).history(start=since.strftime("%Y-%m-%d"), actions=True, auto_adjust=False)
+    )
+    known_splits = current.index[current["Stock Splits"] > 0]
+    if recent.index[recent["Stock Splits"] > 0].difference(known_splits).size:
+        return fetch_actions(symbol)
+
+    merged = recent.combine_first(current)[list(ACTION_COLUMNS)]
+    if merged.equals(current):
+        # Unchanged: keep the file (and its version) as is; the index tells
+        # the other workers it was checked
+        _checked_at[symbol] = time.time()
+        get_index().record(symbol, ACTIONS_DATASET, _checked_at[symbol])
+        return current
+    _write(symbol, merged)
+    return merged
+
+
+def load_actions(
+    symbol: Annotated[str, "ticker symbol"],
+    max_age: Annotated[Optional[float], "seconds before the table is refetched, None for the configured TTL"] = None,
+) -> pd.DataFrame:
+    """
+    Get the actions table for a symbol, refetching it when older than
+    `max_age`. If the vendor is unavailable the persisted table is used as is.
+    Workers sharing the cache refresh a symbol one at a time.
+    """
+    symbol = symbol.upper()
+    if max_age is None:
+        max_age = get_settings().corporate_actions_ttl
+    path = actions_file_path(symbol)
+
+    def current() -> Tuple[Optional[os.stat_result], float, bool]:
+        """(stat or None, time of the last refresh, whether it is within max_age)"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None, 0.0, False
+        last_refresh = max(st.st_mtime, _checked_at.get(symbol, 0.0))
+        if time.time() - last_refresh >= max_age:
+            # Maybe checked (unchanged) by another worker
+            last_refresh = max(last_refresh, get_index().refreshed_at(symbol, ACTIONS_DATASET))
+        return st, last_refresh, time.time() - last_refresh < max_age
+
+    st, last_refresh, fresh = current()
+    if fresh:
+        return _read(path, st.st_mtime_ns)
+    if st is None and _retry_after.get(symbol, 0) > time.time():
+        return empty_actions()
+    with file_lock(f"actions-{symbol}"):
+        # Another worker may have refreshed it while this one waited
+        st, last_refresh, fresh = current()
+        if fresh:
+            return _read(path, st.st_mtime_ns)
+        return _refresh(symbol, path, st, last_refresh)
+
+
+def _refresh(symbol: str, path: str, st: Optional[os.stat_result], last_refresh: float) -> pd.DataFrame:
+    try:
+        if st is None:
+            return fetch_actions(symbol)
+        return refresh_actions(symbol, _read(path, st.st_mtime_ns), last_refresh)
+    except VendorUnavailableError:
+        if st is None:
+            print(f"No corporate actions available for {symbol}; prices are left unadjusted")
+            _retry_after[symbol] = time.time() + get_settings().vendor_circuit_reset_seconds
+            return empty_actions()
+        print(f"Upstream unavailable, using stale corporate actions for {symbol}")
+        return _read(path, st.st_mtime_ns)
+
+
+def read_actions(symbol: Annotated[str, "ticker symbol"]) -> Optional[pd.DataFrame]:
+    """The persisted table as is (no refresh), or None if there is none."""
+    path = actions_file_path(symbol)
+    try:
+        return _read(path, os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+
+def get_dividends(
+    symbol: Annotated[str, "ticker symbol"],
+    start_date: Annotated[Optional[str], "First date in yyyy-mm-dd format (inclusive)"] = None,
+    end_date: Annotated[Optional[str], "Last date in yyyy-mm-dd format (inclusive)"] = None,
+) -> pd.Series:
+    """Dividends per share by ex-date, from the persisted table (refreshed on the TTL)."""
+    actions = load_actions(symbol)
+    return actions.loc[actions["Dividends"] > 0, "Dividends"].loc[start_date:end_date]
+
+
+def get_splits(
+    symbol: Annotated[str, "ticker symbol"],
+    start_date: Annotated[Optional[str], "First date in yyyy-mm-dd format (inclusive)"] = None,
+    end_date: Annotated[Optional[str], "Last date in yyyy-mm-dd format (inclusive)"] = None,
+    refresh: Annotated[bool, "refresh the table on the TTL (False: persisted table only)"] = True,
+) -> pd.Series:
+    """Split ratios (new shares per old share) by date."""
+    actions = load_actions(symbol) if refresh else read_actions(symbol)
+    if actions is None:
+        return empty_actions()["Stock Splits"]
+    return actions.loc[actions["Stock Splits"] > 0, "Stock Splits"].loc[start_date:end_date]
+
+
+def actions_version(symbol: Annotated[str, "ticker symbol"]) -> Optional[int]:
+    """mtime of the persisted table (changes whenever the actions change)."""
+    try:
+        return os.stat(actions_file_path(symbol)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _suffix_products(values: np.ndarray) -> np.ndarray:
+    """out[i] = prod(values[i:]), with out[len(values)] = 1."""
+    out = np.ones(len(values) + 1)
+    if len(values):
+        out[:-1] = np.cumprod(values[::-1])[::-1]
+    return out
+
+
+def split_factors(dates: np.ndarray, actions: pd.DataFrame) -> np.ndarray:
+    """
+    Cumulative split ratio after each bar date: raw price = split-adjusted
+    price * factor, split-adjusted volume = raw volume * factor.
+    """
+    splits = actions[actions["Stock Splits"] > 0]["Stock Splits"]
+    ratios = _suffix_products(splits.to_numpy(dtype="float64"))
+    index = np.searchsorted(splits.index.to_numpy(dtype="datetime64[ns]"), dates, side="right")
+    return ratios[index]
+
+
+def dividend_factors(dates: np.ndarray, split_adjusted_close: np.ndarray, actions: pd.DataFrame) -> np.ndarray:
+    """
+    Cumulative dividend adjustment after each bar date, using Yahoo's method:
+    each ex-dividend date scales earlier bars by 1 - dividend / previous close.
+    Dividends are split-adjusted amounts, as returned by Yahoo.
+    """
+    dividends = actions[actions["Dividends"] > 0]["Dividends"]
+    ex_dates = dividends.index.to_numpy(dtype="datetime64[ns]")
+    previous = np.searchsorted(dates, ex_dates, side="left") - 1
+    factors = np.ones(len(ex_dates))
+    valid = previous >= 0
+    if valid.any():
+        factors[valid] = 1 - dividends.to_numpy(dtype="float64")[valid] / split_adjusted_close[previous[valid]]
+    # Ignore amounts that would zero or flip prices (bad data)
+    factors[(factors <= 0) | ~np.isfinite(factors)] = 1.0
+    cumulative = _suffix_products(factors)
+    return cumulative[np.searchsorted(ex_dates, dates, side="right")]
+
+
+def adjust_prices(
+    data: Annotated[pd.DataFrame, "raw bars with Date, Open, High, Low, Close and Volume"],
+    actions: Annotated[pd.DataFrame, "actions table"],
+    adjustment: Annotated[str, "all, splits or none"] = ADJUST_ALL,
+) -> pd.DataFrame:
+    """Apply split/dividend adjustment to raw bars (in place) and return them."""
+    if adjustment not in ADJUSTMENTS:
+        raise ValueError(f"Unknown adjustment '{adjustment}'. Choose from: {list(ADJUSTMENTS)}")
+    if adjustment == ADJUST_NONE or data.empty or actions.empty:
+        return data
+
+    dates = data["Date"].to_numpy(dtype="datetime64[ns]")
+    splits = split_factors(dates, actions)
+    price_factor = 1 / splits
+    if adjustment == ADJUST_ALL:
+        close = data["Close"].to_numpy(dtype="float64") * price_factor
+        price_factor = price_factor * dividend_factors(dates, close, actions)
+
+    for col in ("Open", "High", "Low", "Close"):
+        if col in data.columns:
+            data[col] = data[col].to_numpy(dtype="float64") * price_factor
+    if "Volume" in data.columns:
+        data["Volume"] = data["Volume"].to_numpy(dtype="float64") * splits
+    return data
+
+
+def unadjust_prices(data: pd.DataFrame, actions: pd.DataFrame) -> pd.DataFrame:
+    """Convert split-adjusted bars (yfinance auto_adjust=False) back to raw prices (in place)."""
+    if data.empty or actions.empty:
+        return data
+    splits = split_factors(data["Date"].to_numpy(dtype="datetime64[ns]"), actions)
+    for col in ("Open", "High", "Low", "Close"):
+        if col in data.columns:
+            data[col] = data[col].to_numpy(dtype="float64") * splits
+    if "Volume" in data.columns:
+        data["Volume"] = data["Volume"].to_numpy(dtype="float64") / splits
+    return data
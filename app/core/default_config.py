@@ -11,6 +11,109 @@ DEFAULT_CONFIG = {
         os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")),
         "data_cache",
     ),
+    # Background refresh of the symbols in the shared cache index, run by one leader
+    # worker every cache_refresh_interval seconds (0 disables it)
+    "cache_refresh_interval": float(os.getenv("CACHE_REFRESH_INTERVAL", "0")),
+    # Price store settings
+    # Publish cached price history into memory-mapped files shared by all workers
+    "shared_price_store": True,
+    # Directory for the shared segments (defaults to /dev/shm/market_data)
+    "shared_memory_dir": os.getenv("MARKET_DATA_SHM_DIR", ""),
+    # Seconds before a symbol's corporate actions (dividends/splits) table is refetched
+    "corporate_actions_ttl": int(os.getenv("CORPORATE_ACTIONS_TTL", "86400")),
+    # Seconds before a symbol's persisted financial statements are refetched
+    "fundamentals_ttl": int(os.getenv("FUNDAMENTALS_TTL", "86400")),
+    # Memory budget for indicator computations (estimated working sets, MB; 0 disables admission control)
+    "memory_budget_mb": float(os.getenv("MEMORY_BUDGET_MB", "512")),
+    "request_memory_limit_mb": float(os.getenv("REQUEST_MEMORY_LIMIT_MB", "64")),
+    # "queue" waits up to memory_queue_timeout seconds for memory, "reject" fails immediately (503)
+    "memory_admission": os.getenv("MEMORY_ADMISSION", "queue"),
+    "memory_queue_timeout": 30.0,
+    # Cached indicator series are stored as float32 when every value stays within this
+    # relative error (0: only if exact, -1: never); e.g. 1e-6 halves the cache
+    "memory_float32_rtol": float(os.getenv("MEMORY_FLOAT32_RTOL", "0")),
+    # Number of computed indicator series kept in memory (symbol x indicator)
+    "indicator_cache_size": int(os.getenv("INDICATOR_CACHE_SIZE", "256")),
+    # Seconds a failed price load / indicator computation is remembered and re-raised
+    # without retrying (0 disables)
+    "indicator_error_ttl": float(os.getenv("INDICATOR_ERROR_TTL", "30")),
+    # Response cache (serialized GET responses with ETag / conditional GET)
+    "response_cache_enabled": os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true",
+    "response_cache_max_bytes": int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    "response_cache_immutable_ttl": 86400,  # past dates / closed historical ranges
+    "response_cache_intraday_ttl": 60,      # responses that include today's data
+    "response_cache_default_ttl": 300,      # info, fundamentals, company data
+    # Vendor gateway settings (applied to every upstream Yahoo Finance call). With several
+    # worker processes (WEB_CONCURRENCY, as set by gunicorn.conf.py or uvicorn --workers)
+    # the rate limit is one token bucket shared by all of them and the concurrency cap is
+    # split between them, so both stay host-wide; retries and the circuit breaker are per worker
+    "web_concurrency": max(1, int(os.getenv("WEB_CONCURRENCY", "1"))),
+    "vendor_rate_limit_per_sec": float(os.getenv("VENDOR_RATE_LIMIT_PER_SEC", "5")),
+    "vendor_rate_limit_burst": int(os.getenv("VENDOR_RATE_LIMIT_BURST", "10")),
+    "vendor_max_concurrency": int(os.getenv("VENDOR_MAX_CONCURRENCY", "8")),
+    "vendor_max_retries": 3,
+    "vendor_backoff_base": 0.5,       # seconds, doubled per retry (full jitter)
+    "vendor_backoff_max": 8.0,
+    "vendor_circuit_failure_threshold": 5,
+    "vendor_circuit_reset_seconds": 30,
+    "vendor_fallback_cache_size": 512,  # last good responses served while the circuit is open
+    # Vendor routing: each tool tries the local files first (get_stock_data, only when a
+    # file covers the requested range), then the vendor from tool_vendors/data_vendors,
+    # then its fallbacks, e.g. VENDOR_FALLBACKS="get_stock_data=local,stub;get_dividends=stub".
+    # Remote vendors whose recent latency (EWMA, with errors penalized) is more than
+    # vendor_demote_ratio x the best one's are tried after the others
+    "vendor_local_first": os.getenv("VENDOR_LOCAL_FIRST", "true").lower() == "true",
+    "vendor_fallbacks": {
+        tool.strip(): [vendor.strip() for vendor in vendors.split(",") if vendor.strip()]
+        for tool, _, vendors in (
+            item.partition("=") for item in os.getenv("VENDOR_FALLBACKS", "").split(";") if item.strip()
+        )
+    },
+    "vendor_latency_alpha": 0.2,     # EWMA weight of the newest call
+    "vendor_error_penalty": 10.0,    # score = latency x (1 + penalty x error rate)
+    "vendor_demote_ratio": 3.0,
+    "vendor_min_samples": 5,         # calls before a vendor can be demoted
+    "vendor_recheck_seconds": 60.0,  # averages older than this are dropped, so demoted vendors get retried
+    # Stub vendor (deterministic synthetic data, for tests): delay per call and share of failed calls
+    "stub_vendor_latency_ms": float(os.getenv("STUB_VENDOR_LATENCY_MS", "0")),
+    "stub_vendor_error_rate": float(os.getenv("STUB_VENDOR_ERROR_RATE", "0")),
+    # Async HTTP client for history, info and fundamentals (requires httpx)
+    "async_http_client": os.getenv("ASYNC_HTTP_CLIENT", "false").lower() == "true",
+    "async_http_max_connections": int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "100")),
+    "async_http_timeout": 30.0,
+    "yahoo_base_url": os.getenv("YAHOO_BASE_URL", "https://query2.finance.yahoo.com"),
+    "yahoo_cookie_url": os.getenv("YAHOO_COOKIE_URL", "https://fc.yahoo.com"),
+    # Universe summary: per-symbol worker threads, request size cap and analyst vote cache (seconds)
+    "universe_max_workers": int(os.getenv("UNIVERSE_MAX_WORKERS", "8")),
+    "universe_max_symbols": 500,
+    "analyst_cache_ttl": 3600,
+    # Company snapshot: seconds a symbol's .info and insider transactions are reused
+    # (analyst recommendations use analyst_cache_ttl)
+    "company_cache_ttl": int(os.getenv("COMPANY_CACHE_TTL", "3600")),
+    # Most (symbol, part) entries kept, least recently used evicted first
+    "company_cache_size": int(os.getenv("COMPANY_CACHE_SIZE", "3000")),
+    # Live streaming (/api/v1/stream): seconds between upstream quote polls (one poller per
+    # symbol, shared by all its subscribers), symbols per connection, updates buffered for a
+    # slow client before they are replaced by one fresh snapshot, and seconds between keep-alives
+    "stream_poll_interval": float(os.getenv("STREAM_POLL_INTERVAL", "5")),
+    "stream_max_symbols": int(os.getenv("STREAM_MAX_SYMBOLS", "50")),
+    "stream_queue_size": 100,
+    "stream_heartbeat_seconds": 15.0,
+    # Per-request profiling: requests with an X-Debug-Profile header (equal to the token,
+    # if one is set) get a Server-Timing stage breakdown; a sampled share also runs under
+    # cProfile, and dumps of those slower than debug_profile_dump_ms are kept (slowest first)
+    "debug_profile_enabled": os.getenv("DEBUG_PROFILE_ENABLED", "false").lower() == "true",
+    "debug_profile_token": os.getenv("DEBUG_PROFILE_TOKEN", ""),
+    "debug_profile_sample_rate": float(os.getenv("DEBUG_PROFILE_SAMPLE_RATE", "0.1")),
+    "debug_profile_dump_ms": float(os.getenv("DEBUG_PROFILE_DUMP_MS", "500")),
+    "debug_profile_max_dumps": 20,
+    "debug_profile_dir": os.getenv(
+        "DEBUG_PROFILE_DIR",
+        os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")), "logs"),
+    ),
+    # Import pandas/yfinance/stockstats in a background thread once the server is up
+    # (otherwise they are imported by the first request that needs them)
+    "preload_imports": os.getenv("PRELOAD_IMPORTS", "true").lower() == "true",
     # LLM settings
     "llm_provider": "openai",
     "deep_think_llm": "o4-mini",
@@ -21,11 +124,16 @@ DEFAULT_CONFIG = {
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
     # Data vendor configuration
+    # "local" serves everything offline from the files indexed in data_dir:
+    #   {SYMBOL}-YFin-data-{start}-{end}.csv (Date, Open, High, Low, Close, Volume)
+    #   {SYMBOL}-dividends.csv (Date, Dividends)
+    # "stub" serves deterministic synthetic data (tests). Vendors without an
+    # implementation in this service (alpha_vantage, openai, google) are skipped.
     # Category-level configuration (default for all tools in category)
     "data_vendors": {
-        "core_stock_apis": "yfinance",       # Options: yfinance, alpha_vantage, local
-        "technical_indicators": "yfinance",  # Options: yfinance, alpha_vantage, local
-        "fundamental_data": "alpha_vantage", # Options: openai, alpha_vantage, local
+        "core_stock_apis": os.getenv("CORE_STOCK_VENDOR", "yfinance"),            # Options: yfinance, local, stub
+        "technical_indicators": os.getenv("TECHNICAL_INDICATORS_VENDOR", "yfinance"),  # Options: yfinance, local, stub
+        "fundamental_data": os.getenv("FUNDAMENTAL_DATA_VENDOR", "yfinance"),     # Options: yfinance, stub
         "news_data": "alpha_vantage",        # Options: openai, alpha_vantage, google, local
     },
     # Tool-level configuration (takes precedence over category-level)
@@ -0,0 +1,349 @@
+"""
+Fundamentals store
+Financial statements persisted as long-format tables, one file per symbol and
+frequency ({SYMBOL}-fundamentals-{frequency}.csv with period, statement,
+line_item, value), refreshed on a TTL. Loaded tables are merged into one
+in-memory frame per frequency, indexed by (symbol, line_item), so
+cross-company queries and derived ratios are computed over the whole
+selection at once instead of per ticker.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import get_settings
+from .profiling import CACHE_READ, propagate, stage
+from .shared_cache import atomic_write, file_lock, get_index
+from .vendor_gateway import VendorUnavailableError
+
+FREQUENCIES = ("annual", "quarterly")
+STATEMENTS = ("balance_sheet", "income_stmt", "cashflow")
+LONG_COLUMNS = ("period", "statement", "line_item", "value")
+
+# Statement name -> yfinance getter (called with pretty=False for raw line item keys)
+STATEMENT_GETTERS = {
+    "balance_sheet": "get_balance_sheet",
+    "income_stmt": "get_income_stmt",
+    "cashflow": "get_cashflow",
+}
+YF_FREQUENCY = {"annual": "yearly", "quarterly": "quarterly"}
+
+# Derived ratios: name -> (numerator, denominator, description)
+RATIOS: Dict[str, Tuple[str, str, str]] = {
+    "gross_margin": ("GrossProfit", "TotalRevenue", "Gross profit / total revenue"),
+    "operating_margin": ("OperatingIncome", "TotalRevenue", "Operating income / total revenue"),
+    "net_margin": ("NetIncome", "TotalRevenue", "Net income / total revenue"),
+    "fcf_margin": ("FreeCashFlow", "TotalRevenue", "Free cash flow / total revenue"),
+    "debt_to_equity": ("TotalDebt", "StockholdersEquity", "Total debt / stockholders' equity"),
+    "current_ratio": ("CurrentAssets", "CurrentLiabilities", "Current assets / current liabilities"),
+    "return_on_equity": ("NetIncome", "StockholdersEquity", "Net income / stockholders' equity (per period)"),
+}
+
+# path -> (mtime_ns, frame)
+_tables: Dict[str, Tuple[int, pd.DataFrame]] = {}
+_lock = threading.Lock()
+
+# frequency -> merged frame indexed by (symbol, line_item), and the file version of each symbol in it
+_combined: Dict[str, pd.DataFrame] = {}
+_combined_versions: Dict[str, Dict[str, int]] = {}
+_combined_lock = threading.Lock()
+
+
+def _check_frequency(frequency: str) -> str:
+    frequency = frequency.lower()
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency '{frequency}'. Choose from: {list(FREQUENCIES)}")
+    return frequency
+
+
+def fundamentals_file_path(symbol: Annotated[str, "ticker symbol"], frequency: Annotated[str, "annual or quarterly"]) -> str:
+    """Path of the persisted statements table for a symbol."""
+    return os.path.join(get_settings().data_cache_dir, f"{symbol.upper()}-fundamentals-{frequency}.csv")
+
+
+def empty_statements() -> pd.DataFrame:
+    return pd.DataFrame({
+        "period": pd.Series(dtype="datetime64[ns]"),
+        "statement": pd.Series(dtype="object"),
+        "line_item": pd.Series(dtype="object"),
+        "value": pd.Series(dtype="float64"),
+    })
+
+
+def statement_to_long(statement: str, data: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Reshape a statement (line items x period columns) into long rows, dropping empty cells."""
+    if data is None or data.empty:
+        return empty_statements()
+    values = data.to_numpy(dtype="float64")
+    rows, cols = np.nonzero(~np.isnan(values))
+    return pd.DataFrame({
+        "period": pd.DatetimeIndex(data.columns)[cols],
+        "statement": statement,
+        "line_item": data.index.to_numpy(dtype=object)[rows],
+        "value": values[rows, cols],
+    })
+
+
+def _read(path: str, mtime_ns: int) -> pd.DataFrame:
+    with _lock:
+        cached = _tables.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+    with stage(CACHE_READ):
+        table = pd.read_csv(path, parse_dates=["period"])
+    with _lock:
+        _tables[path] = (mtime_ns, table)
+    return table
+
+
+def _write(symbol: str, frequency: str, table: pd.DataFrame) -> None:
+    with atomic_write(fundamentals_file_path(symbol, frequency)) as tmp_path:
+        table.to_csv(tmp_path, index=False, date_format="%Y-%m-%d")
+    get_index().record(symbol, f"fundamentals-{frequency}")
+
+
+def _build(symbol: str, frequency: str, statements: Dict[str, Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """Combine fetched statements into the long table and persist it (unless nothing came back)."""
+    table = pd.concat(
+        [statement_to_long(name, statements.get(name)) for name in STATEMENTS],
+        ignore_index=True,
+    )
+    if not table.empty:
+        _write(symbol, frequency, table)
+    return table
+
+
+def fetch_statements(
+    symbol: Annotated[str, "ticker symbol"],
+    frequency: Annotated[str, "annual or quarterly"],
+) -> pd.DataFrame:
+    """Fetch the three statements from the get_fundamentals vendor chain and persist them."""
+    from .vendor_router import get_router
+
+    return _build(symbol, frequency, get_router().fetch("get_fundamentals", symbol, frequency))
+
+
+async def afetch_statements(
+    symbol: Annotated[str, "ticker symbol"],
+    frequency: Annotated[str, "annual or quarterly"],
+) -> pd.DataFrame:
+    """Async counterpart of `fetch_statements` on the async Yahoo client."""
+    import asyncio
+
+    from . import async_yahoo
+
+    frames = await asyncio.gather(
+        *(async_yahoo.get_statement(symbol, name, frequency) for name in STATEMENTS)
+    )
+    return _build(symbol, frequency, dict(zip(STATEMENTS, frames)))
+
+
+def _cached(symbol: str, frequency: str) -> Tuple[Optional[os.stat_result], bool]:
+    """stat of the persisted table (None if missing) and whether it is within the TTL."""
+    try:
+        st = os.stat(fundamentals_file_path(symbol, frequency))
+    except FileNotFoundError:
+        return None, False
+    return st, time.time() - st.st_mtime < get_settings().fundamentals_ttl
+
+
+def _stale(symbol: str, frequency: str, st: Optional[os.stat_result], error: VendorUnavailableError) -> pd.DataFrame:
+    if st is None:
+        raise error
+    print(f"Upstream unavailable, using stale fundamentals for {symbol}")
+    return _read(fundamentals_file_path(symbol, frequency), st.st_mtime_ns)
+
+
+def load_statements(
+    symbol: Annotated[str, "ticker symbol"],
+    frequency: Annotated[str, "annual or quarterly"] = "quarterly",
+) -> pd.DataFrame:
+    """
+    Get the long statements table for a symbol, refetching it when older than
+    `fundamentals_ttl`. If the vendor is unavailable the persisted table is used as is.
+    Workers sharing the cache refetch a symbol one at a time.
+    """
+    symbol, frequency = symbol.upper(), _check_frequency(frequency)
+    st, fresh = _cached(symbol, frequency)
+    if fresh:
+        return _read(fundamentals_file_path(symbol, frequency), st.st_mtime_ns)
+    with file_lock(f"fundamentals-{symbol}-{frequency}"):
+        # Another worker may have refetched it while this one waited
+        st, fresh = _cached(symbol, frequency)
+        if fresh:
+            return _read(fundamentals_file_path(symbol, frequency), st.st_mtime_ns)
+        try:
+            return fetch_statements(symbol, frequency)
+        except VendorUnavailableError as e:
+            return _stale(symbol, frequency, st, e)
+
+
+async def aload_statements(
+    symbol: Annotated[str, "ticker symbol"],
+    frequency: Annotated[str, "annual or quarterly"] = "quarterly",
+) -> pd.DataFrame:
+    """`load_statements` fetching on the async client when it is enabled."""
+    from . import async_yahoo
+
+    if not async_yahoo.enabled():
+        from starlette.concurrency import run_in_threadpool
+
+        return await run_in_threadpool(load_statements, symbol, frequency)
+
+    symbol, frequency = symbol.upper(), _check_frequency(frequency)
+    st, fresh = _cached(symbol, frequency)
+    if fresh:
+        return _read(fundamentals_file_path(symbol, frequency), st.st_mtime_ns)
+    try:
+        return await afetch_statements(symbol, frequency)
+    except VendorUnavailableError as e:
+        return _stale(symbol, frequency, st, e)
+
+
+def to_statement(
+    table: Annotated[pd.DataFrame, "long statements table"],
+    statement: Annotated[str, "balance_sheet, income_stmt or cashflow"],
+) -> pd.DataFrame:
+    """
+    One statement in yfinance's shape: line items (display names) as rows,
+    period dates as columns, newest first.
+    """
+    from yfinance.utils import camel2title
+
+    rows = table[table["statement"] == statement]
+    if rows.empty:
+        return pd.DataFrame()
+    data = rows.pivot(index="line_item", columns="period", values="value")
+    data = data.reindex(index=pd.unique(rows["line_item"]), columns=sorted(data.columns, reverse=True))
+    data.index = camel2title(data.index, sep=" ", acronyms=["EBIT", "EBITDA", "EPS", "NI"])
+    return data
+
+
+def _combined_table(symbols: Sequence[str], frequency: str) -> pd.DataFrame:
+    """
+    The merged (symbol, line_item)-indexed frame, brought up to date for
+    `symbols`: only symbols whose persisted table changed are replaced.
+    """
+    versions = {}
+    for symbol in symbols:
+        try:
+            versions[symbol] = os.stat(fundamentals_file_path(symbol, frequency)).st_mtime_ns
+        except FileNotFoundError:
+            pass
+
+    with _combined_lock:
+        combined = _combined.get(frequency)
+        known = _combined_versions.setdefault(frequency, {})
+        changed = [s for s, version in versions.items() if known.get(s) != version]
+        if combined is not None and not changed:
+            return combined
+
+        parts = []
+        for symbol in changed:
+            part = _read(fundamentals_file_path(symbol, frequency), versions[symbol])
+            parts.append(part.assign(symbol=symbol).set_index(["symbol", "line_item"]))
+        if combined is not None:
+            parts.insert(0, combined.drop(index=changed, level="symbol", errors="ignore"))
+        combined = pd.concat(parts).sort_index() if parts else empty_statements().set_index(
+            [pd.Index([], name="symbol"), "line_item"]
+        )
+        known.update({symbol: versions[symbol] for symbol in changed})
+        _combined[frequency] = combined
+        return combined
+
+
+def _load_all(symbols: List[str], frequency: str) -> Dict[str, str]:
+    """Make sure every symbol's table is current (in parallel); returns errors by symbol."""
+    def load(symbol: str) -> Optional[str]:
+        try:
+            if load_statements(symbol, frequency).empty:
+                return "No fundamentals data available"
+        except Exception as e:
+            return str(e)
+        return None
+
+    workers = max(1, min(get_settings().universe_max_workers, len(symbols)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fundamentals") as pool:
+        results = list(pool.map(propagate(load), symbols))
+    return {symbol: error for symbol, error in zip(symbols, results) if error is not None}
+
+
+def query_fundamentals(
+    symbols: Annotated[List[str], "ticker symbols"],
+    line_items: Annotated[List[str], "raw line item keys, e.g. TotalRevenue"] = (),
+    ratios: Annotated[List[str], "names from RATIOS"] = (),
+    frequency: Annotated[str, "annual or quarterly"] = "quarterly",
+    periods: Annotated[int, "most recent periods per symbol"] = 8,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Line items and derived ratios for many symbols over their last `periods`
+    reporting periods. Returns a ColumnarTable with one row per (symbol,
+    period), newest first, and metadata (errors by symbol).
+    """
+    from app.models.results import ColumnarTable
+
+    frequency = _check_frequency(frequency)
+    unknown = [name for name in ratios if name not in RATIOS]
+    if unknown:
+        raise ValueError(f"Unknown ratios {unknown}. Choose from: {list(RATIOS)}")
+    if not line_items and not ratios:
+        raise ValueError("Request at least one line item or ratio")
+    if periods < 1:
+        raise ValueError("periods must be at least 1")
+
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    line_items = list(dict.fromkeys(line_items))
+    ratios = list(dict.fromkeys(ratios))
+    needed = list(dict.fromkeys(line_items + [item for name in ratios for item in RATIOS[name][:2]]))
+
+    started = time.perf_counter()
+    errors = _load_all(symbols, frequency)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    combined = _combined_table(symbols, frequency)
+    levels = combined.index.levels
+    selected_symbols = [s for s in symbols if s in levels[0]]
+    selected_items = [item for item in needed if item in levels[1]]
+    if selected_symbols and selected_items:
+        rows = combined.iloc[combined.index.get_locs([selected_symbols, selected_items])].reset_index()
+    else:
+        rows = combined.iloc[:0].reset_index()
+
+    # Most recent periods per symbol, then one column per line item
+    rank = rows.groupby("symbol", sort=False)["period"].rank(method="dense", ascending=False)
+    rows = rows[rank <= periods].drop_duplicates(["symbol", "period", "line_item"])
+    wide = rows.pivot(index=["symbol", "period"], columns="line_item", values="value")
+    wide = wide.reindex(columns=needed)
+    for name in ratios:
+        numerator, denominator, _ = RATIOS[name]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = wide[numerator].to_numpy(dtype="float64") / wide[denominator].to_numpy(dtype="float64")
+        values[~np.isfinite(values)] = np.nan
+        wide[name] = values
+
+    # Request order of symbols, newest period first
+    order = {symbol: i for i, symbol in enumerate(symbols)}
+    wide = wide.reset_index()
+    wide = wide.iloc[np.lexsort((-wide["period"].to_numpy(dtype="int64"), wide["symbol"].map(order).to_numpy()))]
+
+    columns = ["symbol", "period"] + line_items + ratios
+    table = ColumnarTable(
+        columns,
+        [wide["symbol"].tolist(), wide["period"].dt.strftime("%Y-%m-%d").tolist()]
+        + [wide[column].tolist() for column in line_items + ratios],
+    )
+    metadata = {
+        "symbols": len(symbols),
+        "errors": errors,
+        "timings_ms": {
+            "load": round(load_ms, 1),
+            "compute": round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+    return table, metadata
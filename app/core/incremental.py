@@ -0,0 +1,475 @@
+"""
+Incremental indicators
+State objects that advance every supported indicator one bar at a time in
+O(1), for live streams and for extending a series by a few new sessions.
+Each reproduces the stockstats formula used by the indicators module (same
+smoothing, same warm-up values), and the rolling sums and variances follow
+pandas' compensated rolling algorithms, so a state seeded from the daily
+history continues the series the REST endpoints serve (checked by
+benchmarks/check_incremental.py).
+
+`update` appends a closed bar; `peek` returns the values as if a bar were
+appended without changing the state, for the session still trading.
+"""
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class Bar(NamedTuple):
+    """One session's prices (the open session's bar changes until the close)."""
+
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+# Daily history columns, in Bar order
+BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _typical_price(bar: Bar) -> float:
+    return (bar.close + bar.high + bar.low) / 3.0
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """Division as numpy does it on series: x/0 is +-inf, 0/0 is NaN."""
+    if denominator == 0.0:
+        return math.nan if numerator == 0.0 or numerator != numerator else math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+class EMA:
+    """
+    Exponential moving average with pandas' ewm(adjust=True) weighting, as
+    stockstats' ema (span) and smma (alpha = 1 / window) compute it.
+    """
+
+    __slots__ = ("factor", "average", "weight")
+
+    def __init__(self, alpha: float):
+        self.factor = 1.0 - alpha
+        self.average: Optional[float] = None
+        self.weight = 0.0
+
+    @classmethod
+    def span(cls, window: int) -> "EMA":
+        return cls(2.0 / (window + 1.0))
+
+    def peek(self, value: float) -> float:
+        if self.average is None:
+            return value
+        weight = self.weight * self.factor
+        if self.average == value:
+            return value
+        return (weight * self.average + value) / (weight + 1.0)
+
+    def update(self, value: float) -> float:
+        if self.average is None:
+            self.average, self.weight = value, 1.0
+            return value
+        self.average = self.peek(value)
+        self.weight = self.weight * self.factor + 1.0
+        return self.average
+
+
+class Window:
+    """Ring buffer of the last `size` values."""
+
+    __slots__ = ("size", "values", "position", "full")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = [0.0] * size
+        self.position = 0
+        self.full = False
+
+    def leaving(self) -> Optional[float]:
+        """The value the next push drops, None while the window fills."""
+        return self.values[self.position] if self.full else None
+
+    def push(self, value: float) -> None:
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+        self.full = self.full or self.position == 0
+
+
+def _compensated(total: float, error: float, value: float) -> Tuple[float, float]:
+    """Kahan summation step: (total + value, new error term)."""
+    y = value - error
+    t = total + y
+    return t, t - total - y
+
+
+class RollingSum:
+    """
+    Sum and mean of the last `window` values, as pandas' rolling(window,
+    min_periods=1) sum()/mean() compute them: Kahan-compensated adds and
+    removes, and repeated values returned exactly.
+    """
+
+    __slots__ = ("window", "nobs", "total", "add_error", "remove_error", "negatives", "repeats", "previous")
+
+    def __init__(self, window: int):
+        self.window = Window(window)
+        self.nobs = 0
+        self.total = self.add_error = self.remove_error = 0.0
+        self.negatives = self.repeats = 0
+        self.previous = math.nan
+
+    def _step(self, value: float) -> tuple:
+        nobs, total, add_error, remove_error = self.nobs, self.total, self.add_error, self.remove_error
+        negatives, repeats, previous = self.negatives, self.repeats, self.previous
+        leaving = self.window.leaving()
+        if leaving is not None and leaving == leaving:
+            nobs -= 1
+            total, remove_error = _compensated(total, remove_error, -leaving)
+            negatives -= math.copysign(1.0, leaving) < 0
+        if value == value:
+            nobs += 1
+            total, add_error = _compensated(total, add_error, value)
+            negatives += math.copysign(1.0, value) < 0
+            repeats = repeats + 1 if value == previous else 1
+            previous = value
+        return nobs, total, add_error, remove_error, negatives, repeats, previous
+
+    def _commit(self, value: float, state: tuple) -> None:
+        self.window.push(value)
+        (self.nobs, self.total, self.add_error, self.remove_error,
+         self.negatives, self.repeats, self.previous) = state
+
+    @staticmethod
+    def _sum(state: tuple) -> float:
+        nobs, total, _, _, _, repeats, previous = state
+        if nobs == 0:
+            return math.nan
+        return previous * nobs if repeats >= nobs else total
+
+    @staticmethod
+    def _mean(state: tuple) -> float:
+        nobs, total, _, _, negatives, repeats, previous = state
+        if nobs == 0:
+            return math.nan
+        if repeats >= nobs:
+            return previous
+        mean = total / nobs
+        if negatives == 0 and mean < 0:
+            return 0.0
+        if negatives == nobs and mean > 0:
+            return 0.0
+        return mean
+
+    def peek_sum(self, value: float) -> float:
+        return self._sum(self._step(value))
+
+    def update_sum(self, value: float) -> float:
+        state = self._step(value)
+        self._commit(value, state)
+        return self._sum(state)
+
+    def peek_mean(self, value: float) -> float:
+        return self._mean(self._step(value))
+
+    def update_mean(self, value: float) -> float:
+        state = self._step(value)
+        self._commit(value, state)
+        return self._mean(state)
+
+
+class RollingStd:
+    """
+    Sample standard deviation (ddof=1) of the last `window` values, as
+    pandas' rolling(window, min_periods=1).std() computes it: Welford
+    updates with Kahan-compensated means; NaN until two values are seen.
+    """
+
+    __slots__ = ("window", "nobs", "mean", "squares", "add_error", "remove_error", "repeats", "previous")
+
+    def __init__(self, window: int):
+        self.window = Window(window)
+        self.nobs = 0
+        self.mean = self.squares = self.add_error = self.remove_error = 0.0
+        self.repeats = 0
+        self.previous = math.nan
+
+    def _step(self, value: float) -> tuple:
+        nobs, mean, squares = self.nobs, self.mean, self.squares
+        add_error, remove_error, repeats, previous = self.add_error, self.remove_error, self.repeats, self.previous
+        leaving = self.window.leaving()
+        if leaving is not None and leaving == leaving:
+            nobs -= 1
+            if nobs:
+                prev_mean = mean - remove_error
+                y = leaving - remove_error
+                t = y - mean
+                remove_error = t + mean - y
+                mean -= t / nobs
+                squares -= (leaving - prev_mean) * (leaving - mean)
+            else:
+                mean = squares = 0.0
+        if value == value:
+            nobs += 1
+            repeats = repeats + 1 if value == previous else 1
+            previous = value
+            prev_mean = mean - add_error
+            y = value - add_error
+            t = y - mean
+            add_error = t + mean - y
+            mean += t / nobs
+            squares += (value - prev_mean) * (value - mean)
+        return nobs, mean, squares, add_error, remove_error, repeats, previous
+
+    def _commit(self, value: float, state: tuple) -> None:
+        self.window.push(value)
+        (self.nobs, self.mean, self.squares, self.add_error,
+         self.remove_error, self.repeats, self.previous) = state
+
+    @staticmethod
+    def _std(state: tuple) -> float:
+        nobs, _, squares, _, _, repeats, _ = state
+        if nobs < 2:
+            return math.nan
+        if repeats >= nobs:
+            return 0.0
+        return math.sqrt(max(squares / (nobs - 1), 0.0))
+
+    def peek(self, value: float) -> float:
+        return self._std(self._step(value))
+
+    def update(self, value: float) -> float:
+        state = self._step(value)
+        self._commit(value, state)
+        return self._std(state)
+
+
+class Indicator:
+    """Base for indicators over bars: `_advance(bar, commit)` returns {name: value}."""
+
+    __slots__ = ()
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        raise NotImplementedError
+
+    def peek(self, bar: Bar) -> Dict[str, float]:
+        return self._advance(bar, False)
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        return self._advance(bar, True)
+
+
+class SMA(Indicator):
+    """Simple moving average of the close (partial windows averaged, like stockstats)."""
+
+    __slots__ = ("name", "mean")
+
+    def __init__(self, name: str, window: int):
+        self.name = name
+        self.mean = RollingSum(window)
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        mean = self.mean.update_mean(bar.close) if commit else self.mean.peek_mean(bar.close)
+        return {self.name: mean}
+
+
+class CloseEMA(Indicator):
+    """Exponential moving average of the close."""
+
+    __slots__ = ("name", "ema")
+
+    def __init__(self, name: str, window: int):
+        self.name = name
+        self.ema = EMA.span(window)
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        return {self.name: self.ema.update(bar.close) if commit else self.ema.peek(bar.close)}
+
+
+def _rsi(gain: float, loss: float) -> float:
+    # stockstats divides the averages as floats: x/0 is inf, 0/0 is NaN
+    if loss == 0.0:
+        return math.nan if gain == 0.0 else 100.0
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+class RSI(Indicator):
+    """Wilder's relative strength index: SMMA of gains over SMMA of losses; NaN on the first bar."""
+
+    __slots__ = ("previous", "gains", "losses")
+
+    def __init__(self, window: int = 14):
+        self.previous: Optional[float] = None
+        self.gains = EMA(1.0 / window)
+        self.losses = EMA(1.0 / window)
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        change = 0.0 if self.previous is None else bar.close - self.previous
+        gain, loss = (change + abs(change)) / 2, (-change + abs(change)) / 2
+        if not commit:
+            return {"rsi": _rsi(self.gains.peek(gain), self.losses.peek(loss))}
+        self.previous = bar.close
+        return {"rsi": _rsi(self.gains.update(gain), self.losses.update(loss))}
+
+
+class MACD(Indicator):
+    """MACD line (fast - slow EMA of the close), its signal EMA and the histogram."""
+
+    __slots__ = ("fast", "slow", "signal")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA.span(fast)
+        self.slow = EMA.span(slow)
+        self.signal = EMA.span(signal)
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        if commit:
+            line = self.fast.update(bar.close) - self.slow.update(bar.close)
+            signal = self.signal.update(line)
+        else:
+            line = self.fast.peek(bar.close) - self.slow.peek(bar.close)
+            signal = self.signal.peek(line)
+        return {"macd": line, "macds": signal, "macdh": line - signal}
+
+
+class Bollinger(Indicator):
+    """Bollinger bands: moving average of the close +/- `width` rolling standard deviations."""
+
+    __slots__ = ("mean", "std", "width")
+
+    def __init__(self, window: int = 20, width: float = 2.0):
+        self.mean = RollingSum(window)
+        self.std = RollingStd(window)
+        self.width = width
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        if commit:
+            mean, std = self.mean.update_mean(bar.close), self.std.update(bar.close)
+        else:
+            mean, std = self.mean.peek_mean(bar.close), self.std.peek(bar.close)
+        band = self.width * std
+        return {"boll": mean, "boll_ub": mean + band, "boll_lb": mean - band}
+
+
+class ATR(Indicator):
+    """Average true range: SMMA of the true range (the first bar uses its own close as the previous one)."""
+
+    __slots__ = ("previous", "average")
+
+    def __init__(self, window: int = 14):
+        self.previous: Optional[float] = None
+        self.average = EMA(1.0 / window)
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        previous = bar.close if self.previous is None else self.previous
+        true_range = max(bar.high - bar.low, abs(bar.high - previous), abs(bar.low - previous))
+        if not commit:
+            return {"atr": self.average.peek(true_range)}
+        self.previous = bar.close
+        return {"atr": self.average.update(true_range)}
+
+
+class VWMA(Indicator):
+    """Volume-weighted moving average of the typical price."""
+
+    __slots__ = ("weighted", "volume")
+
+    def __init__(self, window: int = 14):
+        self.weighted = RollingSum(window)
+        self.volume = RollingSum(window)
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        weighted = bar.volume * _typical_price(bar)
+        if commit:
+            return {"vwma": _divide(self.weighted.update_sum(weighted), self.volume.update_sum(bar.volume))}
+        return {"vwma": _divide(self.weighted.peek_sum(weighted), self.volume.peek_sum(bar.volume))}
+
+
+class MFI(Indicator):
+    """
+    Money flow index as stockstats computes it: a 0-1 ratio of rolling
+    positive to total money flow, 0.5 for the first `window` bars.
+    """
+
+    __slots__ = ("window", "bars", "previous", "positive", "negative")
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.bars = 0
+        self.previous: Optional[float] = None
+        self.positive = RollingSum(window)
+        self.negative = RollingSum(window)
+
+    def _advance(self, bar: Bar, commit: bool) -> Dict[str, float]:
+        typical = _typical_price(bar)
+        flow = typical * bar.volume
+        flow = 0.0 if flow != flow else flow
+        delta = 0.0 if self.previous is None else typical - self.previous
+        delta = 0.0 if delta != delta else delta
+        positive, negative = (0.0, flow) if delta < 0 else (flow, 0.0)
+        if commit:
+            positive, negative = self.positive.update_sum(positive), self.negative.update_sum(negative)
+            self.previous = typical
+            self.bars += 1
+            bars = self.bars
+        else:
+            positive, negative = self.positive.peek_sum(positive), self.negative.peek_sum(negative)
+            bars = self.bars + 1
+        if bars <= self.window:
+            return {"mfi": 0.5}
+        return {"mfi": 1.0 - 1.0 / (1 + positive / (negative + 1e-12))}
+
+
+# One factory per group of indicators stockstats computes together; together
+# they cover indicators.SUPPORTED_INDICATORS
+INDICATOR_FACTORIES: Tuple[Callable[[], Indicator], ...] = (
+    lambda: SMA("close_50_sma", 50),
+    lambda: SMA("close_200_sma", 200),
+    lambda: CloseEMA("close_10_ema", 10),
+    lambda: MACD(12, 26, 9),
+    lambda: RSI(14),
+    lambda: Bollinger(20, 2.0),
+    lambda: ATR(14),
+    lambda: VWMA(14),
+    lambda: MFI(14),
+)
+
+
+class IndicatorState:
+    """Every supported indicator of one symbol, advanced bar by bar."""
+
+    __slots__ = ("indicators", "bars")
+
+    def __init__(self):
+        self.indicators: Tuple[Indicator, ...] = tuple(factory() for factory in INDICATOR_FACTORIES)
+        self.bars = 0
+
+    @classmethod
+    def seed(cls, data: Any) -> "IndicatorState":
+        """State after the bars of a daily price frame (Open, High, Low, Close, Volume columns)."""
+        state = cls()
+        state.extend(data)
+        return state
+
+    def extend(self, data: Any) -> Dict[str, List[float]]:
+        """Append the bars of a price frame; returns each indicator's value per bar."""
+        columns = [data[column].to_numpy(dtype="float64").tolist() for column in BAR_COLUMNS]
+        values: Dict[str, List[float]] = {}
+        for bar in zip(*columns):
+            for name, value in self.update(Bar(*bar)).items():
+                values.setdefault(name, []).append(value)
+        return values
+
+    def peek(self, bar: Bar) -> Dict[str, float]:
+        """Values with `bar` as the latest (still open) bar; the state is unchanged."""
+        values: Dict[str, float] = {}
+        for indicator in self.indicators:
+            values.update(indicator.peek(bar))
+        return values
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        """Append a closed bar."""
+        values: Dict[str, float] = {}
+        for indicator in self.indicators:
+            values.update(indicator.update(bar))
+        self.bars += 1
+        return values
@@ -0,0 +1,291 @@
+"""
+Indicator series
+Computes technical indicators once over the full cached price history and
+keeps the materialized columns in memory, so any date or date range can be
+answered by slicing instead of recomputing.
+
+Failures are cached too: a price load or computation that fails is re-raised
+for `indicator_error_ttl` seconds instead of being retried by every request
+(or every indicator) for the same symbol.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Annotated, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import LOCAL, get_settings
+from . import corporate_actions, local_vendor
+from .memory_budget import (
+    MemoryBudgetExceededError,
+    downcast_float32,
+    estimate_frame_bytes,
+    get_memory_budget,
+)
+from .profiling import INDICATOR_COMPUTE, WRAP, stage
+from .price_store import history_window
+from .trading_calendar import get_calendar
+
+SUPPORTED_INDICATORS = (
+    "close_50_sma",
+    "close_200_sma",
+    "close_10_ema",
+    "macd",
+    "macds",
+    "macdh",
+    "rsi",
+    "boll",
+    "boll_ub",
+    "boll_lb",
+    "atr",
+    "vwma",
+    "mfi",
+)
+
+NOT_TRADING_DAY = "N/A: Not a trading day (weekend or holiday)"
+
+_series: "OrderedDict[Hashable, pd.Series]" = OrderedDict()
+_lock = threading.Lock()
+# (symbol, version) for price loads, (symbol, indicator, version) for computations
+_failures: Dict[Hashable, Tuple[Exception, float]] = {}
+# One load/computation per symbol at a time; concurrent requests wait and reuse it
+_symbol_locks: Dict[str, threading.Lock] = {}
+
+
+def _uses_local_vendor() -> bool:
+    return get_settings().vendors.indicators == LOCAL
+
+
+def price_version(symbol: Annotated[str, "ticker symbol"]) -> Hashable:
+    """Cheap key that changes whenever the price history for a symbol does."""
+    if _uses_local_vendor():
+        local_file = local_vendor.get_index().best_price_file(symbol)
+        if local_file is None:
+            raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+        return ("local", local_file.path, os.stat(local_file.path).st_mtime_ns)
+    # Adjusted prices change when the corporate actions table is refreshed
+    return ("online", history_window(), corporate_actions.actions_version(symbol.upper()))
+
+
+def fetch_prices(symbol: Annotated[str, "ticker symbol"]) -> Tuple[str, pd.DataFrame]:
+    """Load price history from the get_indicators vendor chain; returns (vendor, data)."""
+    from .vendor_router import VendorMiss, get_router
+
+    try:
+        return get_router().fetch_with_vendor("get_indicators", symbol)
+    except VendorMiss:
+        raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+
+
+def load_prices(symbol: Annotated[str, "ticker symbol"]) -> pd.DataFrame:
+    """Load price history from the configured technical_indicators vendor (or its fallbacks)."""
+    return fetch_prices(symbol)[1]
+
+
+def _cache_size() -> int:
+    return get_settings().indicator_cache_size
+
+
+def _store(key: Hashable, series: pd.Series) -> None:
+    with _lock:
+        _series[key] = series
+        _series.move_to_end(key)
+        limit = _cache_size()
+        while len(_series) > limit:
+            _series.popitem(last=False)
+
+
+def _remember_failure(key: Hashable, error: Exception) -> None:
+    ttl = get_settings().indicator_error_ttl
+    if ttl > 0 and not isinstance(error, MemoryBudgetExceededError):
+        with _lock:
+            _failures[key] = (error, time.monotonic() + ttl)
+
+
+def _raise_if_failed(key: Hashable) -> None:
+    """Re-raise the remembered failure for `key`, if it has not expired."""
+    with _lock:
+        entry = _failures.get(key)
+        if entry is None:
+            return
+        error, expires = entry
+        if time.monotonic() >= expires:
+            del _failures[key]
+            return
+    # A fresh instance of the same type, so routers map it to the same status
+    try:
+        fresh = type(error)(*error.args)
+    except Exception:
+        fresh = Exception(str(error))
+    raise fresh
+
+
+def _cached_series(key: Hashable) -> Optional[pd.Series]:
+    with _lock:
+        cached = _series.get(key)
+        if cached is not None:
+            _series.move_to_end(key)
+        return cached
+
+
+def _symbol_lock(symbol: str) -> threading.Lock:
+    with _lock:
+        lock = _symbol_locks.get(symbol)
+        if lock is None:
+            lock = _symbol_locks[symbol] = threading.Lock()
+        return lock
+
+
+def get_indicator_series(
+    symbol: Annotated[str, "ticker symbol"],
+    indicator: Annotated[str, "technical indicator name"],
+) -> pd.Series:
+    """
+    Get an indicator over the full price history, indexed by trading date.
+
+    Series are cached per (symbol, indicator, data version). Indicators that
+    stockstats derives alongside the requested one (e.g. macds/macdh with
+    macd) are cached from the same computation. A failed load or computation
+    is re-raised from cache for `indicator_error_ttl` seconds.
+    """
+    from stockstats import wrap
+
+    if indicator not in SUPPORTED_INDICATORS:
+        raise ValueError(
+            f"Indicator {indicator} is not supported. Please choose from: {list(SUPPORTED_INDICATORS)}"
+        )
+
+    symbol = symbol.upper()
+    version = price_version(symbol)
+    key = (symbol, indicator, version)
+    cached = _cached_series(key)
+    if cached is not None:
+        return cached
+    _raise_if_failed((symbol, version))
+    _raise_if_failed(key)
+
+    with _symbol_lock(symbol):
+        # Another request may have finished (or failed) while this one waited
+        cached = _cached_series(key)
+        if cached is not None:
+            return cached
+        _raise_if_failed((symbol, version))
+        _raise_if_failed(key)
+
+        try:
+            vendor, data = fetch_prices(symbol)
+            if data.empty:
+                raise Exception(f"No price data available for symbol '{symbol}'")
+        except Exception as e:
+            _remember_failure((symbol, version), e)
+            raise
+        # `version` describes the routed vendor's data; series from a fallback
+        # vendor are served but not cached under it
+        store = _store if vendor == get_settings().vendors.indicators else (lambda key, series: None)
+        try:
+            with get_memory_budget().reserve(estimate_frame_bytes(len(data)), f"{indicator} for {symbol}"):
+                with stage(WRAP):
+                    df = wrap(data)
+                del data
+                with stage(INDICATOR_COMPUTE):
+                    dates = pd.DatetimeIndex(pd.to_datetime(df["Date"]), name="Date")
+                    # Build the index's lookup engine now, while only this thread
+                    # sees it: pandas fills it lazily and not thread-safely, and
+                    # concurrent first lookups can report a unique index as not
+                    dates.is_unique
+                    df[indicator]  # trigger stockstats to calculate the indicator
+
+                    result = None
+                    for column in SUPPORTED_INDICATORS:
+                        if column in df.columns:
+                            values = downcast_float32(df[column].to_numpy(dtype="float64"))
+                            series = pd.Series(values, index=dates, name=column)
+                            store((symbol, column, version), series)
+                            if column == indicator:
+                                result = series
+                # Release the stockstats intermediates before the reservation ends
+                del df
+        except Exception as e:
+            _remember_failure(key, e)
+            raise
+    return result
+
+
+def get_indicator_range(
+    symbol: Annotated[str, "ticker symbol"],
+    indicator: Annotated[str, "technical indicator name"],
+    start_date: Annotated[Optional[str], "Start date in yyyy-mm-dd format (inclusive)"] = None,
+    end_date: Annotated[Optional[str], "End date in yyyy-mm-dd format (inclusive)"] = None,
+) -> pd.Series:
+    """Slice of an indicator series for trading days in [start_date, end_date]."""
+    series = get_indicator_series(symbol, indicator)
+    return series.loc[start_date:end_date]
+
+
+def _format_value(value: float) -> str:
+    return "N/A" if value != value else str(value)
+
+
+def get_indicator_value(
+    symbol: Annotated[str, "ticker symbol"],
+    indicator: Annotated[str, "technical indicator name"],
+    curr_date: Annotated[str, "date in yyyy-mm-dd format"],
+) -> str:
+    """Indicator value on one date ("N/A" while warming up, NOT_TRADING_DAY if the market was closed)."""
+    return get_indicator_window(symbol, indicator, curr_date, 0)[0][1]
+
+
+def window_days(
+    curr_date: Annotated[str, "last date in yyyy-mm-dd format"],
+    look_back_days: Annotated[int, "calendar days before curr_date to include"] = 0,
+    look_back_sessions: Annotated[Optional[int], "trading sessions to include instead of calendar days"] = None,
+) -> pd.DatetimeIndex:
+    """Dates of a lookback window, newest first: calendar days, or trading sessions only."""
+    curr_date_dt = datetime.strptime(curr_date, "%Y-%m-%d")
+    if look_back_sessions is not None:
+        return get_calendar().lookback(curr_date_dt, look_back_sessions)[::-1]
+    return pd.date_range(end=curr_date_dt, periods=look_back_days + 1, freq="D")[::-1]
+
+
+def get_indicator_window(
+    symbol: Annotated[str, "ticker symbol"],
+    indicator: Annotated[str, "technical indicator name"],
+    curr_date: Annotated[str, "last date in yyyy-mm-dd format"],
+    look_back_days: Annotated[int, "calendar days before curr_date to include"],
+    look_back_sessions: Annotated[Optional[int], "trading sessions to include instead of calendar days"] = None,
+) -> List[Tuple[str, str]]:
+    """
+    (date, value) for each day of the window (see window_days), newest
+    first, looked up by index in the cached series. Days the exchange was
+    closed (per the trading calendar) get NOT_TRADING_DAY; sessions missing
+    from the price history (not loaded yet) get "N/A".
+    """
+    days = window_days(curr_date, look_back_days, look_back_sessions)
+    series = get_indicator_series(symbol, indicator)
+
+    positions = series.index.get_indexer(days)
+    sessions = get_calendar().is_session(days)
+    values = series.to_numpy(dtype="float64")
+    return [
+        (
+            day,
+            _format_value(values[position]) if position >= 0
+            else "N/A" if is_session
+            else NOT_TRADING_DAY,
+        )
+        for day, position, is_session in zip(days.strftime("%Y-%m-%d"), positions.tolist(), sessions.tolist())
+    ]
+
+
+def cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {
+            "series": len(_series),
+            "max_series": _cache_size(),
+            "failures": len(_failures),
+            # Index arrays are shared by series computed together, so this is an upper bound
+            "bytes": sum(series.nbytes + series.index.nbytes for series in _series.values()),
+        }
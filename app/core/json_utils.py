@@ -3,9 +3,19 @@ JSON utilities for converting data to structured JSON format
 """
 import pandas as pd
 import io
-from typing import Dict, List, Any
+import re
+from typing import Dict, List, Any, Tuple
 
+from app.core.profiling import JSON_UTILS, timed
+from app.models.results import ColumnarTable, DataFrameTable, IndicatorValues, CompactJSONResponse
 
+
+def _strip_header_lines(csv_string: str) -> str:
+    lines = csv_string.split('\n')
+    return '\n'.join(line for line in lines if not line.startswith('#'))
+
+
+@timed(JSON_UTILS)
 def csv_to_json(csv_string: str, remove_header_lines: bool = True) -> List[Dict[str, Any]]:
     """
     Convert CSV string to list of dictionaries (JSON format)
@@ -19,9 +29,7 @@ def csv_to_json(csv_string: str, remove_header_lines: bool = True) -> List[Dict[
     """
     if remove_header_lines:
         # Remove header comment lines
-        lines = csv_string.split('\n')
-        csv_lines = [line for line in lines if not line.startswith('#')]
-        csv_string = '\n'.join(csv_lines)
+        csv_string = _strip_header_lines(csv_string)
     
     # Read CSV into DataFrame
     df = pd.read_csv(io.StringIO(csv_string))
@@ -30,6 +38,39 @@ def csv_to_json(csv_string: str, remove_header_lines: bool = True) -> List[Dict[
     return df.to_dict('records')
 
 
+@timed(JSON_UTILS)
+def csv_to_table(csv_string: str, remove_header_lines: bool = True) -> ColumnarTable:
+    """
+    Convert CSV string to a ColumnarTable (no per-row dicts)
+    
+    Args:
+        csv_string: CSV formatted string
+        remove_header_lines: Remove comment lines starting with #
+        
+    Returns:
+        ColumnarTable with one list per CSV column
+    """
+    if remove_header_lines:
+        csv_string = _strip_header_lines(csv_string)
+    
+    df = pd.read_csv(io.StringIO(csv_string))
+    return ColumnarTable(df.columns, [df[col].tolist() for col in df.columns])
+
+
+@timed(JSON_UTILS)
+def dataframe_to_table(df) -> DataFrameTable:
+    """
+    Wrap pandas DataFrame (or Series) for CompactJSONResponse, index included
+    
+    Columns are encoded to JSON whole (see encode_array) when the response is
+    rendered: datetimes as ISO strings like dataframe_to_json, NaN/NaT as null.
+    """
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    return DataFrameTable(df)
+
+
+@timed(JSON_UTILS)
 def dataframe_to_json(df: pd.DataFrame) -> List[Dict[str, Any]]:
     """
     Convert pandas DataFrame to list of dictionaries
@@ -52,6 +93,7 @@ def dataframe_to_json(df: pd.DataFrame) -> List[Dict[str, Any]]:
     return df_reset.to_dict('records')
 
 
+@timed(JSON_UTILS)
 def financial_statement_to_json(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Convert financial statement DataFrame to structured JSON
@@ -90,26 +132,19 @@ def financial_statement_to_json(df: pd.DataFrame) -> Dict[str, Any]:
     return result
 
 
-def parse_indicator_string(indicator_string: str) -> Dict[str, Any]:
-    """
-    Parse technical indicator string format into structured JSON
-    
-    Args:
-        indicator_string: String with format "## indicator values...\n\ndate: value\n..."
-        
-    Returns:
-        Dictionary with dates, values, and description
-    """
-    import re
-    
+INDICATOR_TEXT_VALUES = ("N/A", "N/A: Not a trading day (weekend or holiday)")
+
+
+def _parse_indicator_lines(indicator_string: str) -> Tuple[str, List[str], List[Any], str]:
+    """Split an indicator string into header, parallel date/value lists and description"""
     lines = indicator_string.strip().split('\n')
     
     # Regex pattern to match date format YYYY-MM-DD at the start of a line before colon
     date_line_pattern = re.compile(r'^(\d{4}-\d{2}-\d{2}):\s*(.+)$')
     
-    # Extract header and description
     header = ""
     description = ""
+    dates = []
     values = []
     
     in_description = False
@@ -127,29 +162,55 @@ def parse_indicator_string(indicator_string: str) -> Dict[str, Any]:
             
             if date_match and not in_description:
                 # This is a proper date:value line
-                date_str = date_match.group(1)
                 value_str = date_match.group(2).strip()
                 
                 # Try to convert value to float if possible
                 try:
-                    if value_str not in ["N/A", "N/A: Not a trading day (weekend or holiday)"]:
+                    if value_str not in INDICATOR_TEXT_VALUES:
                         value = float(value_str)
                     else:
                         value = value_str
                 except ValueError:
                     value = value_str
                 
-                values.append({
-                    "date": date_str,
-                    "value": value
-                })
+                dates.append(date_match.group(1))
+                values.append(value)
             else:
                 # This is description text
                 in_description = True
                 description += line + " "
     
+    return header, dates, values, description.strip()
+
+
+@timed(JSON_UTILS)
+def parse_indicator_string(indicator_string: str) -> Dict[str, Any]:
+    """
+    Parse technical indicator string format into structured JSON
+    
+    Args:
+        indicator_string: String with format "## indicator values...\n\ndate: value\n..."
+        
+    Returns:
+        Dictionary with dates, values, and description
+    """
+    header, dates, values, description = _parse_indicator_lines(indicator_string)
+    return {
+        "header": header,
+        "values": IndicatorValues(dates, values).to_records(),
+        "description": description
+    }
+
+
+@timed(JSON_UTILS)
+def parse_indicator_values(indicator_string: str) -> Dict[str, Any]:
+    """
+    Parse technical indicator string like parse_indicator_string, but keep the
+    values as a compact IndicatorValues instead of one dict per date
+    """
+    header, dates, values, description = _parse_indicator_lines(indicator_string)
     return {
         "header": header,
-        "values": values,
-        "description": description.strip()
+        "values": IndicatorValues(dates, values),
+        "description": description
     }
@@ -0,0 +1,197 @@
+"""
+Local data vendor
+Serves price history, indicators and dividends fully offline from CSV files in
+the data directory. The directory is scanned once into an index of
+symbol -> available files/date ranges and rescanned only when its contents
+change, so new files are picked up without a restart.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Annotated, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import get_settings
+from .profiling import CACHE_READ, timed
+
+PRICE_FILE_PATTERN = re.compile(
+    r"^(?P<symbol>.+?)-YFin-data-(?P<start>\d{4}-\d{2}-\d{2})-(?P<end>\d{4}-\d{2}-\d{2})\.csv$"
+)
+DIVIDEND_FILE_PATTERN = re.compile(r"^(?P<symbol>.+?)-dividends\.csv$")
+
+# Parsed frames kept in memory, keyed by (path, mtime_ns)
+FRAME_CACHE_SIZE = 32
+
+
+class LocalDataNotFoundError(Exception):
+    """Raised when the data directory has no file for the requested symbol."""
+
+
+@dataclass(frozen=True)
+class LocalFile:
+    """A price history file and the date range encoded in its name."""
+
+    path: str
+    symbol: str
+    start_date: str
+    end_date: str
+
+    def covers(self, start_date: Optional[str], end_date: Optional[str]) -> bool:
+        return (start_date is None or self.start_date <= start_date) and (
+            end_date is None or self.end_date >= end_date
+        )
+
+
+class LocalDataIndex:
+    """Index of the price and dividend files available in a data directory."""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._prices: Dict[str, List[LocalFile]] = {}
+        self._dividends: Dict[str, str] = {}
+        self._scanned_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> None:
+        """Rescan the directory if its contents changed since the last scan."""
+        try:
+            mtime = os.stat(self.data_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if not force and mtime == self._scanned_mtime:
+            return
+
+        prices: Dict[str, List[LocalFile]] = {}
+        dividends: Dict[str, str] = {}
+        if mtime is not None:
+            with os.scandir(self.data_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    match = PRICE_FILE_PATTERN.match(entry.name)
+                    if match:
+                        symbol = match.group("symbol").upper()
+                        prices.setdefault(symbol, []).append(
+                            LocalFile(entry.path, symbol, match.group("start"), match.group("end"))
+                        )
+                        continue
+                    match = DIVIDEND_FILE_PATTERN.match(entry.name)
+                    if match:
+                        dividends[match.group("symbol").upper()] = entry.path
+
+        for files in prices.values():
+            # Most recent data first, widest range first among equal end dates
+            files.sort(key=lambda f: (f.end_date, -int(f.start_date.replace("-", ""))), reverse=True)
+
+        with self._lock:
+            self._prices = prices
+            self._dividends = dividends
+            self._scanned_mtime = mtime
+
+    def symbols(self) -> List[str]:
+        self.refresh()
+        return sorted(self._prices)
+
+    def price_files(self, symbol: str) -> List[LocalFile]:
+        self.refresh()
+        return list(self._prices.get(symbol.upper(), []))
+
+    def best_price_file(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Optional[LocalFile]:
+        """Most recent file covering [start_date, end_date], else the most recent file."""
+        files = self.price_files(symbol)
+        for local_file in files:
+            if local_file.covers(start_date, end_date):
+                return local_file
+        return files[0] if files else None
+
+    def dividend_file(self, symbol: str) -> Optional[str]:
+        self.refresh()
+        return self._dividends.get(symbol.upper())
+
+    def describe(self) -> Dict[str, List[Tuple[str, str]]]:
+        """symbol -> list of (start_date, end_date) available."""
+        self.refresh()
+        return {
+            symbol: [(f.start_date, f.end_date) for f in files]
+            for symbol, files in self._prices.items()
+        }
+
+
+_indexes: Dict[str, LocalDataIndex] = {}
+_frames: "OrderedDict[Tuple[str, int], pd.DataFrame]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_index() -> LocalDataIndex:
+    """Get the index for the configured data directory."""
+    data_dir = get_settings().data_dir
+    with _lock:
+        index = _indexes.get(data_dir)
+        if index is None:
+            index = _indexes[data_dir] = LocalDataIndex(data_dir)
+    return index
+
+
+@timed(CACHE_READ)
+def _read_csv_cached(path: str, date_column: str) -> pd.DataFrame:
+    mtime = os.stat(path).st_mtime_ns
+    key = (path, mtime)
+    with _lock:
+        frame = _frames.get(key)
+        if frame is not None:
+            _frames.move_to_end(key)
+            return frame.copy()
+
+    frame = pd.read_csv(path)
+    if date_column in frame.columns:
+        frame[date_column] = pd.to_datetime(frame[date_column], utc=True).dt.tz_localize(None)
+
+    with _lock:
+        _frames[key] = frame
+        while len(_frames) > FRAME_CACHE_SIZE:
+            _frames.popitem(last=False)
+    return frame.copy()
+
+
+def load_price_history(
+    symbol: Annotated[str, "ticker symbol"],
+    start_date: Annotated[Optional[str], "Start date in yyyy-mm-dd format"] = None,
+    end_date: Annotated[Optional[str], "End date in yyyy-mm-dd format"] = None,
+) -> pd.DataFrame:
+    """
+    Get price history for a symbol from the local data directory.
+    Returns the full file that best covers the range; callers slice it.
+    """
+    local_file = get_index().best_price_file(symbol, start_date, end_date)
+    if local_file is None:
+        raise LocalDataNotFoundError(
+            f"No local price data for symbol '{symbol.upper()}' in {get_index().data_dir}"
+        )
+    return _read_csv_cached(local_file.path, "Date")
+
+
+def get_history(
+    symbol: Annotated[str, "ticker symbol"],
+    start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
+    end_date: Annotated[str, "End date in yyyy-mm-dd format"],
+) -> pd.DataFrame:
+    """Price history in [start_date, end_date) indexed by Date, like `Ticker.history`."""
+    data = load_price_history(symbol, start_date, end_date).set_index("Date")
+    return data.loc[(data.index >= start_date) & (data.index < end_date)]
+
+
+def get_dividends(symbol: Annotated[str, "ticker symbol"]) -> pd.Series:
+    """Dividend series indexed by Date from `{symbol}-dividends.csv`."""
+    path = get_index().dividend_file(symbol)
+    if path is None:
+        return pd.Series(dtype="float64", name="Dividends")
+    data = _read_csv_cached(path, "Date").set_index("Date")
+    return data["Dividends"] if "Dividends" in data.columns else data.iloc[:, 0]
@@ -0,0 +1,192 @@
+"""
+Memory budget
+Accounting and admission control for the DataFrame pipeline. Each indicator
+computation reserves an estimate of its working set (price frame plus the
+stockstats columns derived from it) before it runs. When the reservations of
+in-flight work would exceed the process budget, new work waits for memory to
+be released (or is rejected), instead of every request growing worker RSS.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Annotated, Iterator, Optional
+
+from .config import get_settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MB = 1024 * 1024
+
+# Working columns of a stockstats frame: OHLCV plus the intermediates derived
+# for the heaviest indicators (MACD, Bollinger, MFI), as 8-byte floats
+STOCKSTATS_WORKING_COLUMNS = 48
+
+QUEUE = "queue"
+REJECT = "reject"
+
+
+class MemoryBudgetExceededError(Exception):
+    """Raised when a computation does not fit in the configured memory budget."""
+
+
+def estimate_frame_bytes(rows: int, columns: int = STOCKSTATS_WORKING_COLUMNS) -> int:
+    """Estimated size of a float64 frame (plus its index)."""
+    return rows * (columns + 1) * 8
+
+
+def _read_status(field: str) -> Optional[int]:
+    """Read a size field (kB) from /proc/self/status; None where unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def process_memory() -> dict:
+    """Current and peak resident set size of this process, in bytes."""
+    current = _read_status("VmRSS")
+    peak = _read_status("VmHWM")
+    if peak is None:
+        try:
+            import resource
+
+            # ru_maxrss is in kB on Linux
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except (ImportError, OSError):
+            pass
+    return {"rss_bytes": current, "rss_peak_bytes": peak}
+
+
+class MemoryBudget:
+    """Byte reservations for in-flight computations against a process budget."""
+
+    def __init__(self, budget_bytes: int, request_limit_bytes: int, mode: str = QUEUE, queue_timeout: float = 30.0):
+        self.budget_bytes = budget_bytes
+        self.request_limit_bytes = request_limit_bytes
+        self.mode = mode
+        self.queue_timeout = queue_timeout
+        self._reserved = 0
+        self._peak = 0
+        self._in_flight = 0
+        self._waiting = 0
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0}
+
+    def _fits(self, nbytes: int) -> bool:
+        # A single computation is always admitted when nothing else is running
+        return self._in_flight == 0 or self._reserved + nbytes <= self.budget_bytes
+
+    @contextmanager
+    def reserve(
+        self,
+        nbytes: Annotated[int, "estimated working set in bytes"],
+        label: Annotated[str, "what the memory is for (error messages)"] = "computation",
+    ) -> Iterator[None]:
+        """Hold `nbytes` of the budget for the duration of the block."""
+        if getattr(self._local, "held", False):
+            # Nested call on the same thread: already accounted by the outer reservation
+            yield
+            return
+
+        if self.request_limit_bytes and nbytes > self.request_limit_bytes:
+            with self._cond:
+                self._stats["rejected"] += 1
+            raise MemoryBudgetExceededError(
+                f"{label} needs ~{nbytes // MB} MB, over the per-request limit of {self.request_limit_bytes // MB} MB"
+            )
+
+        with self._cond:
+            if self.budget_bytes and not self._fits(nbytes):
+                if self.mode == REJECT:
+                    self._stats["rejected"] += 1
+                    raise MemoryBudgetExceededError(f"Memory budget exhausted, {label} rejected")
+                self._stats["queued"] += 1
+                self._waiting += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while not self._fits(nbytes):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["rejected"] += 1
+                            raise MemoryBudgetExceededError(
+                                f"Memory budget exhausted, {label} timed out after {self.queue_timeout:g}s in queue"
+                            )
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._stats["admitted"] += 1
+            self._reserved += nbytes
+            self._in_flight += 1
+            self._peak = max(self._peak, self._reserved)
+
+        self._local.held = True
+        try:
+            yield
+        finally:
+            self._local.held = False
+            with self._cond:
+                self._reserved -= nbytes
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                budget_bytes=self.budget_bytes,
+                request_limit_bytes=self.request_limit_bytes,
+                mode=self.mode,
+                reserved_bytes=self._reserved,
+                reserved_peak_bytes=self._peak,
+                in_flight=self._in_flight,
+                waiting=self._waiting,
+            )
+        stats.update(process_memory())
+        return stats
+
+
+def downcast_float32(
+    values: Annotated["np.ndarray", "float64 values"],
+    rtol: Annotated[Optional[float], "allowed relative error, None for the configured memory_float32_rtol"] = None,
+) -> "np.ndarray":
+    """
+    Return `values` as float32 when that keeps every value within `rtol`
+    (0 means exactly representable), otherwise unchanged.
+    """
+    import numpy as np
+
+    if rtol is None:
+        rtol = get_settings().memory_float32_rtol
+    if rtol < 0 or values.dtype != np.float64:
+        return values
+    narrow = values.astype(np.float32)
+    with np.errstate(over="ignore", invalid="ignore"):
+        if np.allclose(narrow.astype(np.float64), values, rtol=rtol, atol=0.0, equal_nan=True):
+            return narrow
+    return values
+
+
+_budget: Optional[MemoryBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_memory_budget() -> MemoryBudget:
+    """Get the process-wide memory budget, built from config on first use."""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                settings = get_settings()
+                _budget = MemoryBudget(
+                    budget_bytes=int(settings.memory_budget_mb * MB),
+                    request_limit_bytes=int(settings.request_memory_limit_mb * MB),
+                    mode=settings.memory_admission,
+                    queue_timeout=settings.memory_queue_timeout,
+                )
+    return _budget
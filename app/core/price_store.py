@@ -0,0 +1,322 @@
+"""
+Price store
+Loads the daily price history for a symbol once and publishes it as a
+memory-mapped array that every worker process on the host attaches read-only.
+
+Bars are stored raw (as traded). Split and dividend adjustment is applied at
+read time from the corporate actions table, so a new action does not
+invalidate cached bars, and new sessions are appended to the previous
+window's cache instead of re-downloading the full history.
+"""
+import os
+import re
+import threading
+from typing import Annotated, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import get_settings
+from .profiling import CACHE_READ, stage
+from .shared_cache import atomic_write, file_lock, get_index
+from .vendor_gateway import VendorUnavailableError, get_gateway
+from . import corporate_actions
+from .trading_calendar import get_calendar
+
+PRICE_COLUMNS = ("Close", "High", "Low", "Open", "Volume")
+HISTORY_YEARS = 15
+
+PRICE_DTYPE = np.dtype(
+    [("Date", "datetime64[ns]")] + [(col, "float64") for col in PRICE_COLUMNS]
+)
+
+# path -> (inode, mtime_ns, memmap) for segments attached by this process
+_attached: Dict[str, Tuple[int, int, np.ndarray]] = {}
+_attach_lock = threading.Lock()
+
+
+def history_window() -> Tuple[str, str]:
+    """Return the (start, end) dates of the cached history window."""
+    end_date = pd.Timestamp.today()
+    start_date = end_date - pd.DateOffset(years=HISTORY_YEARS)
+    return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+
+def cache_file_path(symbol: str, start_date: str, end_date: str, kind: str = "raw") -> str:
+    """
+    Path of the CSV cache file for a symbol and window. `raw` files hold
+    unadjusted bars; `data` files are the legacy adjusted downloads.
+    """
+    settings = get_settings()
+    return os.path.join(
+        settings.data_cache_dir,
+        f"{symbol}-YFin-{kind}-{start_date}-{end_date}.csv",
+    )
+
+
+def _segment_dir() -> str:
+    settings = get_settings()
+    shm_dir = settings.shared_memory_dir
+    if not shm_dir:
+        if os.path.isdir("/dev/shm"):
+            shm_dir = os.path.join("/dev/shm", "market_data")
+        else:
+            shm_dir = os.path.join(settings.data_cache_dir, "shm")
+    os.makedirs(shm_dir, exist_ok=True)
+    return shm_dir
+
+
+def _segment_path(symbol: str, start_date: str, end_date: str) -> str:
+    return os.path.join(_segment_dir(), f"{symbol}-raw-{start_date}-{end_date}.npy")
+
+
+def publish(
+    symbol: Annotated[str, "ticker symbol"],
+    data: Annotated[pd.DataFrame, "raw price history with a Date column"],
+    start_date: str,
+    end_date: str,
+) -> Optional[np.ndarray]:
+    """
+    Publish price history into a shared segment.
+
+    The segment is written to a temporary file and renamed into place, so
+    workers that already attached the previous version keep a consistent view
+    and pick up the new one on their next lookup.
+    """
+    path = _segment_path(symbol, start_date, end_date)
+    records = np.empty(len(data), dtype=PRICE_DTYPE)
+    records["Date"] = pd.to_datetime(data["Date"]).to_numpy(dtype="datetime64[ns]")
+    for col in PRICE_COLUMNS:
+        if col in data.columns:
+            records[col] = data[col].to_numpy(dtype="float64")
+        else:
+            records[col] = np.nan
+
+    try:
+        with atomic_write(path, suffix=".npy") as tmp_path:
+            np.save(tmp_path, records, allow_pickle=False)
+    except OSError as e:
+        print(f"Error publishing shared price history for {symbol}: {e}")
+        return None
+
+    _prune_segments(symbol, keep=path)
+    return attach(symbol, start_date, end_date)
+
+
+def attach(
+    symbol: Annotated[str, "ticker symbol"],
+    start_date: str,
+    end_date: str,
+) -> Optional[np.ndarray]:
+    """Attach the shared segment for a symbol read-only, or None if absent."""
+    path = _segment_path(symbol, start_date, end_date)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    with _attach_lock:
+        cached = _attached.get(path)
+        if cached is not None and cached[0] == st.st_ino and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        try:
+            records = np.load(path, mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError) as e:
+            print(f"Error attaching shared price history for {symbol}: {e}")
+            return None
+        _attached[path] = (st.st_ino, st.st_mtime_ns, records)
+        return records
+
+
+def _prune_segments(symbol: str, keep: str) -> None:
+    """Remove segments of older windows for a symbol."""
+    shm_dir = _segment_dir()
+    # The full name is matched: a prefix would also catch other tickers (BRK vs BRK-B)
+    pattern = re.compile(re.escape(symbol) + r"-(raw-)?\d{4}-\d{2}-\d{2}-\d{4}-\d{2}-\d{2}\.npy")
+    for name in os.listdir(shm_dir):
+        path = os.path.join(shm_dir, name)
+        if pattern.fullmatch(name) and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            with _attach_lock:
+                _attached.pop(path, None)
+
+
+def records_to_frame(records: np.ndarray) -> pd.DataFrame:
+    """Build a private, writable DataFrame from shared records."""
+    return pd.DataFrame({name: np.array(records[name]) for name in records.dtype.names})
+
+
+def _read_cache(path: str) -> pd.DataFrame:
+    with stage(CACHE_READ):
+        data = pd.read_csv(path)
+        data["Date"] = pd.to_datetime(data["Date"])
+    return data
+
+
+def _download_raw(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Download bars for [start_date, end_date) and convert them to raw prices."""
+    # Refresh actions first so they match the split adjustment Yahoo applies
+    actions = corporate_actions.load_actions(symbol, max_age=0)
+    data = get_gateway().download(
+        symbol,
+        start=start_date,
+        end=end_date,
+        multi_level_index=False,
+        progress=False,
+        auto_adjust=False,
+    )
+    if data.empty:
+        # yf.download reports failures as an empty frame
+        raise VendorUnavailableError(
+            f"No price data returned for {symbol} between {start_date} and {end_date}"
+        )
+    data = data.reset_index()
+    if getattr(data["Date"].dt, "tz", None) is not None:
+        data["Date"] = data["Date"].dt.tz_localize(None)
+    data = data[["Date", *[col for col in PRICE_COLUMNS if col in data.columns]]]
+    return corporate_actions.unadjust_prices(data, actions)
+
+
+# Trading sessions (per the exchange calendar, so holidays never count) a
+# tail download may be missing before it is treated as a failure rather than
+# bars not published yet
+MAX_MISSING_SESSIONS = 3
+
+
+def _load_from_source(symbol: str, start_date: str, end_date: str) -> Tuple[pd.DataFrame, str]:
+    """
+    Read the raw CSV cache for the window. When it is missing, extend the
+    previous window's cache with the new sessions (or download the full window
+    if there is none).
+
+    Returns (data, source): "cache" or "vendor" for current raw bars, "stale"
+    for an older raw cache and "legacy" for an adjusted cache, the last two
+    only while the vendor is unavailable.
+
+    Workers sharing the cache fill it one at a time per symbol; the others
+    wait for the lock and read the file the first one wrote.
+    """
+    settings = get_settings()
+    os.makedirs(settings.data_cache_dir, exist_ok=True)
+    data_file = cache_file_path(symbol, start_date, end_date)
+
+    if os.path.exists(data_file):
+        return _read_cache(data_file), "cache"
+    with file_lock(f"prices-{symbol}"):
+        if os.path.exists(data_file):
+            return _read_cache(data_file), "cache"
+        return _fill_cache(symbol, start_date, end_date, data_file)
+
+
+def _fill_cache(symbol: str, start_date: str, end_date: str, data_file: str) -> Tuple[pd.DataFrame, str]:
+    previous_file = _latest_cache_file(symbol)
+    previous = _read_cache(previous_file) if previous_file else None
+    try:
+        if previous is not None and not previous.empty and previous["Date"].iloc[0] <= pd.Timestamp(start_date) + pd.Timedelta(days=7):
+            # Only the sessions since the previous window are fetched
+            tail_start = previous["Date"].iloc[-1] + pd.Timedelta(days=1)
+            sessions = get_calendar().sessions_in_range(tail_start, pd.Timestamp(end_date) - pd.Timedelta(days=1))
+            data = previous
+            if len(sessions):
+                try:
+                    tail = _download_raw(symbol, tail_start.strftime("%Y-%m-%d"), end_date)
+                    data = pd.concat([previous, tail], ignore_index=True)
+                except VendorUnavailableError:
+                    if len(sessions) > MAX_MISSING_SESSIONS:
+                        raise
+            data = data[data["Date"] >= pd.Timestamp(start_date)].reset_index(drop=True)
+        else:
+            data = _download_raw(symbol, start_date, end_date)
+    except VendorUnavailableError:
+        if previous is not None:
+            print(f"Upstream unavailable, serving stale cache {previous_file} for {symbol}")
+            return previous, "stale"
+        legacy_file = _latest_cache_file(symbol, kind="data")
+        if legacy_file is None:
+            raise
+        print(f"Upstream unavailable, serving stale adjusted cache {legacy_file} for {symbol}")
+        return _read_cache(legacy_file), "legacy"
+
+    # Written aside and renamed so concurrent readers never see a partial file
+    with atomic_write(data_file) as tmp_file:
+        data.to_csv(tmp_file, index=False)
+    get_index().record(symbol, "prices")
+    if previous_file is not None:
+        try:
+            os.remove(previous_file)
+        except OSError:
+            pass
+    return data, "vendor"
+
+
+def _latest_cache_file(symbol: str, kind: str = "raw") -> Optional[str]:
+    """Most recent CSV cache file of a kind for a symbol, whatever its window."""
+    settings = get_settings()
+    prefix = f"{symbol}-YFin-{kind}-"
+    try:
+        names = [
+            name for name in os.listdir(settings.data_cache_dir)
+            if name.startswith(prefix) and name.endswith(".csv")
+        ]
+    except FileNotFoundError:
+        return None
+    if not names:
+        return None
+    # The end date is the last component of the name, so lexical order works
+    return os.path.join(settings.data_cache_dir, max(names))
+
+
+def load_raw_history(
+    symbol: Annotated[str, "ticker symbol"],
+) -> Tuple[pd.DataFrame, bool]:
+    """
+    Get the cached daily bars for a symbol as traded (not adjusted).
+    Returns (data, adjusted); `adjusted` is True only when the vendor is down
+    and the legacy adjusted cache had to be served instead.
+    """
+    settings = get_settings()
+    symbol = symbol.upper()
+    start_date, end_date = history_window()
+
+    if settings.shared_price_store:
+        with stage(CACHE_READ):
+            records = attach(symbol, start_date, end_date)
+            if records is not None:
+                return records_to_frame(records), False
+
+    data, source = _load_from_source(symbol, start_date, end_date)
+    # Stale data is not published so the next request retries the vendor
+    if settings.shared_price_store and source in ("cache", "vendor") and not data.empty:
+        publish(symbol, data, start_date, end_date)
+    return data, source == "legacy"
+
+
+def load_price_history(
+    symbol: Annotated[str, "ticker symbol"],
+    adjustment: Annotated[str, "all (splits and dividends), splits or none"] = corporate_actions.ADJUST_ALL,
+) -> pd.DataFrame:
+    """
+    Get the cached daily price history for a symbol.
+    Returns a DataFrame with Date, Close, High, Low, Open and Volume columns,
+    adjusted at read time from the corporate actions table.
+    """
+    if adjustment not in corporate_actions.ADJUSTMENTS:
+        raise ValueError(
+            f"Unknown adjustment '{adjustment}'. Choose from: {list(corporate_actions.ADJUSTMENTS)}"
+        )
+    symbol = symbol.upper()
+    data, adjusted = load_raw_history(symbol)
+    if adjusted:
+        if adjustment != corporate_actions.ADJUST_ALL:
+            raise VendorUnavailableError(
+                f"Unadjusted prices for {symbol} are not cached and the upstream vendor is unavailable"
+            )
+        return data
+    if adjustment == corporate_actions.ADJUST_NONE:
+        return data
+    return corporate_actions.adjust_prices(
+        data, corporate_actions.load_actions(symbol), adjustment
+    )
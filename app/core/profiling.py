@@ -0,0 +1,265 @@
+"""
+Request profiling
+Opt-in per-request stage timings. A request sent with `X-Debug-Profile`
+(accepted only when `debug_profile_enabled`, and with a matching
+`debug_profile_token` if one is set) records the time spent in each internal
+stage (vendor fetch, cache read, stockstats wrap, indicator compute,
+json_utils formatting, serialization) and gets the breakdown back in a
+`Server-Timing` header. A sampled share of profiled requests also runs under
+cProfile; dumps of the slowest are kept in `debug_profile_dir`.
+
+Stages are cheap no-ops for requests that are not profiled.
+"""
+import cProfile
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Annotated, Callable, Dict, Iterator, List, Optional
+
+from .config import get_settings
+
+PROFILE_HEADER = b"x-debug-profile"
+
+# Stage names, in Server-Timing order
+VENDOR_FETCH = "vendor_fetch"
+CACHE_READ = "cache_read"
+WRAP = "wrap"
+INDICATOR_COMPUTE = "indicator_compute"
+JSON_UTILS = "json_utils"
+SERIALIZE = "serialize"
+STAGES = (VENDOR_FETCH, CACHE_READ, WRAP, INDICATOR_COMPUTE, JSON_UTILS, SERIALIZE)
+
+
+class RequestProfile:
+    """Stage timings of one request, shared by every thread working on it."""
+
+    def __init__(self, cprofile: bool = False):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}  # name -> [seconds, calls]
+        self.cprofile = cprofile
+        self.profilers: Dict[int, cProfile.Profile] = {}
+        self._depth: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def enter_thread(self) -> None:
+        """Start cProfile on this thread for the outermost stage (threadpool work)."""
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self._depth.get(ident, 0)
+            self._depth[ident] = depth + 1
+            if depth or (ident in self.profilers and self.profilers[ident] is None):
+                return
+            profiler = self.profilers.get(ident)
+            if profiler is None:
+                profiler = self.profilers[ident] = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active on this thread; time the stages only
+            with self._lock:
+                self.profilers[ident] = None
+
+    def exit_thread(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self._depth[ident] -= 1
+            if self._depth[ident]:
+                return
+            profiler = self.profilers.get(ident)
+        if profiler is not None:
+            profiler.disable()
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Render the breakdown as a Server-Timing header value (durations in ms)."""
+        parts = []
+        names = [name for name in STAGES if name in self.stages]
+        names += sorted(name for name in self.stages if name not in STAGES)
+        for name in names:
+            seconds, calls = self.stages[name]
+            parts.append(f'{name};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"')
+        parts.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("request_profile", default=None)
+
+
+def current() -> Optional[RequestProfile]:
+    """The profile of the request being handled, None when it is not profiled."""
+    return _current.get()
+
+
+@contextmanager
+def stage(name: Annotated[str, "stage name, one of STAGES"]) -> Iterator[None]:
+    """Time a block as `name` for the current profiled request (no-op otherwise)."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    if profile.cprofile:
+        profile.enter_thread()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - started)
+        if profile.cprofile:
+            profile.exit_thread()
+
+
+def timed(name: Annotated[str, "stage name, one of STAGES"]) -> Callable[[Callable], Callable]:
+    """Decorator form of `stage` for whole functions."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Bind `func` to the current request's profile, for work submitted to a
+    ThreadPoolExecutor (which, unlike run_in_threadpool, does not copy context).
+    """
+    profile = _current.get()
+    if profile is None:
+        return func
+
+    def run(*args, **kwargs):
+        token = _current.set(profile)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
+
+
+def _dump_name(total_ms: float, method: str, path: str) -> str:
+    route = "".join(c if c.isalnum() else "_" for c in path.strip("/"))[:80]
+    # Zero-padded duration first so the slowest dumps sort last
+    return f"profile-{int(total_ms):08d}ms-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{method}-{route}.prof"
+
+
+def _write_dump(profile: RequestProfile, total_ms: float, method: str, path: str) -> Optional[str]:
+    """Write the merged cProfile stats and keep only the slowest `debug_profile_max_dumps`."""
+    import pstats
+
+    profilers = [p for p in profile.profilers.values() if p is not None]
+    if not profilers:
+        return None
+    settings = get_settings()
+    directory = settings.debug_profile_dir
+    os.makedirs(directory, exist_ok=True)
+
+    stats = None
+    for profiler in profilers:
+        try:
+            if stats is None:
+                stats = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+        except TypeError:
+            # Profiler that never recorded a call
+            continue
+    if stats is None:
+        return None
+    name = _dump_name(total_ms, method, path)
+    stats.dump_stats(os.path.join(directory, name))
+
+    dumps = sorted(f for f in os.listdir(directory) if f.startswith("profile-") and f.endswith(".prof"))
+    for old in dumps[:-settings.debug_profile_max_dumps]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except FileNotFoundError:
+            pass
+    return name if name in dumps[-settings.debug_profile_max_dumps:] else None
+
+
+# Responses sent as they are produced rather than buffered for the timing header
+STREAMING_CONTENT_TYPES = (b"text/event-stream", b"application/x-ndjson")
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it with `X-Debug-Profile` (when allowed by config)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _requested(self, scope) -> bool:
+        settings = get_settings()
+        if not settings.debug_profile_enabled:
+            return False
+        value = dict(scope["headers"]).get(PROFILE_HEADER)
+        if value is None:
+            return False
+        token = settings.debug_profile_token
+        return not token or value.decode("latin-1") == token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        profile = RequestProfile(cprofile=random.random() < settings.debug_profile_sample_rate)
+        token = _current.set(profile)
+        start_message = {}
+        body_parts: List[bytes] = []
+        passthrough = False
+
+        # The response is buffered so the header can carry the whole request's
+        # timings, except streams (SSE, NDJSON), which may never end
+        async def send_wrapper(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if content_type.startswith(STREAMING_CONTENT_TYPES):
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message.update(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body_parts.append(message.get("body", b""))
+
+        try:
+            if profile.cprofile:
+                profile.enter_thread()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if profile.cprofile:
+                    profile.exit_thread()
+        finally:
+            _current.reset(token)
+
+        if passthrough:
+            return
+        total = time.perf_counter() - profile.started
+        headers = list(start_message.get("headers", []))
+        headers.append((b"server-timing", profile.server_timing(total).encode("latin-1")))
+        if profile.cprofile and total * 1000 >= settings.debug_profile_dump_ms:
+            dump = _write_dump(profile, total * 1000, scope["method"], scope["path"])
+            if dump is not None:
+                headers.append((b"x-debug-profile-dump", dump.encode("latin-1")))
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": b"".join(body_parts), "more_body": False})
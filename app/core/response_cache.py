@@ -0,0 +1,284 @@
+"""
+Response cache
+ASGI middleware that caches serialized GET responses keyed by normalized
+route + query parameters, emits ETag/Cache-Control headers and answers
+If-None-Match with 304. TTLs follow data mutability: responses about a past
+date or a closed historical range never change, today's data changes intraday.
+Adjusted prices and indicators are the exception: a new dividend or split
+changes their past values, so they are keyed on the symbol's corporate actions
+version and clients revalidate them instead of treating them as immutable.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from .config import get_settings
+from . import profiling
+
+API_PREFIX = "/api/v1/"
+
+# Query parameters that name the last date covered by a response, per route family
+END_DATE_PARAMS = ("date", "end", "end_date")
+
+IMMUTABLE = "immutable"
+INTRADAY = "intraday"
+DEFAULT = "default"
+
+
+def classify(path: str, params: Dict[str, str]) -> Optional[str]:
+    """
+    Mutability class of a GET response, or None if it must not be cached.
+
+    - immutable: the response only covers dates strictly before today
+    - intraday: the response includes today's (still changing) data
+    - default: snapshot data (info, fundamentals, dividends, splits, ...)
+    """
+    if not path.startswith(API_PREFIX):
+        return None
+    if path == API_PREFIX + "indicators/list":
+        return IMMUTABLE
+
+    family = path[len(API_PREFIX):].split("/", 1)[0]
+    if family == "stream":
+        return None
+    if family in ("indicators", "stock") and not path.endswith(("/info", "/dividends", "/splits")):
+        today = date.today().isoformat()
+        for name in END_DATE_PARAMS:
+            value = params.get(name)
+            if value is not None:
+                if path.endswith("/history"):
+                    # end_date is exclusive for history ranges
+                    return IMMUTABLE if value <= today else INTRADAY
+                return IMMUTABLE if value < today else INTRADAY
+        return INTRADAY
+    return DEFAULT
+
+
+def adjusted_symbol(path: str, params: Dict[str, str]) -> Optional[str]:
+    """
+    Symbol whose corporate actions a response is adjusted with (history not
+    requested as traded, indicators), or None.
+    """
+    segments = path.rstrip("/").split("/")
+    if len(segments) < 6 or path == API_PREFIX + "indicators/list":
+        return None
+    family = segments[3]
+    if family == "indicators" or (
+        family == "stock" and segments[5] == "history" and params.get("adjustment") != "none"
+    ):
+        return segments[4].upper()
+    return None
+
+
+def normalize_key(path: str, query_string: bytes) -> Tuple[str, Dict[str, str]]:
+    """Normalize route + query into a cache key (symbol upper-cased, params sorted)."""
+    segments = path.rstrip("/").split("/")
+    # /api/v1/{family}/{symbol}/...
+    if len(segments) > 4:
+        segments[4] = segments[4].upper()
+    params = dict(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    key = "/".join(segments) + "?" + urlencode(sorted(params.items()))
+    return key, params
+
+
+class CachedResponse:
+    __slots__ = ("body", "headers", "etag", "expires_at", "cache_control")
+
+    def __init__(self, body: bytes, headers: List[Tuple[bytes, bytes]], etag: str, expires_at: float, cache_control: str):
+        self.body = body
+        self.headers = headers
+        self.etag = etag
+        self.expires_at = expires_at
+        self.cache_control = cache_control
+
+
+class ResponseCache:
+    """Byte-bounded LRU of serialized responses."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def _ttl_and_cache_control(mutability: str, adjusted: bool = False) -> Tuple[int, str]:
+    settings = get_settings()
+    if mutability == IMMUTABLE:
+        ttl = settings.response_cache_immutable_ttl
+        if adjusted:
+            # Kept server-side under the actions version; clients revalidate with the ETag
+            return ttl, f"public, max-age={settings.response_cache_default_ttl}"
+        return ttl, f"public, max-age={ttl}, immutable"
+    if mutability == INTRADAY:
+        ttl = settings.response_cache_intraday_ttl
+    else:
+        ttl = settings.response_cache_default_ttl
+    return ttl, f"public, max-age={ttl}"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _versioned(key: str, symbol: Optional[str]) -> Tuple[str, bytes]:
+    """Cache key and ETag salt: the symbol's corporate actions version for adjusted responses."""
+    if symbol is None:
+        return key, b""
+    from .corporate_actions import actions_version
+
+    version = str(actions_version(symbol))
+    return f"{key}#actions={version}", version.encode("latin-1")
+
+
+class ResponseCacheMiddleware:
+    """Serve cacheable GET responses from memory with conditional GET support."""
+
+    def __init__(self, app, cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.cache = cache or get_response_cache()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not get_settings().response_cache_enabled
+            # Profiled requests measure the real work
+            or profiling.current() is not None
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key, params = normalize_key(scope["path"], scope.get("query_string", b""))
+        mutability = classify(scope["path"], params)
+        if mutability is None:
+            await self.app(scope, receive, send)
+            return
+
+        symbol = adjusted_symbol(scope["path"], params)
+        route_key = key
+        key, _ = _versioned(route_key, symbol)
+
+        request_headers = dict(scope["headers"])
+        if_none_match = request_headers.get(b"if-none-match", b"").decode("latin-1") or None
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.hits += 1
+            await self._send_cached(send, entry, if_none_match, b"HIT")
+            return
+        self.cache.misses += 1
+
+        ttl, cache_control = _ttl_and_cache_control(mutability, symbol is not None)
+        start_message = {}
+        body_parts: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if message["status"] != 200 or not content_type.startswith(b"application/json"):
+                    # Errors and streamed bodies are forwarded untouched
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message.update(message)
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(body_parts)
+            # The request may have fetched the actions table; store under the version it used
+            store_key, store_version = _versioned(route_key, symbol)
+            etag = '"' + hashlib.sha1(body + store_version).hexdigest() + '"'
+            headers = [
+                (name, value)
+                for name, value in start_message.get("headers", [])
+                if name not in (b"content-length", b"etag", b"cache-control")
+            ]
+            cached = CachedResponse(body, headers, etag, time.time() + ttl, cache_control)
+            self.cache.put(store_key, cached)
+            await self._send_cached(send, cached, if_none_match, b"MISS")
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_cached(self, send, entry: CachedResponse, if_none_match: Optional[str], cache_status: bytes):
+        validators = [
+            (b"etag", entry.etag.encode("latin-1")),
+            (b"cache-control", entry.cache_control.encode("latin-1")),
+            (b"x-cache", cache_status),
+        ]
+        if _etag_matches(if_none_match, entry.etag):
+            self.cache.not_modified += 1
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers = entry.headers + validators + [(b"content-length", str(len(entry.body)).encode("latin-1"))]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(get_settings().response_cache_max_bytes)
+    return _cache
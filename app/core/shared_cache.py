@@ -0,0 +1,167 @@
+"""
+Shared cache coordination
+Worker processes (see gunicorn.conf.py) share data_cache_dir. Cache files are
+written aside and renamed into place (`atomic_write`), so a reader in any
+process sees the old or the new file, never a partial one. Cache fills take
+an exclusive file lock (`file_lock`), so one worker downloads a symbol while
+the others wait and read what it wrote. `CacheIndex` records the symbols
+cached and when each dataset was last refreshed, for every worker and for
+the background refresh (see cache_refresh).
+
+Locks use fcntl.flock, which the OS releases when the holder exits. Without
+fcntl (Windows) they are no-ops: run a single worker there.
+"""
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Annotated, Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from .config import get_settings
+
+INDEX_FILE = "cache_index.json"
+
+
+def lock_dir() -> str:
+    return os.path.join(get_settings().data_cache_dir, ".locks")
+
+
+def lock_path(name: Annotated[str, "lock name"]) -> str:
+    return os.path.join(lock_dir(), re.sub(r"[^A-Za-z0-9._-]", "_", name) + ".lock")
+
+
+def acquire(
+    name: Annotated[str, "lock name (one file per name in lock_dir)"],
+    blocking: Annotated[bool, "wait for the lock instead of failing"] = True,
+) -> Optional[int]:
+    """
+    Take the named exclusive lock. Returns the file descriptor holding it (pass
+    it to `release`), or None if `blocking` is False and another holder has it.
+    """
+    os.makedirs(lock_dir(), exist_ok=True)
+    fd = os.open(lock_path(name), os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is None:
+        return fd
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def release(fd: int) -> None:
+    """Release a lock taken with `acquire`."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+@contextmanager
+def file_lock(name: Annotated[str, "lock name, e.g. prices-AAPL"]) -> Iterator[None]:
+    """Hold the named lock for the block, across processes and threads."""
+    fd = acquire(name)
+    try:
+        yield
+    finally:
+        release(fd)
+
+
+@contextmanager
+def atomic_write(
+    path: Annotated[str, "final path"],
+    suffix: Annotated[str, "extension the writer appends, e.g. .npy for np.save"] = "",
+) -> Iterator[str]:
+    """
+    Yield a temporary path next to `path` to write to; it is renamed over
+    `path` when the block succeeds and removed when it fails.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class CacheIndex:
+    """
+    Symbols in the shared cache and when each of their datasets was last
+    refreshed, in `{data_cache_dir}/cache_index.json`. Updates are
+    read-modify-write under a file lock; reads are memoized on the file mtime.
+    """
+
+    def __init__(self, data_cache_dir: str):
+        self.path = os.path.join(data_cache_dir, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._memo: Tuple[Optional[int], Dict[str, Dict[str, float]]] = (None, {})
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if self._memo[0] == mtime_ns:
+                return self._memo[1]
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache index {self.path}: {e}")
+            entries = {}
+        with self._lock:
+            self._memo = (mtime_ns, entries)
+        return entries
+
+    def symbols(self) -> Dict[str, Dict[str, float]]:
+        """symbol -> {dataset: epoch seconds of its last refresh}."""
+        return {symbol: dict(datasets) for symbol, datasets in self._load().items()}
+
+    def refreshed_at(self, symbol: Annotated[str, "ticker symbol"], dataset: Annotated[str, "dataset name"]) -> float:
+        """Epoch seconds of the last refresh of a dataset, 0 if never."""
+        return self._load().get(symbol.upper(), {}).get(dataset, 0.0)
+
+    def record(
+        self,
+        symbol: Annotated[str, "ticker symbol"],
+        dataset: Annotated[str, "dataset name, e.g. prices, actions, fundamentals-annual"],
+        when: Annotated[Optional[float], "epoch seconds, default now"] = None,
+    ) -> None:
+        """Record that a dataset was refreshed (from the vendor, or checked unchanged)."""
+        with file_lock("cache-index"):
+            entries = {name: dict(datasets) for name, datasets in self._load().items()}
+            entries.setdefault(symbol.upper(), {})[dataset] = time.time() if when is None else when
+            try:
+                with atomic_write(self.path) as tmp_path:
+                    with open(tmp_path, "w") as f:
+                        json.dump(entries, f, separators=(",", ":"), sort_keys=True)
+            except OSError as e:
+                print(f"Error updating cache index {self.path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._load()
+        return {"path": self.path, "symbols": len(entries)}
+
+
+_indexes: Dict[str, CacheIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index() -> CacheIndex:
+    """Index of the current data_cache_dir."""
+    data_cache_dir = get_settings().data_cache_dir
+    index = _indexes.get(data_cache_dir)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(data_cache_dir, CacheIndex(data_cache_dir))
+    return index
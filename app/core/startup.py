@@ -0,0 +1,71 @@
+"""
+Startup
+Worker startup timings and the optional background preload of the data
+modules. Routers import pandas/yfinance/stockstats lazily inside their
+handlers, so a worker accepts requests before those are loaded; preloading
+moves that cost off the first request.
+"""
+import importlib
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+# Data modules imported on first use by the routers
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "yfinance",
+    "stockstats",
+    "app.core.y_finance",
+    "app.core.yfin_utils",
+    "app.core.json_utils",
+    "app.core.local_vendor",
+    "app.core.price_store",
+    "app.core.indicators",
+    "app.core.async_yahoo",
+    "app.core.fundamentals_store",
+    "app.core.trading_calendar",
+    "app.services.universe",
+)
+
+# Close enough to interpreter start: app.core is imported before anything heavy
+PROCESS_STARTED = time.perf_counter()
+
+_timings: Dict[str, Optional[float]] = {}
+_preload_thread: Optional[threading.Thread] = None
+
+
+def record(name: str, since: float) -> None:
+    """Record milliseconds elapsed since `since` (a perf_counter value)."""
+    _timings[name] = round((time.perf_counter() - since) * 1000, 1)
+
+
+def preload() -> None:
+    """Import the heavy data modules (run off the event loop)."""
+    started = time.perf_counter()
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            # Optional dependencies (httpx) may be missing
+            print(f"Preload skipped {name}: {e}")
+    if "app.core.trading_calendar" in sys.modules:
+        sys.modules["app.core.trading_calendar"].get_calendar()
+    record("preload_ms", started)
+    print(f"Preloaded data modules in {_timings['preload_ms']} ms")
+
+
+def preload_in_background() -> None:
+    """Start the preload in a daemon thread so startup does not wait for it."""
+    global _preload_thread
+    if _preload_thread is None:
+        _preload_thread = threading.Thread(target=preload, name="preload-imports", daemon=True)
+        _preload_thread.start()
+
+
+def stats() -> dict:
+    result = dict(_timings)
+    result["preload_running"] = _preload_thread is not None and _preload_thread.is_alive()
+    result["heavy_modules_loaded"] = [name for name in HEAVY_MODULES if name in sys.modules]
+    return result
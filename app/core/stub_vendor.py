@@ -0,0 +1,200 @@
+"""
+Stub vendor data
+Deterministic synthetic market data (seeded by symbol) for tests, load tests
+and offline development: daily bars on NYSE sessions, quarterly dividends,
+financial statements, insider transactions, analyst recommendations and
+1-minute bars of the latest session.
+`StubTicker` mimics the subset of yf.Ticker the API uses.
+"""
+import zlib
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .trading_calendar import get_calendar
+
+HISTORY_START = "2000-01-03"
+
+BALANCE_SHEET_ITEMS = ("TotalAssets", "CurrentAssets", "CurrentLiabilities", "TotalDebt", "StockholdersEquity", "CashAndCashEquivalents")
+INCOME_ITEMS = ("TotalRevenue", "GrossProfit", "OperatingIncome", "NetIncome", "DilutedEPS")
+CASHFLOW_ITEMS = ("OperatingCashFlow", "CapitalExpenditure", "FreeCashFlow", "NetIncome")
+
+
+def _seed(symbol: str) -> int:
+    return zlib.crc32(symbol.upper().encode())
+
+
+def synthetic_bars(symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+    """Raw daily bars on NYSE sessions in [start, end), identical for every call with the same symbol."""
+    dates = get_calendar().sessions_in_range(HISTORY_START, pd.Timestamp.today().normalize())
+    rng = np.random.default_rng(_seed(symbol))
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+    spread = close * rng.uniform(0.002, 0.02, len(dates))
+    data = pd.DataFrame(
+        {
+            "Open": close + rng.uniform(-1, 1, len(dates)) * spread,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 50_000_000, len(dates)).astype("float64"),
+        },
+        index=pd.DatetimeIndex(dates, name="Date"),
+    )
+    if start is not None:
+        data = data[data.index >= pd.Timestamp(start)]
+    if end is not None:
+        data = data[data.index < pd.Timestamp(end)]
+    return data
+
+
+EXCHANGE_TZ = "America/New_York"
+SESSION_MINUTES = 390
+
+
+def synthetic_intraday(symbol: str, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    1-minute bars of the latest session up to `now`, starting from the
+    previous session's close. The last bar's close changes every second.
+    """
+    now = pd.Timestamp.now(tz=EXCHANGE_TZ) if now is None else now.tz_convert(EXCHANGE_TZ)
+    daily = synthetic_bars(symbol)
+    session = daily.index[-1]
+    opens_at = pd.Timestamp(session).tz_localize(EXCHANGE_TZ) + pd.Timedelta(hours=9, minutes=30)
+    minutes = int(min(max((now - opens_at) / pd.Timedelta(minutes=1), 0), SESSION_MINUTES - 1)) + 1
+    rng = np.random.default_rng(_seed(symbol) + session.toordinal())
+    close = daily["Close"].iloc[-2] * np.exp(np.cumsum(rng.normal(0, 0.001, SESSION_MINUTES)))[:minutes]
+    close[-1] *= np.exp(np.random.default_rng(int(now.timestamp())).normal(0, 0.0005))
+    spread = close * 0.0005
+    return pd.DataFrame(
+        {
+            "Open": np.concatenate(([daily["Close"].iloc[-2]], close[:-1])),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000, 100_000, minutes).astype("float64"),
+        },
+        index=pd.DatetimeIndex(opens_at + pd.to_timedelta(np.arange(minutes), unit="min"), name="Datetime"),
+    )
+
+
+def synthetic_dividends(symbol: str) -> pd.Series:
+    """Quarterly dividends on the first session of Feb/May/Aug/Nov."""
+    dates = get_calendar().sessions_in_range(HISTORY_START, pd.Timestamp.today().normalize())
+    months = pd.Series(dates).groupby([dates.year, dates.month]).first()
+    ex_dates = pd.DatetimeIndex([d for d in months if d.month in (2, 5, 8, 11)], name="Date")
+    amount = 0.1 + (_seed(symbol) % 50) / 100
+    return pd.Series(amount, index=ex_dates, name="Dividends")
+
+
+def synthetic_statement(symbol: str, items, freq: str) -> pd.DataFrame:
+    """Statement with raw line item keys as rows and period ends (newest first) as columns."""
+    periods = 4 if freq == "yearly" else 5
+    ends = pd.date_range(end=pd.Timestamp.today().normalize(), periods=periods, freq="A" if freq == "yearly" else "Q")[::-1]
+    rng = np.random.default_rng(_seed(symbol) + len(items))
+    scale = 1e9 * (1 + _seed(symbol) % 100)
+    return pd.DataFrame(rng.uniform(0.05, 1.0, (len(items), periods)) * scale, index=list(items), columns=ends)
+
+
+def _pretty(data: pd.DataFrame) -> pd.DataFrame:
+    from yfinance.utils import camel2title
+
+    data = data.copy()
+    data.index = camel2title(data.index, sep=" ", acronyms=["EBIT", "EBITDA", "EPS", "NI"])
+    return data
+
+
+class StubTicker:
+    """Subset of yf.Ticker used by the API, backed by synthetic data."""
+
+    def __init__(self, symbol: str):
+        self.ticker = symbol.upper()
+
+    def history(self, start=None, end=None, period=None, interval="1d", actions=True, auto_adjust=True, **kwargs) -> pd.DataFrame:
+        if interval != "1d":
+            return synthetic_intraday(self.ticker)
+        data = synthetic_bars(self.ticker, start, end)
+        dividends = synthetic_dividends(self.ticker)
+        data["Dividends"] = dividends.reindex(data.index, fill_value=0.0)
+        data["Stock Splits"] = 0.0
+        if not actions:
+            data = data.drop(columns=["Dividends", "Stock Splits"])
+        return data
+
+    @property
+    def actions(self) -> pd.DataFrame:
+        dividends = synthetic_dividends(self.ticker)
+        return pd.DataFrame({"Dividends": dividends, "Stock Splits": 0.0})
+
+    @property
+    def dividends(self) -> pd.Series:
+        return synthetic_dividends(self.ticker)
+
+    @property
+    def info(self) -> dict:
+        close = float(synthetic_bars(self.ticker)["Close"].iloc[-1])
+        return {
+            "symbol": self.ticker,
+            "shortName": f"{self.ticker} Inc.",
+            "longName": f"{self.ticker} Incorporated",
+            "sector": "Technology",
+            "industry": "Software",
+            "country": "United States",
+            "website": f"https://{self.ticker.lower()}.example.com",
+            "currentPrice": close,
+            "marketCap": int(close * 1e9),
+            "trailingPE": 25.0,
+            "dividendYield": 0.5,
+        }
+
+    def get_balance_sheet(self, pretty=False, freq="yearly", **kwargs) -> pd.DataFrame:
+        data = synthetic_statement(self.ticker, BALANCE_SHEET_ITEMS, freq)
+        return _pretty(data) if pretty else data
+
+    def get_income_stmt(self, pretty=False, freq="yearly", **kwargs) -> pd.DataFrame:
+        data = synthetic_statement(self.ticker, INCOME_ITEMS, freq)
+        return _pretty(data) if pretty else data
+
+    def get_cashflow(self, pretty=False, freq="yearly", **kwargs) -> pd.DataFrame:
+        data = synthetic_statement(self.ticker, CASHFLOW_ITEMS, freq)
+        return _pretty(data) if pretty else data
+
+    balance_sheet = property(lambda self: self.get_balance_sheet(pretty=True))
+    quarterly_balance_sheet = property(lambda self: self.get_balance_sheet(pretty=True, freq="quarterly"))
+    income_stmt = property(lambda self: self.get_income_stmt(pretty=True))
+    quarterly_income_stmt = property(lambda self: self.get_income_stmt(pretty=True, freq="quarterly"))
+    financials = income_stmt
+    cashflow = property(lambda self: self.get_cashflow(pretty=True))
+    quarterly_cashflow = property(lambda self: self.get_cashflow(pretty=True, freq="quarterly"))
+
+    @property
+    def insider_transactions(self) -> pd.DataFrame:
+        rng = np.random.default_rng(_seed(self.ticker))
+        rows = 50
+        shares = rng.integers(100, 100_000, rows)
+        return pd.DataFrame({
+            "Shares": shares,
+            "Value": shares * 150.0,
+            "URL": "",
+            "Text": "Sale at price 150.00 per share.",
+            "Insider": [f"INSIDER {i % 7}" for i in range(rows)],
+            "Position": "Officer",
+            "Transaction": "",
+            "Start Date": pd.date_range(end=pd.Timestamp.today().normalize(), periods=rows, freq="W"),
+            "Ownership": "D",
+        })
+
+    @property
+    def recommendations(self) -> pd.DataFrame:
+        rng = np.random.default_rng(_seed(self.ticker))
+        votes = rng.integers(0, 20, (4, 5))
+        return pd.DataFrame(votes, columns=["strongBuy", "buy", "hold", "sell", "strongSell"]).assign(
+            period=["0m", "-1m", "-2m", "-3m"]
+        )[["period", "strongBuy", "buy", "hold", "sell", "strongSell"]]
+
+
+def stub_download(symbol: str, start=None, end=None, auto_adjust=True, **kwargs) -> pd.DataFrame:
+    """`yf.download` equivalent: bars plus Adj Close (no splits in the stub data)."""
+    data = synthetic_bars(symbol, start, end)
+    data["Adj Close"] = data["Close"]
+    return data
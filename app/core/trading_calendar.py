@@ -0,0 +1,169 @@
+"""
+Trading calendar
+NYSE sessions built offline from holiday rules (no data fetch), so windows can
+be counted in trading sessions and holidays told apart from missing data.
+Sessions are held as a sorted datetime64[D] array and looked up with
+searchsorted; the array is built once and extended when a date falls outside it.
+"""
+import threading
+from typing import Annotated, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from pandas.tseries.offsets import DateOffset
+
+FIRST_YEAR = 1990
+
+DateLike = Union[str, pd.Timestamp, np.datetime64]
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE closures: recurring holidays plus one-off closings."""
+
+    rules = [
+        # A Saturday New Year's Day is not observed on the Friday before
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        Holiday(
+            "Martin Luther King Jr. Day", month=1, day=1, start_date="1998-01-01",
+            offset=DateOffset(weekday=0, weeks=2),  # third Monday of January
+        ),
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+# Unscheduled closings (national days of mourning, 9/11, Hurricane Sandy)
+SPECIAL_CLOSINGS = (
+    "1994-04-27",
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+    "2004-06-11",
+    "2007-01-02",
+    "2012-10-29", "2012-10-30",
+    "2018-12-05",
+    "2025-01-09",
+)
+
+
+def _day(value: DateLike) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+class TradingCalendar:
+    """Session lookups over a precomputed array of NYSE trading days."""
+
+    def __init__(self, last_year: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._build(last_year or pd.Timestamp.today().year + 2)
+
+    def _build(self, last_year: int) -> None:
+        start, end = pd.Timestamp(FIRST_YEAR, 1, 1), pd.Timestamp(last_year, 12, 31)
+        holidays = NYSEHolidayCalendar().holidays(start, end)
+        holidays = holidays.union(pd.DatetimeIndex(SPECIAL_CLOSINGS))
+        weekdays = pd.bdate_range(start, end)
+        self.holidays = holidays[holidays.dayofweek < 5].values.astype("datetime64[D]")
+        self.sessions = weekdays.difference(holidays).values.astype("datetime64[D]")
+        self.last_year = last_year
+
+    def _covering(self, *days: np.datetime64) -> None:
+        """Extend the calendar when a date lies past its last year."""
+        latest = max(days).astype(object).year
+        if latest > self.last_year:
+            with self._lock:
+                if latest > self.last_year:
+                    self._build(latest + 2)
+
+    def is_session(self, dates: Annotated[DateLike, "date, or array-like of dates"]) -> Union[bool, np.ndarray]:
+        """Whether each date is a trading session (vectorized over arrays/indexes)."""
+        if np.ndim(dates) == 0:
+            return bool(self.is_session([dates])[0])
+        days = pd.DatetimeIndex(dates).values.astype("datetime64[D]")
+        if not len(days):
+            return np.zeros(0, dtype=bool)
+        self._covering(days.max())
+        sessions = self.sessions
+        positions = np.searchsorted(sessions, days)
+        found = positions < len(sessions)
+        found[found] = sessions[positions[found]] == days[found]
+        return found
+
+    def sessions_in_range(
+        self,
+        start: Annotated[DateLike, "first date (inclusive)"],
+        end: Annotated[DateLike, "last date (inclusive)"],
+    ) -> pd.DatetimeIndex:
+        """Trading sessions in [start, end]."""
+        first, last = _day(start), _day(end)
+        self._covering(last)
+        sessions = self.sessions
+        window = sessions[np.searchsorted(sessions, first):np.searchsorted(sessions, last, side="right")]
+        return pd.DatetimeIndex(window.astype("datetime64[ns]"), name="Date")
+
+    def holidays_in_range(
+        self,
+        start: Annotated[DateLike, "first date (inclusive)"],
+        end: Annotated[DateLike, "last date (inclusive)"],
+    ) -> pd.DatetimeIndex:
+        """Weekday market closures in [start, end]."""
+        first, last = _day(start), _day(end)
+        self._covering(last)
+        window = self.holidays[(self.holidays >= first) & (self.holidays <= last)]
+        return pd.DatetimeIndex(window.astype("datetime64[ns]"), name="Date")
+
+    def lookback(
+        self,
+        end: Annotated[DateLike, "last date of the window (inclusive)"],
+        sessions: Annotated[int, "number of sessions"],
+    ) -> pd.DatetimeIndex:
+        """The last `sessions` trading sessions on or before `end`, oldest first."""
+        last = _day(end)
+        self._covering(last)
+        stop = np.searchsorted(self.sessions, last, side="right")
+        window = self.sessions[max(0, stop - sessions):stop]
+        return pd.DatetimeIndex(window.astype("datetime64[ns]"), name="Date")
+
+    def previous_session(self, date: Annotated[DateLike, "reference date"], inclusive: bool = True) -> pd.Timestamp:
+        """Latest session on (when inclusive) or before `date`."""
+        day = _day(date)
+        self._covering(day)
+        position = np.searchsorted(self.sessions, day, side="right" if inclusive else "left") - 1
+        if position < 0:
+            raise ValueError(f"No trading session on or before {pd.Timestamp(day).date()}")
+        return pd.Timestamp(self.sessions[position])
+
+    def next_session(self, date: Annotated[DateLike, "reference date"], inclusive: bool = True) -> pd.Timestamp:
+        """Earliest session on (when inclusive) or after `date`."""
+        day = _day(date)
+        self._covering(day + 14)
+        position = np.searchsorted(self.sessions, day, side="left" if inclusive else "right")
+        return pd.Timestamp(self.sessions[position])
+
+
+_calendar: Optional[TradingCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar() -> TradingCalendar:
+    """Get the process-wide trading calendar, built on first use."""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = TradingCalendar()
+    return _calendar
@@ -1,7 +1,7 @@
 import os
 import json
 import pandas as pd
-from datetime import date, timedelta, datetime
+from datetime import date, datetime
 from typing import Annotated
 
 SavePathType = Annotated[str, "File path to save data. If None, data is not saved."]
@@ -27,13 +27,10 @@ def decorate_all_methods(decorator):
 
 
 def get_next_weekday(date):
+    """Next trading session on or after `date` (exchange holidays included, not just weekends)."""
+    from .trading_calendar import get_calendar
 
     if not isinstance(date, datetime):
         date = datetime.strptime(date, "%Y-%m-%d")
 
-    if date.weekday() >= 5:
-        days_to_add = 7 - date.weekday()
-        next_weekday = date + timedelta(days=days_to_add)
-        return next_weekday
-    else:
-        return date
+    return get_calendar().next_session(date).to_pydatetime()
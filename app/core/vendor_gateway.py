@@ -0,0 +1,414 @@
+"""
+Vendor gateway
+Single entry point for every upstream Yahoo Finance call. Enforces a global
+token-bucket rate limit, caps concurrency, retries with jittered exponential
+backoff and opens a circuit breaker on sustained failure, serving the last
+good response while the circuit is open.
+
+With several worker processes the token bucket is shared through a file in
+the shared cache's lock directory, and each worker gets its share of the
+concurrency cap, so the configured limits hold for the whole host.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Annotated, Any, Awaitable, Callable, Hashable, Optional
+
+from .config import get_settings
+from .profiling import VENDOR_FETCH, stage
+from . import shared_cache
+
+
+class VendorUnavailableError(Exception):
+    """Raised when the upstream vendor cannot serve a request and no cached data exists."""
+
+
+# Errors caused by bad arguments are not worth retrying
+NON_RETRYABLE_ERRORS = (ValueError, KeyError, TypeError, AttributeError)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if available. Returns 0, or the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait for a token without blocking the event loop."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state (tokens, last refill time) is kept in a lock file
+    and updated under its lock, so every process on the host draws from it.
+    """
+
+    STATE_BYTES = 64
+
+    def __init__(self, rate: float, capacity: float, name: str = "vendor-rate-limit"):
+        super().__init__(rate, capacity)
+        self.name = name
+
+    def _take(self) -> float:
+        with self._lock:
+            fd = shared_cache.acquire(self.name)
+            try:
+                now = time.time()
+                try:
+                    tokens, updated = map(float, os.pread(fd, self.STATE_BYTES, 0).split())
+                except ValueError:
+                    # New (empty) lock file: start full
+                    tokens, updated = self.capacity, now
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                os.pwrite(fd, f"{tokens!r} {now!r}".encode("ascii").ljust(self.STATE_BYTES), 0)
+                return wait
+            finally:
+                shared_cache.release(fd)
+
+    async def acquire_async(self) -> None:
+        """Wait for a token; the file lock and I/O run in a worker thread, off the event loop."""
+        while True:
+            wait = await asyncio.to_thread(self._take)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures, half-opens after
+    `reset_timeout`. While half-open a single probe call is admitted; everyone
+    else is turned away until that probe succeeds or fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def _current_state(self) -> str:
+        # Caller holds self._lock
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN:
+                return False
+            if state == self.HALF_OPEN:
+                # A probe that never reported back (e.g. cancelled while
+                # queued) is given up after another reset_timeout
+                now = time.monotonic()
+                if self._probing and now - self._probe_started < self.reset_timeout:
+                    return False
+                self._probing = True
+                self._probe_started = now
+            return True
+
+    def release(self) -> None:
+        """Give up an admitted probe without a verdict (bad arguments, cancellation)."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class VendorGateway:
+    """Rate-limited, retrying, circuit-broken executor for upstream calls."""
+
+    def __init__(
+        self,
+        rate_limit: float = 5.0,
+        burst: int = 10,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        fallback_size: int = 512,
+        shared_rate_limit: bool = False,
+    ):
+        self.bucket = SharedTokenBucket(rate_limit, burst) if shared_rate_limit else TokenBucket(rate_limit, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._max_concurrency = max_concurrency
+        self._async_semaphores: dict = {}
+        self._fallback: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._fallback_size = fallback_size
+        self._fallback_lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "upstream_requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "served_stale": 0,
+            "rejected": 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _remember(self, key: Hashable, value: Any) -> None:
+        with self._fallback_lock:
+            self._fallback[key] = value
+            self._fallback.move_to_end(key)
+            while len(self._fallback) > self._fallback_size:
+                self._fallback.popitem(last=False)
+
+    def _stale(self, key: Hashable, error: str) -> Any:
+        with self._fallback_lock:
+            if key in self._fallback:
+                self._count("served_stale")
+                return self._fallback[key]
+        self._count("rejected")
+        raise VendorUnavailableError(error)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(
+        self,
+        key: Annotated[Optional[Hashable], "cache key for the stale fallback, None to disable"],
+        func: Callable[..., Any],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """Run `func(*args, **kwargs)` against the upstream vendor."""
+        self._count("calls")
+        if not self.breaker.allow():
+            return self._stale(key, "Upstream vendor unavailable (circuit open)")
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+                time.sleep(self._backoff(attempt - 1))
+                if not self.breaker.allow():
+                    break
+            with stage(VENDOR_FETCH):
+                self.bucket.acquire()
+                with self._semaphore:
+                    self._count("upstream_requests")
+                    try:
+                        result = func(*args, **kwargs)
+                    except NON_RETRYABLE_ERRORS:
+                        self.breaker.release()
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        self._count("failures")
+                        self.breaker.record_failure()
+                        continue
+            self.breaker.record_success()
+            if key is not None:
+                self._remember(key, result)
+            return result
+
+        return self._stale(key, f"Upstream vendor unavailable: {last_error}")
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to the loop that uses them
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self._max_concurrency)
+        return semaphore
+
+    async def acall(
+        self,
+        key: Annotated[Optional[Hashable], "cache key for the stale fallback, None to disable"],
+        coro_func: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """Async counterpart of `call` for coroutine-based upstream fetches."""
+        self._count("calls")
+        if not self.breaker.allow():
+            return self._stale(key, "Upstream vendor unavailable (circuit open)")
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+                await asyncio.sleep(self._backoff(attempt - 1))
+                if not self.breaker.allow():
+                    break
+            with stage(VENDOR_FETCH):
+                await self.bucket.acquire_async()
+                async with self._async_semaphore():
+                    self._count("upstream_requests")
+                    try:
+                        result = await coro_func(*args, **kwargs)
+                    except (*NON_RETRYABLE_ERRORS, asyncio.CancelledError):
+                        self.breaker.release()
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        self._count("failures")
+                        self.breaker.record_failure()
+                        continue
+            self.breaker.record_success()
+            if key is not None:
+                self._remember(key, result)
+            return result
+
+        return self._stale(key, f"Upstream vendor unavailable: {last_error}")
+
+    def ticker(self, symbol: Annotated[str, "ticker symbol"]) -> "GatewayTicker":
+        """Return a yf.Ticker stand-in whose data accessors go through the gateway."""
+        return GatewayTicker(symbol, self)
+
+    def download(self, symbol: Annotated[str, "ticker symbol"], **kwargs) -> Any:
+        """Gateway-routed `yf.download` (no stale fallback; the disk cache covers it)."""
+        import yfinance as yf
+
+        return self.call(None, yf.download, symbol, **kwargs)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["shared_rate_limit"] = isinstance(self.bucket, SharedTokenBucket)
+        stats["max_concurrency"] = self._max_concurrency
+        stats["circuit_state"] = self.breaker.state
+        stats["fallback_entries"] = len(self._fallback)
+        return stats
+
+
+class GatewayTicker:
+    """
+    Proxy for yf.Ticker. Property reads (`.info`, `.quarterly_balance_sheet`,
+    ...) and method calls (`.history(...)`) are executed through the gateway.
+    """
+
+    def __init__(self, symbol: str, gateway: VendorGateway):
+        import yfinance as yf
+
+        self.ticker = symbol.upper()
+        self._gateway = gateway
+        self._yf_ticker = yf.Ticker(self.ticker)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(type(self._yf_ticker), name, None)
+        if attr is not None and callable(attr) and not isinstance(attr, property):
+            method = getattr(self._yf_ticker, name)
+
+            def call(*args, **kwargs):
+                key = (self.ticker, name, args, tuple(sorted(kwargs.items())))
+                return self._gateway.call(key, method, *args, **kwargs)
+
+            return call
+        return self._gateway.call(
+            (self.ticker, name), lambda: getattr(self._yf_ticker, name)
+        )
+
+
+_gateway: Optional[VendorGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> VendorGateway:
+    """Get the process-wide vendor gateway, built from config on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                settings = get_settings()
+                workers = settings.web_concurrency
+                _gateway = VendorGateway(
+                    rate_limit=settings.vendor_rate_limit_per_sec,
+                    burst=settings.vendor_rate_limit_burst,
+                    # Each worker gets its share of the host-wide cap
+                    max_concurrency=max(1, settings.vendor_max_concurrency // workers),
+                    max_retries=settings.vendor_max_retries,
+                    backoff_base=settings.vendor_backoff_base,
+                    backoff_max=settings.vendor_backoff_max,
+                    failure_threshold=settings.vendor_circuit_failure_threshold,
+                    reset_timeout=settings.vendor_circuit_reset_seconds,
+                    fallback_size=settings.vendor_fallback_cache_size,
+                    shared_rate_limit=workers > 1 and shared_cache.fcntl is not None,
+                )
+    return _gateway
+
+
+def get_ticker(symbol: Annotated[str, "ticker symbol"]) -> GatewayTicker:
+    """Shortcut for `get_gateway().ticker(symbol)`."""
+    return get_gateway().ticker(symbol)
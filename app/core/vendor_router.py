@@ -0,0 +1,360 @@
+"""
+Vendor router
+Serves each tool (get_stock_data, get_dividends, get_indicators,
+get_fundamentals, get_quote) from its vendor chain in settings.vendor_chains: the local
+files first where they can answer exactly, then the vendor routed by
+tool_vendors/data_vendors, then the configured fallbacks. The latency and
+error rate of every (tool, vendor) pair are tracked as moving averages, and
+remote vendors that are much slower or failing are tried after the others.
+
+Vendors are adapters with one method per dataset; a vendor without the
+method (or without an implementation at all) is skipped.
+"""
+import random
+import threading
+import time
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+from .config import LOCAL, get_settings
+from .vendor_gateway import VendorUnavailableError
+
+# Tool -> vendor adapter method
+TOOL_METHODS = {
+    "get_stock_data": "history",
+    "get_dividends": "dividends",
+    "get_indicators": "prices",
+    "get_fundamentals": "statements",
+    "get_quote": "quote",
+}
+
+# Errors caused by the request itself; another vendor would not do better
+REQUEST_ERRORS = (ValueError,)
+
+
+class VendorMiss(Exception):
+    """Raised by a vendor that has no data for the request (not counted as a failure)."""
+
+
+def _statements(symbol: str, ticker: Any, frequency: str) -> Dict[str, Any]:
+    """The three raw statements from a yfinance-like ticker (a miss when all are empty)."""
+    from .fundamentals_store import STATEMENT_GETTERS, YF_FREQUENCY
+
+    statements = {
+        name: getattr(ticker, getter)(pretty=False, freq=YF_FREQUENCY[frequency])
+        for name, getter in STATEMENT_GETTERS.items()
+    }
+    if all(data is None or data.empty for data in statements.values()):
+        raise VendorMiss(f"No {frequency} statements for symbol '{symbol.upper()}'")
+    return statements
+
+
+def _session_quote(symbol: str, bars: Any) -> Dict[str, Any]:
+    """Latest price and the session's bar so far, from a yfinance-like 1-minute history."""
+    if bars is None or bars.empty:
+        raise VendorMiss(f"No intraday quote for symbol '{symbol.upper()}'")
+    bars = bars.dropna(subset=["Close"])
+    last = bars.index[-1]
+    session = bars[bars.index.normalize() == last.normalize()]
+    return {
+        "time": last.isoformat(),
+        "session": last.strftime("%Y-%m-%d"),
+        "open": float(session["Open"].iloc[0]),
+        "high": float(session["High"].max()),
+        "low": float(session["Low"].min()),
+        "price": float(session["Close"].iloc[-1]),
+        "volume": float(session["Volume"].sum()),
+    }
+
+
+class LocalVendor:
+    """Files indexed in data_dir (see local_vendor)."""
+
+    name = LOCAL
+
+    def history(self, symbol: str, start_date: str, end_date: str):
+        from . import local_vendor
+
+        local_file = local_vendor.get_index().best_price_file(symbol, start_date, end_date)
+        if local_file is None:
+            raise VendorMiss(f"No local price data for symbol '{symbol.upper()}'")
+        # In front of a remote vendor only a file covering the whole range
+        # answers, so partial files never shadow the vendor
+        if get_settings().vendors.stock_data != LOCAL and not local_file.covers(start_date, end_date):
+            raise VendorMiss(f"No local file covers {symbol.upper()} {start_date}..{end_date}")
+        return local_vendor.get_history(symbol, start_date, end_date)
+
+    def dividends(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None):
+        from . import local_vendor
+
+        dividends = local_vendor.get_dividends(symbol)
+        if not dividends.empty:
+            dividends.index = dividends.index.normalize()
+            dividends = dividends.loc[start:end]
+        return dividends
+
+    def prices(self, symbol: str):
+        from . import local_vendor
+
+        try:
+            return local_vendor.load_price_history(symbol)
+        except local_vendor.LocalDataNotFoundError as e:
+            raise VendorMiss(str(e))
+
+
+class YFinanceVendor:
+    """Yahoo Finance through the vendor gateway (and the persisted caches in front of it)."""
+
+    name = "yfinance"
+
+    def history(self, symbol: str, start_date: str, end_date: str):
+        from .vendor_gateway import get_ticker
+
+        data = get_ticker(symbol).history(start=start_date, end=end_date)
+        if data.index.tz is not None:
+            data.index = data.index.tz_localize(None)
+        return data
+
+    def dividends(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None):
+        from . import corporate_actions
+
+        return corporate_actions.get_dividends(symbol, start, end)
+
+    def prices(self, symbol: str):
+        from .price_store import load_price_history
+
+        return load_price_history(symbol)
+
+    def statements(self, symbol: str, frequency: str):
+        from .vendor_gateway import get_ticker
+
+        ticker = get_ticker(symbol)
+        return _statements(symbol, ticker, frequency)
+
+    def quote(self, symbol: str):
+        from .vendor_gateway import get_ticker
+
+        return _session_quote(symbol, get_ticker(symbol).history(period="1d", interval="1m"))
+
+
+class StubVendor:
+    """Deterministic synthetic data (see stub_vendor), with optional delay and failures for tests."""
+
+    name = "stub"
+
+    def _call(self) -> None:
+        settings = get_settings()
+        if settings.stub_vendor_latency_ms:
+            time.sleep(settings.stub_vendor_latency_ms / 1000)
+        if settings.stub_vendor_error_rate and random.random() < settings.stub_vendor_error_rate:
+            raise VendorUnavailableError("Stub vendor failure (stub_vendor_error_rate)")
+
+    def history(self, symbol: str, start_date: str, end_date: str):
+        from .stub_vendor import StubTicker
+
+        self._call()
+        return StubTicker(symbol).history(start=start_date, end=end_date)
+
+    def dividends(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None):
+        from .stub_vendor import synthetic_dividends
+
+        self._call()
+        return synthetic_dividends(symbol.upper()).loc[start:end]
+
+    def prices(self, symbol: str):
+        from .stub_vendor import synthetic_bars
+
+        self._call()
+        return synthetic_bars(symbol.upper()).reset_index()
+
+    def statements(self, symbol: str, frequency: str):
+        from .stub_vendor import StubTicker
+
+        self._call()
+        return _statements(symbol, StubTicker(symbol), frequency)
+
+    def quote(self, symbol: str):
+        from .stub_vendor import synthetic_intraday
+
+        self._call()
+        return _session_quote(symbol, synthetic_intraday(symbol.upper()))
+
+
+class VendorStats:
+    """Moving averages of one vendor's latency and error rate for one tool."""
+
+    __slots__ = ("calls", "errors", "misses", "latency_ms", "error_rate", "last_error", "last_call")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.misses = 0
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.last_error: Optional[str] = None
+        self.last_call = 0.0
+
+    def current(self, recheck_seconds: float) -> bool:
+        """Whether the averages are recent enough to rank the vendor by."""
+        return time.monotonic() - self.last_call < recheck_seconds
+
+    def record(self, alpha: float, recheck_seconds: float, elapsed_ms: float, failed: bool) -> None:
+        if not self.current(recheck_seconds):
+            # A vendor left unused since it was demoted starts over on its next call
+            self.latency_ms, self.error_rate = None, 0.0
+        self.last_call = time.monotonic()
+        self.calls += 1
+        self.errors += failed
+        self.latency_ms = elapsed_ms if self.latency_ms is None else (1 - alpha) * self.latency_ms + alpha * elapsed_ms
+        self.error_rate = (1 - alpha) * self.error_rate + alpha * failed
+
+    def score(self, error_penalty: float) -> float:
+        return max(self.latency_ms or 0.0, 1.0) * (1 + error_penalty * self.error_rate)
+
+    def to_dict(self, error_penalty: float) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "misses": self.misses,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "score": round(self.score(error_penalty), 1),
+            "last_error": self.last_error,
+        }
+
+
+class VendorRouter:
+    """Runs a tool against its vendor chain, failing over and reordering by observed performance."""
+
+    def __init__(self, vendors: Optional[Dict[str, Any]] = None):
+        self.vendors = vendors if vendors is not None else {
+            vendor.name: vendor for vendor in (LocalVendor(), YFinanceVendor(), StubVendor())
+        }
+        self._stats: Dict[Tuple[str, str], VendorStats] = {}
+        self._lock = threading.Lock()
+        self._warned: set = set()
+
+    def _stat(self, tool: str, vendor: str) -> VendorStats:
+        key = (tool, vendor)
+        stats = self._stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(key, VendorStats())
+        return stats
+
+    def _available(self, tool: str, name: str) -> bool:
+        vendor = self.vendors.get(name)
+        if vendor is not None and hasattr(vendor, TOOL_METHODS[tool]):
+            return True
+        if (tool, name) not in self._warned:
+            self._warned.add((tool, name))
+            print(f"Vendor '{name}' is not available for {tool}; skipping it")
+        return False
+
+    def order(self, tool: Annotated[str, "tool name, a key of TOOL_METHODS"]) -> List[str]:
+        """
+        Vendors to try for a tool. The local files keep their place (they are a
+        cache); remote vendors keep their configured order unless their score
+        is more than vendor_demote_ratio x the best sampled one's. Averages
+        older than vendor_recheck_seconds are ignored, so a demoted vendor gets
+        tried again once in a while.
+        """
+        settings = get_settings()
+        chain = [name for name in settings.vendor_chains.get(tool, ()) if self._available(tool, name)]
+        remote = [name for name in chain if name != LOCAL]
+        scores = {}
+        for name in remote:
+            stats = self._stats.get((tool, name))
+            if stats is not None and stats.calls >= settings.vendor_min_samples and stats.current(settings.vendor_recheck_seconds):
+                scores[name] = stats.score(settings.vendor_error_penalty)
+        if len(scores) > 1:
+            best = max(min(scores.values()), 1.0)
+            demoted = [name for name in remote if scores.get(name, 0.0) > settings.vendor_demote_ratio * best]
+            remote = [name for name in remote if name not in demoted] + sorted(demoted, key=scores.get)
+        return ([LOCAL] if LOCAL in chain else []) + remote
+
+    def fetch_with_vendor(
+        self,
+        tool: Annotated[str, "tool name, a key of TOOL_METHODS"],
+        *args,
+        skip: Tuple[str, ...] = (),
+        **kwargs,
+    ) -> Tuple[str, Any]:
+        """
+        Run the tool on the first vendor of its chain that returns data.
+        Returns (vendor name, result). Empty frames count as a miss, but are
+        returned when every vendor misses. Raises VendorUnavailableError when
+        a vendor failed and none had data, VendorMiss when none had data.
+        """
+        settings = get_settings()
+        method = TOOL_METHODS[tool]
+        empty: Optional[Tuple[str, Any]] = None
+        errors, misses = [], []
+        for name in self.order(tool):
+            if name in skip:
+                continue
+            stats = self._stat(tool, name)
+            started = time.perf_counter()
+            try:
+                result = getattr(self.vendors[name], method)(*args, **kwargs)
+            except VendorMiss as e:
+                with self._lock:
+                    stats.misses += 1
+                misses.append(str(e))
+                continue
+            except REQUEST_ERRORS:
+                raise
+            except Exception as e:
+                with self._lock:
+                    stats.record(
+                        settings.vendor_latency_alpha, settings.vendor_recheck_seconds,
+                        (time.perf_counter() - started) * 1000, True,
+                    )
+                    stats.last_error = f"{type(e).__name__}: {e}"
+                errors.append(f"{name}: {e}")
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if getattr(result, "empty", False):
+                # Reported as no data for this request, not as a slow or failed vendor
+                with self._lock:
+                    stats.misses += 1
+                if empty is None:
+                    empty = (name, result)
+                continue
+            with self._lock:
+                stats.record(settings.vendor_latency_alpha, settings.vendor_recheck_seconds, elapsed_ms, False)
+            return name, result
+        if empty is not None:
+            return empty
+        if errors:
+            raise VendorUnavailableError(f"No vendor could serve {tool} ({'; '.join(errors)})")
+        raise VendorMiss("; ".join(misses) or f"No available vendor for {tool}")
+
+    def fetch(self, tool: Annotated[str, "tool name, a key of TOOL_METHODS"], *args, **kwargs) -> Any:
+        """`fetch_with_vendor` without the vendor name."""
+        return self.fetch_with_vendor(tool, *args, **kwargs)[1]
+
+    def stats(self) -> dict:
+        settings = get_settings()
+        with self._lock:
+            per_tool: Dict[str, dict] = {}
+            for (tool, vendor), stats in sorted(self._stats.items()):
+                per_tool.setdefault(tool, {})[vendor] = stats.to_dict(settings.vendor_error_penalty)
+        return {
+            "chains": {tool: list(chain) for tool, chain in settings.vendor_chains.items() if tool in TOOL_METHODS},
+            "order": {tool: self.order(tool) for tool in TOOL_METHODS},
+            "vendors": per_tool,
+        }
+
+
+_router: Optional[VendorRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> VendorRouter:
+    """Get the process-wide vendor router."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = VendorRouter()
+    return _router
@@ -1,51 +1,85 @@
-from typing import Annotated
+from typing import Annotated, Optional, Tuple
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-import yfinance as yf
-import os
 from .stockstats_utils import StockstatsUtils
+from .vendor_gateway import get_ticker
+from .config import LOCAL
 
-def get_YFin_data_online(
+
+def get_YFin_data(
     symbol: Annotated[str, "ticker symbol of the company"],
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
+    skip: Annotated[Tuple[str, ...], "vendors of the chain not to try"] = (),
 ):
+    """Get stock data from the first vendor of the get_stock_data chain that has it."""
+    from .vendor_router import VendorMiss, get_router
 
     datetime.strptime(start_date, "%Y-%m-%d")
     datetime.strptime(end_date, "%Y-%m-%d")
 
-    # Create ticker object
-    ticker = yf.Ticker(symbol.upper())
-
-    # Fetch historical data for the specified date range
-    data = ticker.history(start=start_date, end=end_date)
+    try:
+        vendor, data = get_router().fetch_with_vendor("get_stock_data", symbol, start_date, end_date, skip=skip)
+    except VendorMiss:
+        vendor, data = None, None
 
-    # Check if data is empty
-    if data.empty:
+    if data is None or data.empty:
         return (
             f"No data found for symbol '{symbol}' between {start_date} and {end_date}"
         )
 
-    # Remove timezone info from index for cleaner output
-    if data.index.tz is not None:
-        data.index = data.index.tz_localize(None)
-
-    # Round numerical values to 2 decimal places for cleaner display
     numeric_columns = ["Open", "High", "Low", "Close", "Adj Close"]
     for col in numeric_columns:
         if col in data.columns:
             data[col] = data[col].round(2)
 
-    # Convert DataFrame to CSV string
     csv_string = data.to_csv()
 
-    # Add header information
     header = f"# Stock data for {symbol.upper()} from {start_date} to {end_date}\n"
     header += f"# Total records: {len(data)}\n"
-    header += f"# Data retrieved on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    if vendor == LOCAL:
+        header += f"# Data served from local store on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    else:
+        header += f"# Data retrieved from {vendor} on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
 
     return header + csv_string
 
+
+def get_YFin_data_store(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
+    end_date: Annotated[str, "End date in yyyy-mm-dd format"],
+    adjustment: Annotated[str, "all (splits and dividends), splits or none"],
+):
+    """Get stock data from the cached price store, adjusted at read time."""
+    from .price_store import load_price_history
+
+    datetime.strptime(start_date, "%Y-%m-%d")
+    datetime.strptime(end_date, "%Y-%m-%d")
+
+    data = load_price_history(symbol, adjustment)
+    if not data.empty:
+        # end_date is exclusive, as for Ticker.history
+        data = data[(data["Date"] >= start_date) & (data["Date"] < end_date)]
+    if data.empty:
+        return (
+            f"No data found for symbol '{symbol}' between {start_date} and {end_date}"
+        )
+
+    data = data.set_index("Date")[["Open", "High", "Low", "Close", "Volume"]]
+    for col in ["Open", "High", "Low", "Close"]:
+        data[col] = data[col].round(2)
+    data["Volume"] = data["Volume"].round().astype("int64")
+
+    csv_string = data.to_csv()
+
+    header = f"# Stock data for {symbol.upper()} from {start_date} to {end_date} (adjustment: {adjustment})\n"
+    header += f"# Total records: {len(data)}\n"
+    header += f"# Data served from price store on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+
+    return header + csv_string
+
+
 def get_stock_stats_indicators_window(
     symbol: Annotated[str, "ticker symbol of the company"],
     indicator: Annotated[str, "technical indicator to get the analysis and report of"],
@@ -53,6 +87,9 @@ def get_stock_stats_indicators_window(
         str, "The current trading date you are trading on, YYYY-mm-dd"
     ],
     look_back_days: Annotated[int, "how many days to look back"],
+    look_back_sessions: Annotated[
+        Optional[int], "how many trading sessions to look back (replaces look_back_days)"
+    ] = None,
 ) -> str:
 
     best_ind_params = {
@@ -133,46 +170,20 @@ def get_stock_stats_indicators_window(
             f"Indicator {indicator} is not supported. Please choose from: {list(best_ind_params.keys())}"
         )
 
+    from .indicators import get_indicator_window
+
     end_date = curr_date
     curr_date_dt = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date_dt - relativedelta(days=look_back_days)
 
-    # Optimized: Get stock data once and calculate indicators for all dates
-    try:
-        indicator_data = _get_stock_stats_bulk(symbol, indicator, curr_date)
-        
-        # Generate the date range we need
-        current_dt = curr_date_dt
-        date_values = []
-        
-        while current_dt >= before:
-            date_str = current_dt.strftime('%Y-%m-%d')
-            
-            # Look up the indicator value for this date
-            if date_str in indicator_data:
-                indicator_value = indicator_data[date_str]
-            else:
-                indicator_value = "N/A: Not a trading day (weekend or holiday)"
-            
-            date_values.append((date_str, indicator_value))
-            current_dt = current_dt - relativedelta(days=1)
-        
-        # Build the result string
-        ind_string = ""
-        for date_str, value in date_values:
-            ind_string += f"{date_str}: {value}\n"
-        
-    except Exception as e:
-        print(f"Error getting bulk stockstats data: {e}")
-        # Fallback to original implementation if bulk method fails
-        ind_string = ""
-        curr_date_dt = datetime.strptime(curr_date, "%Y-%m-%d")
-        while curr_date_dt >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date_dt.strftime("%Y-%m-%d")
-            )
-            ind_string += f"{curr_date_dt.strftime('%Y-%m-%d')}: {indicator_value}\n"
-            curr_date_dt = curr_date_dt - relativedelta(days=1)
+    # One load and computation of the full series, then indexed lookups per day;
+    # failures propagate (and are cached briefly) instead of retrying per day
+    date_values = get_indicator_window(
+        symbol, indicator, curr_date, look_back_days, look_back_sessions
+    )
+    if look_back_sessions is not None and date_values:
+        before = datetime.strptime(date_values[-1][0], "%Y-%m-%d")
+    ind_string = "".join(f"{date_str}: {value}\n" for date_str, value in date_values)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -190,81 +201,18 @@ def _get_stock_stats_bulk(
     curr_date: Annotated[str, "current date for reference"]
 ) -> dict:
     """
-    Optimized bulk calculation of stock stats indicators.
-    Fetches data once and calculates indicator for all available dates.
-    Returns dict mapping date strings to indicator values.
+    Indicator value for every trading date in the price history.
+    Returns dict mapping date strings to indicator values ("N/A" while warming up).
     """
-    from .config import get_config
-    import pandas as pd
-    from stockstats import wrap
-    import os
-    
-    config = get_config()
-    online = config["data_vendors"]["technical_indicators"] != "local"
-    
-    if not online:
-        # Local data path
-        try:
-            data = pd.read_csv(
-                os.path.join(
-                    config.get("data_cache_dir", "data"),
-                    f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-                )
-            )
-            df = wrap(data)
-        except FileNotFoundError:
-            raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
-    else:
-        # Online data fetching with caching
-        today_date = pd.Timestamp.today()
-        curr_date_dt = pd.to_datetime(curr_date)
-        
-        end_date = today_date
-        start_date = today_date - pd.DateOffset(years=15)
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date_str = end_date.strftime("%Y-%m-%d")
-        
-        os.makedirs(config["data_cache_dir"], exist_ok=True)
-        
-        data_file = os.path.join(
-            config["data_cache_dir"],
-            f"{symbol}-YFin-data-{start_date_str}-{end_date_str}.csv",
-        )
-        
-        if os.path.exists(data_file):
-            data = pd.read_csv(data_file)
-            data["Date"] = pd.to_datetime(data["Date"])
-        else:
-            data = yf.download(
-                symbol,
-                start=start_date_str,
-                end=end_date_str,
-                multi_level_index=False,
-                progress=False,
-                auto_adjust=True,
-            )
-            data = data.reset_index()
-            data.to_csv(data_file, index=False)
-        
-        df = wrap(data)
-        df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-    
-    # Calculate the indicator for all rows at once
-    df[indicator]  # This triggers stockstats to calculate the indicator
-    
-    # Create a dictionary mapping date strings to indicator values
-    result_dict = {}
-    for _, row in df.iterrows():
-        date_str = row["Date"]
-        indicator_value = row[indicator]
-        
-        # Handle NaN/None values
-        if pd.isna(indicator_value):
-            result_dict[date_str] = "N/A"
-        else:
-            result_dict[date_str] = str(indicator_value)
-    
-    return result_dict
+    from .indicators import get_indicator_series
+
+    series = get_indicator_series(symbol, indicator)
+    dates = series.index.strftime("%Y-%m-%d").tolist()
+    values = series.to_numpy(dtype="float64").tolist()
+    return {
+        date_str: "N/A" if value != value else str(value)
+        for date_str, value in zip(dates, values)
+    }
 
 
 def get_stockstats_indicator(
@@ -300,7 +248,7 @@ def get_balance_sheet(
 ):
     """Get balance sheet data from yfinance."""
     try:
-        ticker_obj = yf.Ticker(ticker.upper())
+        ticker_obj = get_ticker(ticker)
         
         if freq.lower() == "quarterly":
             data = ticker_obj.quarterly_balance_sheet
@@ -330,7 +278,7 @@ def get_cashflow(
 ):
     """Get cash flow data from yfinance."""
     try:
-        ticker_obj = yf.Ticker(ticker.upper())
+        ticker_obj = get_ticker(ticker)
         
         if freq.lower() == "quarterly":
             data = ticker_obj.quarterly_cashflow
@@ -360,7 +308,7 @@ def get_income_statement(
 ):
     """Get income statement data from yfinance."""
     try:
-        ticker_obj = yf.Ticker(ticker.upper())
+        ticker_obj = get_ticker(ticker)
         
         if freq.lower() == "quarterly":
             data = ticker_obj.quarterly_income_stmt
@@ -388,7 +336,7 @@ def get_insider_transactions(
 ):
     """Get insider transactions data from yfinance."""
     try:
-        ticker_obj = yf.Ticker(ticker.upper())
+        ticker_obj = get_ticker(ticker)
         data = ticker_obj.insider_transactions
         
         if data is None or data.empty:
@@ -1,25 +1,51 @@
 # gets data/stats
 
-import yfinance as yf
 from typing import Annotated, Callable, Any, Optional
 from pandas import DataFrame
 import pandas as pd
 from functools import wraps
 
 from .utils import save_output, SavePathType, decorate_all_methods
+from .vendor_gateway import get_ticker
 
 
 def init_ticker(func: Callable) -> Callable:
-    """Decorator to initialize yf.Ticker and pass it to the function."""
+    """Decorator to initialize a gateway-routed yf.Ticker and pass it to the function."""
 
     @wraps(func)
     def wrapper(symbol: Annotated[str, "ticker symbol"], *args, **kwargs) -> Any:
-        ticker = yf.Ticker(symbol)
+        ticker = get_ticker(symbol)
         return func(ticker, *args, **kwargs)
 
     return wrapper
 
 
+def company_fields(info: Annotated[dict, "Ticker.info"]) -> dict:
+    """Name, industry, sector, country and website from a `.info` dict."""
+    return {
+        "Company Name": info.get("shortName", "N/A"),
+        "Industry": info.get("industry", "N/A"),
+        "Sector": info.get("sector", "N/A"),
+        "Country": info.get("country", "N/A"),
+        "Website": info.get("website", "N/A"),
+    }
+
+
+def majority_vote(recommendations: Annotated[Optional[DataFrame], "Ticker.recommendations"]) -> tuple:
+    """Most common rating in the latest recommendations period and its vote count."""
+    if recommendations is None or recommendations.empty:
+        return None, 0  # No recommendations available
+
+    # Assuming 'period' column exists and needs to be excluded
+    row_0 = recommendations.iloc[0, 1:]  # Exclude 'period' column if necessary
+
+    # Find the maximum voting result
+    max_votes = row_0.max()
+    majority_voting_result = row_0[row_0 == max_votes].index.tolist()
+
+    return majority_voting_result[0], max_votes
+
+
 @decorate_all_methods(init_ticker)
 class YFinanceUtils:
 
@@ -56,15 +82,7 @@ class YFinanceUtils:
     ) -> DataFrame:
         """Fetches and returns company information as a DataFrame."""
         ticker = symbol
-        info = ticker.info
-        company_info = {
-            "Company Name": info.get("shortName", "N/A"),
-            "Industry": info.get("industry", "N/A"),
-            "Sector": info.get("sector", "N/A"),
-            "Country": info.get("country", "N/A"),
-            "Website": info.get("website", "N/A"),
-        }
-        company_info_df = DataFrame([company_info])
+        company_info_df = DataFrame([company_fields(ticker.info)])
         if save_path:
             company_info_df.to_csv(save_path)
             print(f"Company info for {ticker.ticker} saved to {save_path}")
@@ -103,15 +121,4 @@ class YFinanceUtils:
     def get_analyst_recommendations(symbol: Annotated[str, "ticker symbol"]) -> tuple:
         """Fetches the latest analyst recommendations and returns the most common recommendation and its count."""
         ticker = symbol
-        recommendations = ticker.recommendations
-        if recommendations.empty:
-            return None, 0  # No recommendations available
-
-        # Assuming 'period' column exists and needs to be excluded
-        row_0 = recommendations.iloc[0, 1:]  # Exclude 'period' column if necessary
-
-        # Find the maximum voting result
-        max_votes = row_0.max()
-        majority_voting_result = row_0[row_0 == max_votes].index.tolist()
-
-        return majority_voting_result[0], max_votes
+        return majority_vote(ticker.recommendations)
@@ -3,12 +3,26 @@ Market Data API
 A standalone API for financial market data using TradingAgents implementation
 """
 
+import time
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 import os
 
-from app.routers import stock_data, technical, fundamentals, company
+from app.routers import stock_data, technical, fundamentals, company, universe, streaming
+from app.core.config import get_settings
+from app.core.vendor_gateway import get_gateway
+from app.core.response_cache import ResponseCacheMiddleware, get_response_cache
+from app.core.memory_budget import get_memory_budget
+from app.core.profiling import ProfilingMiddleware
+from app.core import startup
+from app.core.cache_refresh import get_refresher
+from app.services.streaming import get_hub
+
+startup.record("app_import_ms", _import_started)
 
 # Create FastAPI app
 app = FastAPI(
@@ -19,6 +33,12 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Cache serialized GET responses (added first so CORS headers are applied per request)
+app.add_middleware(ResponseCacheMiddleware)
+
+# Opt-in X-Debug-Profile stage timings (profiled requests bypass the response cache)
+app.add_middleware(ProfilingMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +53,31 @@ app.include_router(stock_data.router, prefix="/api/v1/stock", tags=["Stock Data"
 app.include_router(technical.router, prefix="/api/v1/indicators", tags=["Technical Indicators"])
 app.include_router(fundamentals.router, prefix="/api/v1/fundamentals", tags=["Fundamentals"])
 app.include_router(company.router, prefix="/api/v1/company", tags=["Company Info"])
+app.include_router(universe.router, prefix="/api/v1/universe", tags=["Universe"])
+app.include_router(streaming.router, prefix="/api/v1/stream", tags=["Streaming"])
+
+@app.on_event("startup")
+async def report_startup():
+    """Log startup timings and optionally warm the data modules in the background"""
+    startup.record("ready_ms", startup.PROCESS_STARTED)
+    print(f"Startup: {startup.stats()}")
+    if get_settings().preload_imports:
+        startup.preload_in_background()
+    # One worker (the leader) refreshes the shared cache in the background
+    get_refresher().start()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Stop live stream polling, close pooled upstream HTTP connections and hand over cache refresh leadership"""
+    import sys
+
+    get_hub().close()
+    get_refresher().stop()
+
+    # Only loaded if a request used the async client
+    async_yahoo = sys.modules.get("app.core.async_yahoo")
+    if async_yahoo is not None:
+        await async_yahoo.close_clients()
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -54,6 +99,28 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """Runtime metrics for the upstream vendor gateway and router, response cache, memory, cache refresh, live streams and startup"""
+    import sys
+
+    memory = get_memory_budget().stats()
+    # Only loaded once a request computed indicators
+    indicators = sys.modules.get("app.core.indicators")
+    memory["indicator_cache"] = indicators.cache_stats() if indicators is not None else None
+    # Only loaded once a request was routed to a vendor
+    vendor_router = sys.modules.get("app.core.vendor_router")
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "vendor_gateway": get_gateway().stats(),
+        "vendor_router": vendor_router.get_router().stats() if vendor_router is not None else None,
+        "response_cache": get_response_cache().stats(),
+        "memory": memory,
+        "cache_refresh": get_refresher().stats(),
+        "streaming": get_hub().stats(),
+        "startup": startup.stats()
+    }
+
 @app.get("/api/v1/indicators/list", tags=["Technical Indicators"])
 async def list_indicators():
     """List all available technical indicators with descriptions"""
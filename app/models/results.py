@@ -0,0 +1,251 @@
+"""
+Compact result models
+Column-oriented containers for tabular results (price history, dividends,
+insider transactions, indicator values). Rows are never materialized as
+per-row dicts: the schema is stored once and values stay in column lists,
+and the JSON encoder writes records straight from the columns.
+"""
+import json
+import math
+from typing import Any, Iterator, List, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+
+from app.core.profiling import SERIALIZE, stage
+
+_dumps = json.JSONEncoder(ensure_ascii=False, allow_nan=False).encode
+
+
+def _encode_value(value: Any) -> str:
+    """Encode one scalar; NaN/inf become null."""
+    if value is None:
+        return "null"
+    if isinstance(value, float):
+        return "null" if math.isnan(value) or math.isinf(value) else float.__repr__(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, str):
+        return _dumps(value)
+    # NumPy scalars and anything else JSON can represent
+    if hasattr(value, "item"):
+        return _encode_value(value.item())
+    return _dumps(value)
+
+
+def encode_column(values: Sequence[Any]) -> List[str]:
+    """Encode a column of scalars to JSON fragments."""
+    return [_encode_value(value) for value in values]
+
+
+class ColumnarTable:
+    """A table stored as one list per column with a shared schema."""
+
+    __slots__ = ("columns", "data")
+
+    def __init__(self, columns: Sequence[str], data: Sequence[Sequence[Any]]):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.data: Tuple[Sequence[Any], ...] = tuple(data)
+
+    def __len__(self) -> int:
+        return len(self.data[0]) if self.data else 0
+
+    def rows(self) -> Iterator[tuple]:
+        return zip(*self.data)
+
+    def to_records(self) -> List[dict]:
+        """Materialize per-row dicts (only for callers that need them)."""
+        return [dict(zip(self.columns, row)) for row in self.rows()]
+
+    def write_json(self, out: List[bytes]) -> None:
+        """Append the JSON array of records to `out` without building intermediate dicts."""
+        if not len(self):
+            out.append(b"[]")
+            return
+        # Non-string column names become string keys, as in DataFrameTable
+        keys = ["{" + _dumps(str(self.columns[0])) + ":"] + [
+            "," + _dumps(str(name)) + ":" for name in self.columns[1:]
+        ]
+        out.append(b"[")
+        separator = ""
+        # Encode row by row straight to UTF-8 so only the output fragments are held
+        for row in self.rows():
+            out.append(
+                (separator + "".join([key + _encode_value(value) for key, value in zip(keys, row)]) + "}").encode("utf-8")
+            )
+            separator = ","
+        out.append(b"]")
+
+    def to_json(self) -> bytes:
+        out: List[bytes] = []
+        self.write_json(out)
+        return b"".join(out)
+
+
+def encode_array(values: Any) -> Any:
+    """
+    Encode a pandas column (Series or Index) to an object array of JSON
+    fragments, one vectorized pass per dtype: numbers via NumPy's shortest
+    repr (same digits as float.__repr__), NaN/inf/NaT as null, datetimes as
+    ISO strings. Other columns encode each distinct value once.
+    """
+    import numpy as np
+    import pandas as pd
+
+    dtype = values.dtype
+    # Nullable extension dtypes (Int64, boolean, ...) take the generic path
+    kind = dtype.kind if isinstance(dtype, np.dtype) else None
+    if kind == "b":
+        return np.where(values.to_numpy(), "true", "false").astype(object)
+    if kind in ("i", "u"):
+        return values.to_numpy().astype(str).astype(object)
+    if kind == "f":
+        numbers = values.to_numpy(dtype="float64")
+        fragments = numbers.astype(str).astype(object)
+        fragments[~np.isfinite(numbers)] = "null"
+        return fragments
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        missing = np.asarray(values.isna())
+        stamps = values.to_numpy() if kind == "M" else None
+        if stamps is not None and (stamps[~missing] == stamps[~missing].astype("datetime64[D]")).all():
+            # Dates only: NumPy formats these in C, same text as pandas
+            text = np.datetime_as_string(stamps, unit="D")
+        else:
+            text = values.astype(str)
+        fragments = '"' + np.asarray(text, dtype=object) + '"'
+        fragments[missing] = "null"
+        return fragments
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    # Missing values get code -1, the trailing null
+    return np.array(encode_column(list(uniques)) + ["null"], dtype=object)[codes]
+
+
+class DataFrameTable:
+    """
+    A DataFrame (index levels first, as columns) encoded to JSON records one
+    column at a time with `encode_array`, never value by value.
+    """
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame: Any):
+        self.frame = frame
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        # Unnamed levels are named as reset_index() names them
+        index = self.frame.index
+        default = ["index"] if index.nlevels == 1 else [f"level_{i}" for i in range(index.nlevels)]
+        names = [name if name is not None else default[i] for i, name in enumerate(index.names)]
+        return tuple(names) + tuple(self.frame.columns)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _arrays(self) -> Iterator[Any]:
+        index = self.frame.index
+        for i in range(index.nlevels):
+            yield index.get_level_values(i)
+        for i in range(self.frame.shape[1]):
+            yield self.frame.iloc[:, i]
+
+    def to_records(self) -> List[dict]:
+        """Materialize per-row dicts (only for callers that need them)."""
+        return json.loads(self.to_json())
+
+    def write_json(self, out: List[bytes]) -> None:
+        """Append the JSON array of records to `out`, built from whole-column fragments."""
+        if not len(self):
+            out.append(b"[]")
+            return
+        rows = None
+        separator = "{"
+        for name, values in zip(self.columns, self._arrays()):
+            fragments = (separator + _dumps(str(name)) + ":") + encode_array(values)
+            rows = fragments if rows is None else rows + fragments
+            separator = ","
+        out.append(b"[" + "},".join(rows.tolist()).encode("utf-8") + b"}]")
+
+    def to_json(self) -> bytes:
+        out: List[bytes] = []
+        self.write_json(out)
+        return b"".join(out)
+
+
+class IndicatorValues:
+    """Parallel date/value lists for an indicator window."""
+
+    __slots__ = ("dates", "values")
+
+    def __init__(self, dates: List[str], values: List[Any]):
+        self.dates = dates
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def to_records(self) -> List[dict]:
+        return [{"date": d, "value": v} for d, v in zip(self.dates, self.values)]
+
+    def _records(self) -> List[bytes]:
+        return [
+            ('{"date":' + _dumps(date) + ',"value":' + value + "}").encode("utf-8")
+            for date, value in zip(self.dates, encode_column(self.values))
+        ]
+
+    def write_json(self, out: List[bytes]) -> None:
+        out.append(b"[" + b",".join(self._records()) + b"]")
+
+    def to_json(self) -> bytes:
+        return b"[" + b",".join(self._records()) + b"]"
+
+    def to_ndjson(self) -> bytes:
+        """One record per line (for streaming responses)."""
+        records = self._records()
+        return b"\n".join(records) + b"\n" if records else b""
+
+
+COMPACT_TYPES = (ColumnarTable, DataFrameTable, IndicatorValues)
+
+
+def _write(content: Any, out: List[bytes]) -> None:
+    if isinstance(content, COMPACT_TYPES):
+        content.write_json(out)
+    elif isinstance(content, dict):
+        separator = b"{"
+        for key, value in content.items():
+            out.append(separator + _dumps(str(key)).encode("utf-8") + b":")
+            _write(value, out)
+            separator = b","
+        out.append(b"}" if content else b"{}")
+    elif isinstance(content, (list, tuple)):
+        separator = b"["
+        for value in content:
+            out.append(separator)
+            _write(value, out)
+            separator = b","
+        out.append(b"]" if content else b"[]")
+    else:
+        out.append(_encode_value(content).encode("utf-8"))
+
+
+def encode(content: Any) -> bytes:
+    """
+    Encode a response envelope to UTF-8 JSON. Compact result types write
+    their records into the same fragment list, which is joined once.
+    """
+    out: List[bytes] = []
+    _write(content, out)
+    return b"".join(out)
+
+
+class CompactJSONResponse(JSONResponse):
+    """
+    JSON response that encodes ColumnarTable / DataFrameTable / IndicatorValues
+    straight from their columns. Returning it from a route bypasses jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with stage(SERIALIZE):
+            return encode(content)
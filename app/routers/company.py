@@ -4,14 +4,50 @@ Endpoints for company information and insider data
 """
 
 from fastapi import APIRouter, HTTPException, Path
-import yfinance as yf
+from starlette.concurrency import run_in_threadpool
 
-from app.core.y_finance import get_insider_transactions
-from app.core.yfin_utils import YFinanceUtils
-from app.core.json_utils import dataframe_to_json
+from app.core.vendor_gateway import VendorUnavailableError
+from app.models.results import CompactJSONResponse
+
+# Data modules are imported inside the handlers to keep worker startup light.
+# The endpoints project from the cached company snapshot (app.services.company),
+# so their upstream loads are shared.
 
 router = APIRouter()
 
+@router.get("/{symbol}/snapshot")
+async def get_company_snapshot(symbol: str = Path(..., description="Stock ticker symbol")):
+    """
+    Get company info, the analyst majority vote and recent insider transactions in one call
+    
+    - **symbol**: Stock ticker symbol (e.g., AAPL, MSFT)
+    
+    Returns: `company_info`, `analyst_recommendations`, the latest
+    `insider_transactions` and the full `info`, loaded concurrently and cached.
+    A part that could not be loaded is null, with the reason under `errors`.
+    """
+    try:
+        from app.services.company import get_snapshot
+        
+        snapshot = await run_in_threadpool(get_snapshot, symbol)
+        
+        if snapshot["company_info"] is None and not snapshot["errors"]:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No company information found for symbol '{symbol}'"
+            )
+        
+        return CompactJSONResponse(snapshot)
+    except HTTPException:
+        raise
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving company snapshot: {str(e)}"
+        )
+
 @router.get("/{symbol}/info")
 async def get_company_info(symbol: str = Path(..., description="Stock ticker symbol")):
     """
@@ -22,9 +58,12 @@ async def get_company_info(symbol: str = Path(..., description="Stock ticker sym
     Returns: Company details including name, sector, industry, country, website, etc.
     """
     try:
-        info = YFinanceUtils.get_company_info(symbol)
+        from app.core.yfin_utils import company_fields
+        from app.services.company import INFO, get_part
+        
+        info = await run_in_threadpool(get_part, symbol, INFO)
         
-        if info.empty:
+        if not info:
             raise HTTPException(
                 status_code=404,
                 detail=f"No company information found for symbol '{symbol}'"
@@ -32,8 +71,12 @@ async def get_company_info(symbol: str = Path(..., description="Stock ticker sym
         
         return {
             "symbol": symbol.upper(),
-            "company_info": info.to_dict('records')[0]
+            "company_info": company_fields(info)
         }
+    except HTTPException:
+        raise
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -50,9 +93,10 @@ async def get_insider_trades(symbol: str = Path(..., description="Stock ticker s
     Returns: Recent insider trading activity including purchases and sales
     """
     try:
-        # Get data directly from yfinance
-        ticker_obj = yf.Ticker(symbol.upper())
-        data = ticker_obj.insider_transactions
+        from app.core.json_utils import dataframe_to_table
+        from app.services.company import INSIDER_TRANSACTIONS, get_part
+        
+        data = await run_in_threadpool(get_part, symbol, INSIDER_TRANSACTIONS)
         
         if data is None or data.empty:
             raise HTTPException(
@@ -60,14 +104,18 @@ async def get_insider_trades(symbol: str = Path(..., description="Stock ticker s
                 detail=f"No insider transactions data found for symbol '{symbol}'"
             )
         
-        # Convert to structured JSON
-        data_json = dataframe_to_json(data)
+        # Convert to a columnar table
+        data_table = dataframe_to_table(data)
         
-        return {
+        return CompactJSONResponse({
             "symbol": symbol.upper(),
-            "total_transactions": len(data_json),
-            "transactions": data_json
-        }
+            "total_transactions": len(data_table),
+            "transactions": data_table
+        })
+    except HTTPException:
+        raise
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -84,7 +132,11 @@ async def get_analyst_recommendations(symbol: str = Path(..., description="Stock
     Returns: Latest analyst recommendations and ratings
     """
     try:
-        recommendation, count = YFinanceUtils.get_analyst_recommendations(symbol)
+        from app.core.yfin_utils import majority_vote
+        from app.services.company import RECOMMENDATIONS, get_part
+        
+        recommendations = await run_in_threadpool(get_part, symbol, RECOMMENDATIONS)
+        recommendation, count = majority_vote(recommendations)
         
         if recommendation is None:
             raise HTTPException(
@@ -97,6 +149,10 @@ async def get_analyst_recommendations(symbol: str = Path(..., description="Stock
             "majority_recommendation": recommendation,
             "vote_count": int(count)
         }
+    except HTTPException:
+        raise
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
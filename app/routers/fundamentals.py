@@ -4,14 +4,148 @@ Endpoints for fundamental financial data
 """
 
 from fastapi import APIRouter, HTTPException, Query, Path
-from typing import Optional
-import yfinance as yf
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from typing import List
 
-from app.core.y_finance import get_balance_sheet, get_income_statement, get_cashflow
-from app.core.json_utils import financial_statement_to_json
+from app.core.config import get_settings
+from app.core.vendor_gateway import VendorUnavailableError
+from app.models.results import CompactJSONResponse, encode
+
+# Data modules are imported inside the handlers to keep worker startup light
 
 router = APIRouter()
 
+
+async def _load_statement(symbol: str, statement: str, frequency: str):
+    """Load a financial statement from the persisted fundamentals store (refreshed on its TTL)"""
+    from app.core import fundamentals_store
+    
+    table = await fundamentals_store.aload_statements(symbol, frequency)
+    return fundamentals_store.to_statement(table, statement)
+
+
+class FundamentalsQueryRequest(BaseModel):
+    """Cross-company fundamentals query"""
+    symbols: List[str] = Field(..., min_length=1, description="Stock ticker symbols")
+    line_items: List[str] = Field(default_factory=list, description="Line item keys (e.g. TotalRevenue, NetIncome)")
+    ratios: List[str] = Field(default_factory=list, description="Derived ratios (see GET /ratios)")
+    frequency: str = Field("quarterly", pattern="^(annual|quarterly)$", description="Data frequency")
+    periods: int = Field(8, ge=1, le=40, description="Most recent reporting periods per symbol")
+
+
+class FundamentalsBatchRequest(BaseModel):
+    """Statements to load for many symbols"""
+    symbols: List[str] = Field(..., min_length=1, description="Stock ticker symbols")
+    statements: List[str] = Field(
+        default_factory=lambda: ["balance_sheet", "income_stmt", "cashflow"],
+        min_length=1,
+        description="Statements: balance_sheet, income_stmt, cashflow",
+    )
+    frequency: str = Field("quarterly", pattern="^(annual|quarterly)$", description="Data frequency")
+
+
+@router.get("/ratios")
+async def list_ratios():
+    """
+    List the derived ratios available to the fundamentals query
+
+    Returns: Ratio names with their numerator and denominator line items
+    """
+    from app.core.fundamentals_store import RATIOS
+    
+    return {
+        "ratios": {
+            name: {"numerator": numerator, "denominator": denominator, "description": description}
+            for name, (numerator, denominator, description) in RATIOS.items()
+        }
+    }
+
+
+@router.post("/query")
+async def query_fundamentals(request: FundamentalsQueryRequest):
+    """
+    Get line items and derived ratios for many symbols in one call
+    
+    - **symbols**: Stock ticker symbols (e.g., ["AAPL", "MSFT"])
+    - **line_items**: Line item keys as in Yahoo's timeseries (e.g., ["TotalRevenue", "NetIncome"])
+    - **ratios**: Derived ratios (e.g., ["net_margin", "debt_to_equity"])
+    - **frequency**: 'annual' or 'quarterly' (default: quarterly)
+    - **periods**: Most recent reporting periods per symbol (default: 8)
+    
+    Returns: One row per symbol and period, newest first, with a column per
+    line item and ratio. Symbols without data are listed in `metadata.errors`.
+    """
+    max_symbols = get_settings().universe_max_symbols
+    if len(request.symbols) > max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many symbols ({len(request.symbols)}); the limit is {max_symbols}"
+        )
+    
+    try:
+        from app.core.fundamentals_store import query_fundamentals as run_query
+        
+        table, metadata = await run_in_threadpool(
+            run_query, request.symbols, request.line_items, request.ratios, request.frequency, request.periods
+        )
+        
+        return CompactJSONResponse({
+            "frequency": request.frequency,
+            "periods": request.periods,
+            "total_rows": len(table),
+            "metadata": metadata,
+            "data": table
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error querying fundamentals: {str(e)}"
+        )
+
+@router.post("/batch")
+async def batch_fundamentals(request: FundamentalsBatchRequest):
+    """
+    Load financial statements for many symbols, streamed back per symbol
+
+    - **symbols**: Stock ticker symbols (e.g., ["AAPL", "MSFT"])
+    - **statements**: Any of balance_sheet, income_stmt, cashflow (default: all three)
+    - **frequency**: 'annual' or 'quarterly' (default: quarterly)
+
+    Returns: Newline-delimited JSON, one line per symbol as soon as it is
+    loaded (`type: result`, with `statements` shaped like /{symbol}/all, or
+    `error` set), then a `type: summary` line. Symbols are fetched
+    UNIVERSE_MAX_WORKERS at a time under the vendor rate limit, and persisted
+    to the fundamentals store, so later per-symbol calls are served locally.
+    """
+    from app.core.fundamentals_store import STATEMENTS
+    from app.services.fundamentals import batch_statements
+
+    max_symbols = get_settings().universe_max_symbols
+    if len(request.symbols) > max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many symbols ({len(request.symbols)}); the limit is {max_symbols}"
+        )
+    unknown = [name for name in request.statements if name not in STATEMENTS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown statements {unknown}. Choose from: {list(STATEMENTS)}")
+
+    async def lines():
+        results = batch_statements(request.symbols, list(dict.fromkeys(request.statements)), request.frequency)
+        try:
+            async for result in results:
+                yield encode(result) + b"\n"
+        finally:
+            # A client that disconnects stops the loads still pending
+            await results.aclose()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/{symbol}/balance-sheet")
 async def get_balance_sheet_data(
     symbol: str = Path(..., description="Stock ticker symbol"),
@@ -26,13 +160,10 @@ async def get_balance_sheet_data(
     Returns: Balance sheet data including assets, liabilities, and equity
     """
     try:
-        # Get data directly from yfinance to convert to JSON
-        ticker_obj = yf.Ticker(symbol.upper())
+        from app.core.json_utils import financial_statement_to_json
         
-        if frequency.lower() == "quarterly":
-            data = ticker_obj.quarterly_balance_sheet
-        else:
-            data = ticker_obj.balance_sheet
+        # Served from the fundamentals store (fetched through the vendor gateway when stale)
+        data = await _load_statement(symbol, "balance_sheet", frequency)
             
         if data.empty:
             raise HTTPException(status_code=404, detail=f"No balance sheet data found for symbol '{symbol}'")
@@ -46,6 +177,8 @@ async def get_balance_sheet_data(
             "periods": list(data_json.keys()),
             "data": data_json
         }
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -66,13 +199,10 @@ async def get_income_statement_data(
     Returns: Income statement data including revenue, expenses, and net income
     """
     try:
-        # Get data directly from yfinance to convert to JSON
-        ticker_obj = yf.Ticker(symbol.upper())
+        from app.core.json_utils import financial_statement_to_json
         
-        if frequency.lower() == "quarterly":
-            data = ticker_obj.quarterly_income_stmt
-        else:
-            data = ticker_obj.income_stmt
+        # Served from the fundamentals store (fetched through the vendor gateway when stale)
+        data = await _load_statement(symbol, "income_stmt", frequency)
             
         if data.empty:
             raise HTTPException(status_code=404, detail=f"No income statement data found for symbol '{symbol}'")
@@ -86,6 +216,8 @@ async def get_income_statement_data(
             "periods": list(data_json.keys()),
             "data": data_json
         }
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -106,13 +238,10 @@ async def get_cashflow_data(
     Returns: Cash flow statement data including operating, investing, and financing activities
     """
     try:
-        # Get data directly from yfinance to convert to JSON
-        ticker_obj = yf.Ticker(symbol.upper())
+        from app.core.json_utils import financial_statement_to_json
         
-        if frequency.lower() == "quarterly":
-            data = ticker_obj.quarterly_cashflow
-        else:
-            data = ticker_obj.cashflow
+        # Served from the fundamentals store (fetched through the vendor gateway when stale)
+        data = await _load_statement(symbol, "cashflow", frequency)
             
         if data.empty:
             raise HTTPException(status_code=404, detail=f"No cash flow data found for symbol '{symbol}'")
@@ -126,6 +255,8 @@ async def get_cashflow_data(
             "periods": list(data_json.keys()),
             "data": data_json
         }
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -146,17 +277,14 @@ async def get_all_fundamentals(
     Returns: All fundamental financial statements (balance sheet, income statement, cash flow)
     """
     try:
-        # Get data directly from yfinance
-        ticker_obj = yf.Ticker(symbol.upper())
+        from app.core import fundamentals_store
+        from app.core.json_utils import financial_statement_to_json
         
-        if frequency.lower() == "quarterly":
-            bs_data = ticker_obj.quarterly_balance_sheet
-            is_data = ticker_obj.quarterly_income_stmt
-            cf_data = ticker_obj.quarterly_cashflow
-        else:
-            bs_data = ticker_obj.balance_sheet
-            is_data = ticker_obj.income_stmt
-            cf_data = ticker_obj.cashflow
+        # One long table holds all three statements
+        table = await fundamentals_store.aload_statements(symbol, frequency)
+        bs_data = fundamentals_store.to_statement(table, "balance_sheet")
+        is_data = fundamentals_store.to_statement(table, "income_stmt")
+        cf_data = fundamentals_store.to_statement(table, "cashflow")
         
         # Convert to structured JSON
         balance_sheet_json = financial_statement_to_json(bs_data) if not bs_data.empty else {}
@@ -179,6 +307,8 @@ async def get_all_fundamentals(
                 "data": cashflow_json
             }
         }
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
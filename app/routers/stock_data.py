@@ -4,12 +4,16 @@ Endpoints for historical stock price data
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 from datetime import datetime
 
-from app.core.y_finance import get_YFin_data_online
-from app.core.yfin_utils import YFinanceUtils
-from app.core.json_utils import csv_to_json, dataframe_to_json
+from app.core.config import LOCAL, get_settings
+from app.core.vendor_gateway import VendorUnavailableError
+from app.models.results import CompactJSONResponse
+
+# Data modules (pandas, yfinance, ...) are imported inside the handlers so that
+# worker startup does not pay for them; see app.core.startup.
 
 router = APIRouter()
 
@@ -17,7 +21,8 @@ router = APIRouter()
 async def get_stock_history(
     symbol: str,
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
-    end_date: str = Query(..., description="End date in YYYY-MM-DD format")
+    end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
+    adjustment: Optional[str] = Query(None, regex="^(all|splits|none)$", description="Serve from the price store adjusted for 'all' (splits and dividends), 'splits' or 'none'")
 ):
     """
     Get historical stock price data for a symbol
@@ -25,31 +30,59 @@ async def get_stock_history(
     - **symbol**: Stock ticker symbol (e.g., AAPL, MSFT)
     - **start_date**: Start date in YYYY-MM-DD format
     - **end_date**: End date in YYYY-MM-DD format
+    - **adjustment**: Optional. Reads the cached 15-year price store and applies
+      split/dividend adjustment at read time (`none` returns prices as traded)
     
     Returns: CSV formatted stock data with Open, High, Low, Close, Volume
     """
     try:
+        from app.core import async_yahoo
+        from app.core.y_finance import get_YFin_data, get_YFin_data_store
+        from app.core.json_utils import csv_to_table
+        
         # Validate date format
         datetime.strptime(start_date, "%Y-%m-%d")
         datetime.strptime(end_date, "%Y-%m-%d")
         
-        result = get_YFin_data_online(symbol, start_date, end_date)
+        if adjustment is not None and get_settings().vendors.stock_data != LOCAL:
+            result = await run_in_threadpool(
+                get_YFin_data_store, symbol, start_date, end_date, adjustment
+            )
+        elif async_yahoo.enabled():
+            # The async client stands in for the yfinance vendor of the chain:
+            # local files first, then Yahoo, then the fallback vendors
+            chain = get_settings().vendor_chains["get_stock_data"]
+            result = None
+            if LOCAL in chain:
+                remote = tuple(vendor for vendor in chain if vendor != LOCAL)
+                result = await run_in_threadpool(get_YFin_data, symbol, start_date, end_date, remote)
+            if result is None or "No data found" in result:
+                try:
+                    result = await async_yahoo.get_YFin_data_async(symbol, start_date, end_date)
+                except VendorUnavailableError as e:
+                    result = await run_in_threadpool(get_YFin_data, symbol, start_date, end_date, (LOCAL, "yfinance"))
+                    if "No data found" in result:
+                        raise e
+        else:
+            result = await run_in_threadpool(get_YFin_data, symbol, start_date, end_date)
         
         if "No data found" in result:
             raise HTTPException(status_code=404, detail=result)
         
-        # Convert CSV to JSON
-        data_json = csv_to_json(result)
+        # Convert CSV to a columnar table, encoded without per-row dicts
+        data_table = csv_to_table(result)
         
-        return {
+        return CompactJSONResponse({
             "symbol": symbol.upper(),
             "start_date": start_date,
             "end_date": end_date,
-            "total_records": len(data_json),
-            "data": data_json
-        }
+            "total_records": len(data_table),
+            "data": data_table
+        })
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving stock data: {str(e)}")
 
@@ -63,7 +96,14 @@ async def get_stock_info(symbol: str):
     Returns: Comprehensive stock information including company name, sector, industry, etc.
     """
     try:
-        info = YFinanceUtils.get_stock_info(symbol)
+        from app.core import async_yahoo
+        from app.services.company import INFO, get_part
+        
+        if async_yahoo.enabled():
+            info = await async_yahoo.get_info(symbol)
+        else:
+            # Shared with the company endpoints (one cached .info load per symbol)
+            info = await run_in_threadpool(get_part, symbol, INFO)
         
         if not info:
             raise HTTPException(status_code=404, detail=f"No information found for symbol '{symbol}'")
@@ -72,31 +112,111 @@ async def get_stock_info(symbol: str):
             "symbol": symbol.upper(),
             "info": info
         }
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving stock info: {str(e)}")
 
+def _validate_range(start: Optional[str], end: Optional[str]) -> None:
+    """Validate optional YYYY-MM-DD range bounds (raises ValueError)."""
+    if start:
+        datetime.strptime(start, "%Y-%m-%d")
+    if end:
+        datetime.strptime(end, "%Y-%m-%d")
+
+
+def _dated_table(series, name: str):
+    """Date/value table for a date-indexed action series."""
+    from app.models.results import DataFrameTable
+    
+    return DataFrameTable(series.astype("float64").rename(name).rename_axis("Date").to_frame())
+
+
 @router.get("/{symbol}/dividends")
-async def get_stock_dividends(symbol: str):
+async def get_stock_dividends(
+    symbol: str,
+    start: Optional[str] = Query(None, description="First ex-date in YYYY-MM-DD format (default: full history)"),
+    end: Optional[str] = Query(None, description="Last ex-date in YYYY-MM-DD format (default: latest)")
+):
     """
     Get dividend history for a stock
     
     - **symbol**: Stock ticker symbol (e.g., AAPL, MSFT)
+    - **start** / **end**: Optional inclusive ex-date range in YYYY-MM-DD format
     
-    Returns: Dividend payment history
+    Returns: Dividend payment history from the get_dividends vendor chain. The
+    yfinance vendor serves the locally persisted corporate actions table, which
+    is refreshed incrementally once per CORPORATE_ACTIONS_TTL.
     """
     try:
-        dividends = YFinanceUtils.get_stock_dividends(symbol)
+        from app.core.vendor_router import VendorMiss, get_router
+        
+        _validate_range(start, end)
         
-        if dividends.empty:
+        try:
+            dividends = await run_in_threadpool(get_router().fetch, "get_dividends", symbol, start, end)
+        except VendorMiss:
+            # No vendor of the chain has (or implements) dividends for the symbol
             raise HTTPException(status_code=404, detail=f"No dividend data found for symbol '{symbol}'")
         
-        # Convert DataFrame to JSON
-        dividends_json = dataframe_to_json(dividends)
+        if dividends.empty and not (start or end):
+            raise HTTPException(status_code=404, detail=f"No dividend data found for symbol '{symbol}'")
         
-        return {
+        dividends_table = _dated_table(dividends, "Dividends")
+        
+        return CompactJSONResponse({
             "symbol": symbol.upper(),
-            "total_dividends": len(dividends_json),
-            "dividends": dividends_json
-        }
+            "start": start,
+            "end": end,
+            "total_dividends": len(dividends_table),
+            "dividends": dividends_table
+        })
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving dividends: {str(e)}")
+
+
+@router.get("/{symbol}/splits")
+async def get_stock_splits(
+    symbol: str,
+    start: Optional[str] = Query(None, description="First date in YYYY-MM-DD format (default: full history)"),
+    end: Optional[str] = Query(None, description="Last date in YYYY-MM-DD format (default: latest)")
+):
+    """
+    Get stock split history for a stock
+    
+    - **symbol**: Stock ticker symbol (e.g., AAPL, MSFT)
+    - **start** / **end**: Optional inclusive date range in YYYY-MM-DD format
+    
+    Returns: Split ratios (new shares per old share), from the same corporate
+    actions table as dividends. An empty list means no splits in the range.
+    """
+    try:
+        from app.core import corporate_actions
+        
+        _validate_range(start, end)
+        
+        # The local vendor only reads what is already persisted
+        refresh = get_settings().vendors.dividends != LOCAL
+        splits = await run_in_threadpool(corporate_actions.get_splits, symbol, start, end, refresh)
+        
+        splits_table = _dated_table(splits, "Stock Splits")
+        
+        return CompactJSONResponse({
+            "symbol": symbol.upper(),
+            "start": start,
+            "end": end,
+            "total_splits": len(splits_table),
+            "splits": splits_table
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    except VendorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving splits: {str(e)}")
@@ -0,0 +1,114 @@
+"""
+Streaming Router
+Live quotes and indicators pushed over Server-Sent Events or a WebSocket
+"""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.core.config import get_settings
+from app.models.results import encode
+from app.services.streaming import ERROR, get_hub, parse_symbols
+
+router = APIRouter()
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@router.get("/quotes")
+async def stream_quotes(
+    symbols: str = Query(..., description="Comma-separated ticker symbols (e.g., AAPL,MSFT)")
+):
+    """
+    Stream live quotes and indicators as Server-Sent Events
+
+    - **symbols**: Comma-separated ticker symbols (e.g., AAPL,MSFT)
+
+    Each event's `event:` is `snapshot` (every field, sent on subscribe),
+    `update` (only the fields that changed) or `error`, and its `data:` a JSON
+    object with the symbol, quote fields (time, session, open, high, low,
+    price, volume) and every supported indicator (see /indicators) with the
+    current price as today's close. Upstream is polled once per symbol every
+    STREAM_POLL_INTERVAL seconds, however many clients follow it.
+    """
+    hub = get_hub()
+    subscription = hub.subscription()
+    try:
+        if not parse_symbols([symbols]):
+            raise ValueError("No symbols given")
+        subscription.subscribe([symbols])
+    except ValueError as e:
+        subscription.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        heartbeat = get_settings().stream_heartbeat_seconds
+        try:
+            while True:
+                message = await subscription.next(heartbeat)
+                if message is None:
+                    # Comment line: keeps proxies from closing an idle connection
+                    yield b": keep-alive\n\n"
+                    continue
+                yield b"event: " + message["type"].encode() + b"\ndata: " + encode(message) + b"\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.websocket("/ws")
+async def stream_websocket(websocket: WebSocket):
+    """
+    Stream live quotes and indicators over a WebSocket
+
+    Send `{"action": "subscribe" | "unsubscribe", "symbols": ["AAPL", ...]}`;
+    the server replies `{"type": "subscribed" | "unsubscribed", "symbols": [...]}`
+    and then pushes the same snapshot/update/error messages as /stream/quotes
+    (with a `type` field) as JSON text frames.
+    """
+    await websocket.accept()
+    hub = get_hub()
+    subscription = hub.subscription()
+
+    async def receive():
+        while True:
+            text = await websocket.receive_text()
+            try:
+                request = json.loads(text)
+                if not isinstance(request, dict):
+                    raise ValueError("Expected a JSON object")
+                action, symbols = request.get("action"), request.get("symbols", [])
+                if isinstance(symbols, str):
+                    symbols = [symbols]
+                if action == "subscribe":
+                    reply = {"type": "subscribed", "symbols": subscription.subscribe(symbols)}
+                elif action == "unsubscribe":
+                    reply = {"type": "unsubscribed", "symbols": subscription.unsubscribe(symbols)}
+                else:
+                    raise ValueError("Unknown action; send 'subscribe' or 'unsubscribe'")
+            except ValueError as e:
+                reply = {"type": ERROR, "error": str(e)}
+            await websocket.send_text(encode(reply).decode("utf-8"))
+
+    async def send():
+        while True:
+            message = await subscription.next(None)
+            await websocket.send_text(encode(message).decode("utf-8"))
+
+    tasks = [asyncio.ensure_future(receive()), asyncio.ensure_future(send())]
+    try:
+        # Either side ending (the client disconnecting, a bad frame) closes the stream
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                print(f"WebSocket stream closed: {type(error).__name__}: {error}")
+                await websocket.close(code=1011)
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
@@ -4,12 +4,17 @@ Endpoints for technical analysis indicators
 """
 
 from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 from datetime import datetime
 from enum import Enum
 
-from app.core.y_finance import get_stock_stats_indicators_window
-from app.core.json_utils import parse_indicator_string
+from app.models.results import IndicatorValues, CompactJSONResponse
+from app.core.vendor_gateway import VendorUnavailableError
+from app.core.memory_budget import MemoryBudgetExceededError
+
+# Data modules are imported inside the handlers to keep worker startup light
 
 router = APIRouter()
 
@@ -37,7 +42,8 @@ SUPPORTED_INDICATORS = [ind.value for ind in TechnicalIndicator]
 async def get_all_indicators(
     symbol: str = Path(..., description="Stock ticker symbol"),
     date: str = Query(..., description="Analysis date in YYYY-MM-DD format"),
-    lookback_days: int = Query(10, ge=1, le=365, description="Number of days to look back")
+    lookback_days: int = Query(10, ge=1, le=365, description="Number of days to look back"),
+    lookback_sessions: Optional[int] = Query(None, ge=1, le=260, description="Number of trading sessions to look back (replaces lookback_days; non-trading days are omitted)")
 ):
     """
     Get all technical indicators for a stock
@@ -45,37 +51,49 @@ async def get_all_indicators(
     - **symbol**: Stock ticker symbol (e.g., AAPL, MSFT)
     - **date**: Analysis date in YYYY-MM-DD format
     - **lookback_days**: Number of days to look back (1-365, default: 10)
+    - **lookback_sessions**: Number of trading sessions to look back instead (1-260); only sessions are returned
     
     Returns: All available technical indicators for the symbol
     """
     try:
+        from app.core.y_finance import get_stock_stats_indicators_window
+        from app.core.json_utils import parse_indicator_values
+        
         # Validate date format
         datetime.strptime(date, "%Y-%m-%d")
         
-        results = {}
-        errors = {}
+        def compute_all():
+            results = {}
+            errors = {}
+            for indicator in SUPPORTED_INDICATORS:
+                try:
+                    result = get_stock_stats_indicators_window(
+                        symbol, indicator, date, lookback_days, lookback_sessions
+                    )
+                    # Parse the string result into structured JSON
+                    results[indicator] = parse_indicator_values(result)
+                except MemoryBudgetExceededError:
+                    raise
+                except Exception as e:
+                    errors[indicator] = str(e)
+            return results, errors
         
-        for indicator in SUPPORTED_INDICATORS:
-            try:
-                result = get_stock_stats_indicators_window(
-                    symbol, indicator, date, lookback_days
-                )
-                # Parse the string result into structured JSON
-                parsed_result = parse_indicator_string(result)
-                results[indicator] = parsed_result
-            except Exception as e:
-                errors[indicator] = str(e)
+        # Off the event loop, so waiting for the memory budget does not block it
+        results, errors = await run_in_threadpool(compute_all)
         
-        return {
+        return CompactJSONResponse({
             "symbol": symbol.upper(),
             "date": date,
-            "lookback_days": lookback_days,
+            "lookback_days": None if lookback_sessions else lookback_days,
+            "lookback_sessions": lookback_sessions,
             "total_indicators": len(results),
             "indicators": results,
             "errors": errors if errors else None
-        }
+        })
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    except (VendorUnavailableError, MemoryBudgetExceededError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -87,7 +105,8 @@ async def get_technical_indicator(
     symbol: str = Path(..., description="Stock ticker symbol"),
     indicator: TechnicalIndicator = Path(..., description="Technical indicator name"),
     date: str = Query(..., description="Analysis date in YYYY-MM-DD format"),
-    lookback_days: int = Query(10, ge=1, le=365, description="Number of days to look back")
+    lookback_days: int = Query(10, ge=1, le=365, description="Number of days to look back"),
+    lookback_sessions: Optional[int] = Query(None, ge=1, le=260, description="Number of trading sessions to look back (replaces lookback_days; non-trading days are omitted)")
 ):
     """
     Get technical indicator values for a stock
@@ -96,6 +115,7 @@ async def get_technical_indicator(
     - **indicator**: Technical indicator name (e.g., close_50_sma, rsi, macd)
     - **date**: Analysis date in YYYY-MM-DD format
     - **lookback_days**: Number of days to look back (1-365, default: 10)
+    - **lookback_sessions**: Number of trading sessions to look back instead (1-260); only sessions are returned
     
     **Supported Indicators:**
     - close_50_sma: 50-day Simple Moving Average
@@ -115,11 +135,14 @@ async def get_technical_indicator(
     Returns: Indicator values for the specified time period with description
     """
     try:
+        from app.core.y_finance import get_stock_stats_indicators_window
+        from app.core.json_utils import parse_indicator_values
+        
         # Validate date format
         datetime.strptime(date, "%Y-%m-%d")
         
-        result = get_stock_stats_indicators_window(
-            symbol, indicator.value, date, lookback_days
+        result = await run_in_threadpool(
+            get_stock_stats_indicators_window, symbol, indicator.value, date, lookback_days, lookback_sessions
         )
         
         if not result:
@@ -129,22 +152,105 @@ async def get_technical_indicator(
             )
         
         # Parse the string result into structured JSON
-        parsed_result = parse_indicator_string(result)
+        parsed_result = parse_indicator_values(result)
         
-        return {
+        return CompactJSONResponse({
             "symbol": symbol.upper(),
             "indicator": indicator.value,
             "date": date,
-            "lookback_days": lookback_days,
-            "total_values": len(parsed_result.get("values", [])),
-            "header": parsed_result.get("header", ""),
-            "description": parsed_result.get("description", ""),
-            "values": parsed_result.get("values", [])
-        }
+            "lookback_days": None if lookback_sessions else lookback_days,
+            "lookback_sessions": lookback_sessions,
+            "total_values": len(parsed_result["values"]),
+            "header": parsed_result["header"],
+            "description": parsed_result["description"],
+            "values": parsed_result["values"]
+        })
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    except (VendorUnavailableError, MemoryBudgetExceededError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Error retrieving indicator {indicator}: {str(e)}"
         )
+
+# Rows per chunk when streaming NDJSON
+STREAM_CHUNK_SIZE = 500
+
+
+def _series_values(series):
+    """Convert an indicator series slice into compact date/value columns (NaN encodes as null)"""
+    return IndicatorValues(
+        series.index.strftime("%Y-%m-%d").tolist(),
+        series.to_numpy(dtype="float64").tolist()
+    )
+
+
+@router.get("/{symbol}/{indicator}/range")
+async def get_technical_indicator_range(
+    symbol: str = Path(..., description="Stock ticker symbol"),
+    indicator: TechnicalIndicator = Path(..., description="Technical indicator name"),
+    start: Optional[str] = Query(None, description="First date in YYYY-MM-DD format (default: start of history)"),
+    end: Optional[str] = Query(None, description="Last date in YYYY-MM-DD format (default: latest)"),
+    offset: int = Query(0, ge=0, description="Number of values to skip"),
+    limit: int = Query(2000, ge=1, le=10000, description="Maximum number of values per page"),
+    format: str = Query("json", regex="^(json|ndjson)$", description="'json' (paginated) or 'ndjson' (streams the whole range)")
+):
+    """
+    Get an indicator series over an arbitrary date range in one call
+    
+    - **symbol**: Stock ticker symbol (e.g., AAPL, MSFT)
+    - **indicator**: Technical indicator name (e.g., close_50_sma, rsi, macd)
+    - **start** / **end**: Inclusive date range in YYYY-MM-DD format; no lookback cap
+    - **offset** / **limit**: Pagination over trading days (json format)
+    - **format**: `ndjson` streams one `{"date", "value"}` object per line for the whole range
+    
+    Values are read from the cached indicator series, so a multi-year backtest
+    needs one request rather than one per simulated day. Only trading days are returned.
+    """
+    try:
+        from app.core.indicators import get_indicator_range
+        
+        # Validate date format
+        if start:
+            datetime.strptime(start, "%Y-%m-%d")
+        if end:
+            datetime.strptime(end, "%Y-%m-%d")
+        
+        series = await run_in_threadpool(
+            get_indicator_range, symbol, indicator.value, start, end
+        )
+        
+        if format == "ndjson":
+            def stream():
+                for i in range(0, len(series), STREAM_CHUNK_SIZE):
+                    chunk = _series_values(series.iloc[i:i + STREAM_CHUNK_SIZE])
+                    yield chunk.to_ndjson()
+            
+            return StreamingResponse(stream(), media_type="application/x-ndjson")
+        
+        total = len(series)
+        page = series.iloc[offset:offset + limit]
+        next_offset = offset + limit if offset + limit < total else None
+        
+        return CompactJSONResponse({
+            "symbol": symbol.upper(),
+            "indicator": indicator.value,
+            "start": page.index[0].strftime("%Y-%m-%d") if len(page) else start,
+            "end": page.index[-1].strftime("%Y-%m-%d") if len(page) else end,
+            "total_values": total,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": next_offset,
+            "values": _series_values(page)
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    except (VendorUnavailableError, MemoryBudgetExceededError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving indicator range {indicator}: {str(e)}"
+        )
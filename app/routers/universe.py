@@ -0,0 +1,70 @@
+"""
+Universe Router
+Endpoints that aggregate data across many symbols in one request
+"""
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+from datetime import datetime
+
+from app.core.config import get_settings
+from app.models.results import CompactJSONResponse
+
+# Data modules are imported inside the handlers to keep worker startup light
+
+router = APIRouter()
+
+
+class UniverseSummaryRequest(BaseModel):
+    """Symbols to summarize"""
+    symbols: List[str] = Field(..., min_length=1, description="Stock ticker symbols")
+    date: Optional[str] = Field(None, description="As-of date in YYYY-MM-DD format (default: latest)")
+    include_analyst: bool = Field(True, description="Include the analyst majority vote")
+
+
+@router.post("/summary")
+async def get_universe_summary(request: UniverseSummaryRequest):
+    """
+    Get a dashboard summary for a list of symbols in one call
+
+    - **symbols**: Stock ticker symbols (e.g., ["AAPL", "MSFT"])
+    - **date**: Optional as-of date in YYYY-MM-DD format (default: latest)
+    - **include_analyst**: Include the analyst majority vote (default: true)
+
+    Returns: One row per symbol with the latest close, 1D/5D/1M returns, RSI,
+    50/200 SMA and analyst vote. Symbols that fail have `error` set instead of
+    failing the request. `metadata.timings_ms` reports time spent per stage.
+    """
+    max_symbols = get_settings().universe_max_symbols
+    if len(request.symbols) > max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many symbols ({len(request.symbols)}); the limit is {max_symbols}"
+        )
+
+    try:
+        from app.services.universe import summarize_universe
+
+        # Validate date format
+        if request.date:
+            datetime.strptime(request.date, "%Y-%m-%d")
+
+        table, metadata = await run_in_threadpool(
+            summarize_universe, request.symbols, request.date, request.include_analyst
+        )
+
+        return CompactJSONResponse({
+            "date": request.date,
+            "total_symbols": len(table),
+            "metadata": metadata,
+            "data": table
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error building universe summary: {str(e)}"
+        )
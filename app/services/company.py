@@ -0,0 +1,186 @@
+"""
+Company snapshot
+Company info, analyst recommendations and insider transactions for a symbol,
+fetched through one gateway ticker (concurrently when several are missing)
+and cached per part. The company endpoints, /stock/{symbol}/info and the
+universe summary read from the same cache, so a symbol's `.info` is loaded
+once however many of them ask for it.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Annotated, Any, Dict, Iterable, Iterator, List, Tuple
+
+from app.core.config import get_settings
+from app.core.profiling import propagate
+from app.core.vendor_gateway import VendorUnavailableError, get_ticker
+from app.core.yfin_utils import company_fields, majority_vote
+
+INFO = "info"
+RECOMMENDATIONS = "recommendations"
+INSIDER_TRANSACTIONS = "insider_transactions"
+PARTS = (INFO, RECOMMENDATIONS, INSIDER_TRANSACTIONS)
+
+# Most recent insider transactions included in the snapshot
+SNAPSHOT_INSIDER_ROWS = 10
+
+# (symbol, part) -> (expires, value), least recently used first; failed
+# fetches are not cached
+_parts: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+_lock = threading.Lock()
+# Expired entries are dropped when read, and swept on store at most this often (seconds)
+SWEEP_INTERVAL = 60.0
+_next_sweep = 0.0
+# One fetch per symbol at a time; concurrent requests wait and reuse it.
+# symbol -> [lock, requests holding or waiting for it]; dropped when unused
+_symbol_locks: Dict[str, List[Any]] = {}
+
+
+def _ttl(part: str) -> float:
+    settings = get_settings()
+    return settings.analyst_cache_ttl if part == RECOMMENDATIONS else settings.company_cache_ttl
+
+
+def _cached(symbol: str, parts: Iterable[str]) -> Dict[str, Any]:
+    now = time.time()
+    values = {}
+    with _lock:
+        for part in parts:
+            key = (symbol, part)
+            entry = _parts.get(key)
+            if entry is None:
+                continue
+            if entry[0] <= now:
+                del _parts[key]
+                continue
+            _parts.move_to_end(key)
+            values[part] = entry[1]
+    return values
+
+
+def _store(symbol: str, part: str, value: Any, now: float) -> None:
+    global _next_sweep
+    with _lock:
+        if now >= _next_sweep:
+            for key in [key for key, (expires, _) in _parts.items() if expires <= now]:
+                del _parts[key]
+            _next_sweep = now + SWEEP_INTERVAL
+        _parts[(symbol, part)] = (now + _ttl(part), value)
+        _parts.move_to_end((symbol, part))
+        limit = get_settings().company_cache_size
+        while len(_parts) > limit:
+            _parts.popitem(last=False)
+
+
+@contextmanager
+def _symbol_lock(symbol: str) -> Iterator[None]:
+    with _lock:
+        entry = _symbol_locks.get(symbol)
+        if entry is None:
+            entry = _symbol_locks[symbol] = [threading.Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _symbol_locks[symbol]
+
+
+def load_parts(
+    symbol: Annotated[str, "ticker symbol"],
+    parts: Annotated[Iterable[str], "parts of PARTS to load"] = PARTS,
+) -> Tuple[Dict[str, Any], Dict[str, Exception]]:
+    """
+    Get parts of a symbol's company data, fetching the ones not cached.
+    Returns (values, errors), each keyed by part; a part is in one or the other.
+    """
+    symbol, parts = symbol.upper(), tuple(parts)
+    values = _cached(symbol, parts)
+    if len(values) == len(parts):
+        return values, {}
+
+    errors: Dict[str, Exception] = {}
+    with _symbol_lock(symbol):
+        # Another request may have fetched them while this one waited
+        values = _cached(symbol, parts)
+        missing = [part for part in parts if part not in values]
+        if not missing:
+            return values, {}
+
+        ticker = get_ticker(symbol)
+
+        def fetch(part: str) -> Tuple[str, Any, Exception]:
+            try:
+                return part, getattr(ticker, part), None
+            except Exception as e:
+                return part, None, e
+
+        if len(missing) == 1:
+            results = [fetch(missing[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(missing), thread_name_prefix="company") as pool:
+                results = list(pool.map(propagate(fetch), missing))
+
+        now = time.time()
+        for part, value, error in results:
+            if error is not None:
+                errors[part] = error
+                continue
+            values[part] = value
+            _store(symbol, part, value, now)
+    return values, errors
+
+
+def get_part(
+    symbol: Annotated[str, "ticker symbol"],
+    part: Annotated[str, "one of PARTS"],
+) -> Any:
+    """One part of a symbol's company data (cached); re-raises its fetch error."""
+    values, errors = load_parts(symbol, (part,))
+    if part in errors:
+        raise errors[part]
+    return values[part]
+
+
+def get_snapshot(symbol: Annotated[str, "ticker symbol"]) -> Dict[str, Any]:
+    """
+    Company info, analyst majority vote and the latest insider transactions.
+    A part that failed is None, with its error under `errors`. When every
+    part failed, raises the vendor outage if there was one, else the info error.
+    """
+    from app.core.json_utils import dataframe_to_table
+
+    symbol = symbol.upper()
+    values, errors = load_parts(symbol, PARTS)
+    if len(errors) == len(PARTS):
+        unavailable = [e for e in errors.values() if isinstance(e, VendorUnavailableError)]
+        raise unavailable[0] if unavailable else errors[INFO]
+
+    info = values.get(INFO)
+    analyst = None
+    if RECOMMENDATIONS in values:
+        recommendation, votes = majority_vote(values[RECOMMENDATIONS])
+        analyst = {"majority_recommendation": recommendation, "vote_count": int(votes)}
+    insider = values.get(INSIDER_TRANSACTIONS)
+    if insider is not None:
+        insider = dataframe_to_table(insider.head(SNAPSHOT_INSIDER_ROWS))
+
+    return {
+        "symbol": symbol,
+        "company_info": company_fields(info) if info else None,
+        "analyst_recommendations": analyst,
+        "insider_transactions": insider,
+        "info": info or None,
+        "errors": {part: f"{type(e).__name__}: {e}" for part, e in errors.items()},
+    }
+
+
+def clear() -> None:
+    """Drop all cached company data."""
+    with _lock:
+        _parts.clear()
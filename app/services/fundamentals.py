@@ -0,0 +1,88 @@
+"""
+Batch fundamentals
+Financial statements for many symbols in one request. Each symbol's table is
+loaded from the fundamentals store (refetched and persisted when older than
+fundamentals_ttl) with at most universe_max_workers symbols in flight; every
+upstream call still goes through the vendor gateway's rate limit. Results are
+yielded per symbol as they complete, with failures reported per symbol.
+"""
+import asyncio
+import time
+from typing import Annotated, Any, AsyncIterator, Dict, List, Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+
+RESULT = "result"
+SUMMARY = "summary"
+
+
+def statement_payload(table: Any, statements: Sequence[str]) -> Dict[str, Any]:
+    """The requested statements of a long table, shaped like /fundamentals/{symbol}/all."""
+    from app.core.fundamentals_store import to_statement
+    from app.core.json_utils import financial_statement_to_json
+
+    payload = {}
+    for statement in statements:
+        data = to_statement(table, statement)
+        data_json = financial_statement_to_json(data) if not data.empty else {}
+        payload[statement] = {"periods": list(data_json.keys()), "data": data_json}
+    return payload
+
+
+async def _load_symbol(
+    symbol: str,
+    statements: Sequence[str],
+    frequency: str,
+    slots: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    from app.core import fundamentals_store
+
+    result: Dict[str, Any] = {"type": RESULT, "symbol": symbol, "frequency": frequency}
+    async with slots:
+        started = time.perf_counter()
+        try:
+            table = await fundamentals_store.aload_statements(symbol, frequency)
+            if table.empty:
+                raise ValueError("No fundamentals data available")
+            result["statements"] = await run_in_threadpool(statement_payload, table, statements)
+            result["error"] = None
+        except Exception as e:
+            result["statements"] = {}
+            result["error"] = str(e) or type(e).__name__
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def batch_statements(
+    symbols: Annotated[List[str], "ticker symbols"],
+    statements: Annotated[Sequence[str], "balance_sheet, income_stmt and/or cashflow"],
+    frequency: Annotated[str, "annual or quarterly"] = "quarterly",
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield one result per symbol (duplicates loaded once) in completion order,
+    then a summary with the number of failed symbols and the wall time.
+    Closing the iterator early cancels the loads still pending.
+    """
+    started = time.perf_counter()
+    unique = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    workers = max(1, min(get_settings().universe_max_workers, len(unique)))
+    slots = asyncio.Semaphore(workers)
+    tasks = [asyncio.ensure_future(_load_symbol(symbol, statements, frequency, slots)) for symbol in unique]
+    failed = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            failed += result["error"] is not None
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+    yield {
+        "type": SUMMARY,
+        "symbols": len(unique),
+        "failed": failed,
+        "workers": workers,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,276 @@
+"""
+Live streaming
+Quotes and live indicator values pushed to subscribed clients (Server-Sent
+Events or WebSocket, see routers/streaming). Each followed symbol has one
+feed: a task that polls the get_quote vendor chain every
+stream_poll_interval seconds, however many clients follow the symbol, and
+advances the symbol's incremental indicators (seeded once from the daily
+history) in O(1) per poll. A client gets a snapshot of each symbol when it
+subscribes, then only the fields that changed.
+"""
+import asyncio
+import math
+import threading
+import time
+from typing import Annotated, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+
+SNAPSHOT = "snapshot"
+UPDATE = "update"
+ERROR = "error"
+
+QUOTE_FIELDS = ("time", "session", "open", "high", "low", "price", "volume")
+
+
+def parse_symbols(symbols: Annotated[Iterable[str], "ticker symbols (entries may be comma-separated)"]) -> List[str]:
+    """Upper-cased symbols in order, without blanks or repeats."""
+    parsed = [
+        symbol.strip().upper()
+        for entry in symbols
+        for symbol in str(entry).split(",")
+        if symbol.strip()
+    ]
+    return list(dict.fromkeys(parsed))
+
+
+def _number(value: float) -> Optional[float]:
+    return None if value is None or math.isnan(value) else value
+
+
+class Subscription:
+    """Messages for one client, from every feed it follows."""
+
+    def __init__(self, hub: "StreamHub"):
+        self.hub = hub
+        self.symbols: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.resyncs = 0
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        """
+        Queue a message. A client that falls stream_queue_size messages behind
+        has its backlog replaced by one snapshot per followed symbol.
+        """
+        if self.queue.qsize() >= get_settings().stream_queue_size:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resyncs += 1
+            for symbol in sorted(self.symbols):
+                snapshot = self.hub.feeds[symbol].snapshot()
+                if snapshot is not None:
+                    self.queue.put_nowait(snapshot)
+            return
+        self.queue.put_nowait(message)
+
+    async def next(self, timeout: Annotated[Optional[float], "seconds to wait (None: no limit)"]) -> Optional[Dict[str, Any]]:
+        """The next message, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def subscribe(self, symbols: Iterable[str]) -> List[str]:
+        return self.hub.subscribe(self, symbols)
+
+    def unsubscribe(self, symbols: Iterable[str]) -> List[str]:
+        return self.hub.unsubscribe(self, symbols)
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self, list(self.symbols))
+
+
+class SymbolFeed:
+    """One symbol's poller, live indicator state and latest values."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.subscribers: Set[Subscription] = set()
+        self.indicators = None
+        # Last session folded into the indicators, and the latest bar of the open one
+        self.committed: Optional[str] = None
+        self.pending: Optional[Tuple[str, Any]] = None
+        self.fields: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.polls = 0
+        self.errors = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=f"stream-{self.symbol}")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Full message for a new (or resynced) subscriber; None before the first poll."""
+        if self.fields:
+            return {"type": SNAPSHOT, "symbol": self.symbol, **self.fields}
+        if self.error is not None:
+            return {"type": ERROR, "symbol": self.symbol, "error": self.error}
+        return None
+
+    def _seed(self, session: str) -> None:
+        """Fold the daily history before `session` into fresh indicator state."""
+        import pandas as pd
+
+        from app.core.incremental import IndicatorState
+        from app.core.indicators import load_prices
+
+        data = load_prices(self.symbol)
+        data = data[pd.to_datetime(data["Date"]) < pd.Timestamp(session)]
+        self.indicators = IndicatorState.seed(data)
+        self.committed = pd.Timestamp(data["Date"].iloc[-1]).strftime("%Y-%m-%d") if len(data) else None
+
+    def _advance(self, quote: Dict[str, Any]) -> Dict[str, Any]:
+        """Latest fields with `quote` as the bar of its (possibly still open) session."""
+        from app.core.incremental import Bar
+
+        session = quote["session"]
+        bar = Bar(quote["open"], quote["high"], quote["low"], quote["price"], quote["volume"])
+        if self.pending is not None and session > self.pending[0]:
+            # A new session started: the previous one's last bar is final
+            self.committed = self.pending[0]
+            self.indicators.update(self.pending[1])
+            self.pending = None
+        if self.committed is None or session > self.committed:
+            self.pending = (session, bar)
+            values = {name: _number(value) for name, value in self.indicators.peek(bar).items()}
+        else:
+            # A quote for a session already in the history leaves the indicators as they are
+            values = {name: value for name, value in self.fields.items() if name not in QUOTE_FIELDS}
+        return {**{name: quote[name] for name in QUOTE_FIELDS}, **values}
+
+    def _publish(self, fields: Dict[str, Any]) -> None:
+        changed = {name: value for name, value in fields.items() if self.fields.get(name) != value}
+        first = not self.fields
+        self.fields, self.error = fields, None
+        if not changed:
+            return
+        message = {"type": SNAPSHOT if first else UPDATE, "symbol": self.symbol, **changed}
+        for subscriber in list(self.subscribers):
+            subscriber.offer(message)
+
+    def _fail(self, error: Exception) -> None:
+        self.errors += 1
+        text = f"{type(error).__name__}: {error}"
+        if text == self.error:
+            return
+        print(f"Stream poll failed for {self.symbol}: {text}")
+        self.error = text
+        message = {"type": ERROR, "symbol": self.symbol, "error": text}
+        for subscriber in list(self.subscribers):
+            subscriber.offer(message)
+
+    async def _run(self) -> None:
+        from app.core.vendor_router import get_router
+
+        while True:
+            started = time.monotonic()
+            try:
+                quote = await run_in_threadpool(get_router().fetch, "get_quote", self.symbol)
+                self.polls += 1
+                if self.indicators is None:
+                    await run_in_threadpool(self._seed, quote["session"])
+                self._publish(self._advance(quote))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._fail(e)
+            interval = get_settings().stream_poll_interval
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+class StreamHub:
+    """The feeds of this worker, created on first subscriber and stopped after the last."""
+
+    def __init__(self):
+        self.feeds: Dict[str, SymbolFeed] = {}
+        self.subscriptions: Set[Subscription] = set()
+
+    def subscription(self) -> Subscription:
+        subscription = Subscription(self)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def subscribe(
+        self,
+        subscription: Subscription,
+        symbols: Annotated[Iterable[str], "ticker symbols"],
+    ) -> List[str]:
+        """
+        Follow symbols (must be called from the event loop). Returns the newly
+        followed ones; raises ValueError past stream_max_symbols per subscription.
+        """
+        added = [symbol for symbol in parse_symbols(symbols) if symbol not in subscription.symbols]
+        limit = get_settings().stream_max_symbols
+        if len(subscription.symbols) + len(added) > limit:
+            raise ValueError(f"Too many symbols ({len(subscription.symbols) + len(added)}); the limit is {limit}")
+        for symbol in added:
+            feed = self.feeds.get(symbol)
+            if feed is None:
+                feed = self.feeds[symbol] = SymbolFeed(symbol)
+                feed.start()
+            feed.subscribers.add(subscription)
+            subscription.symbols.add(symbol)
+            snapshot = feed.snapshot()
+            if snapshot is not None:
+                subscription.offer(snapshot)
+        return added
+
+    def unsubscribe(
+        self,
+        subscription: Subscription,
+        symbols: Annotated[Iterable[str], "ticker symbols"],
+    ) -> List[str]:
+        """Stop following symbols; a feed without subscribers stops polling."""
+        removed = [symbol for symbol in parse_symbols(symbols) if symbol in subscription.symbols]
+        for symbol in removed:
+            subscription.symbols.discard(symbol)
+            feed = self.feeds.get(symbol)
+            if feed is None:
+                continue
+            feed.subscribers.discard(subscription)
+            if not feed.subscribers:
+                feed.stop()
+                del self.feeds[symbol]
+        if not subscription.symbols:
+            self.subscriptions.discard(subscription)
+        return removed
+
+    def close(self) -> None:
+        """Stop every feed (shutdown)."""
+        for feed in self.feeds.values():
+            feed.stop()
+        self.feeds.clear()
+        self.subscriptions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        feeds = list(self.feeds.values())
+        return {
+            "poll_interval_s": get_settings().stream_poll_interval,
+            "feeds": len(feeds),
+            "subscriptions": len(self.subscriptions),
+            "subscribers": sum(len(feed.subscribers) for feed in feeds),
+            "polls": sum(feed.polls for feed in feeds),
+            "errors": sum(feed.errors for feed in feeds),
+            "resyncs": sum(subscription.resyncs for subscription in self.subscriptions),
+        }
+
+
+_hub: Optional[StreamHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_hub() -> StreamHub:
+    """Get this worker's stream hub."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = StreamHub()
+    return _hub
@@ -0,0 +1,151 @@
+"""
+Universe summary
+Latest close, trailing returns, RSI, 50/200 SMA and the analyst majority vote
+for a list of symbols, computed per symbol in a bounded thread pool from the
+price store, the cached indicator series and the company snapshot cache.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.indicators import get_indicator_series, load_prices
+from app.core.profiling import propagate
+from app.core.vendor_gateway import VendorUnavailableError
+from app.core.yfin_utils import majority_vote
+from app.models.results import ColumnarTable
+from app.services.company import RECOMMENDATIONS, get_part
+
+SUMMARY_COLUMNS = (
+    "symbol",
+    "date",
+    "close",
+    "return_1d",
+    "return_5d",
+    "return_1m",
+    "rsi",
+    "sma_50",
+    "sma_200",
+    "analyst_recommendation",
+    "analyst_votes",
+    "error",
+)
+
+# Trailing returns in trading sessions
+RETURN_SESSIONS = {"return_1d": 1, "return_5d": 5, "return_1m": 21}
+
+STAGES = ("prices", "indicators", "analyst")
+
+def _analyst_vote(symbol: str) -> Tuple[Optional[str], Optional[int]]:
+    """Analyst majority vote from the company snapshot cache (`analyst_cache_ttl`)."""
+    recommendation, votes = majority_vote(get_part(symbol, RECOMMENDATIONS))
+    return recommendation, int(votes) if votes is not None else None
+
+
+def _value_at(series, as_of: Optional[str]) -> Optional[float]:
+    if as_of is not None:
+        series = series.loc[:as_of]
+    if series.empty or np.isnan(series.iloc[-1]):
+        return None
+    return float(series.iloc[-1])
+
+
+def summarize_symbol(
+    symbol: Annotated[str, "ticker symbol"],
+    as_of: Annotated[Optional[str], "Last date in yyyy-mm-dd format, None for latest"] = None,
+    include_analyst: Annotated[bool, "look up the analyst majority vote"] = True,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Summarize one symbol. Returns the row (keyed by SUMMARY_COLUMNS) and the
+    seconds spent per stage. Failures are reported in the row's `error`.
+    """
+    symbol = symbol.upper()
+    row: Dict[str, Any] = dict.fromkeys(SUMMARY_COLUMNS)
+    row["symbol"] = symbol
+    timings = dict.fromkeys(STAGES, 0.0)
+
+    try:
+        started = time.perf_counter()
+        data = load_prices(symbol)
+        if as_of is not None:
+            data = data[data["Date"] <= as_of]
+        timings["prices"] = time.perf_counter() - started
+        if data.empty:
+            raise Exception(f"No price data available for symbol '{symbol}'")
+
+        close = data["Close"].to_numpy(dtype="float64")
+        row["date"] = data["Date"].iloc[-1].strftime("%Y-%m-%d")
+        row["close"] = round(float(close[-1]), 4)
+        for column, sessions in RETURN_SESSIONS.items():
+            if len(close) > sessions:
+                row[column] = round(float(close[-1] / close[-1 - sessions] - 1), 6)
+
+        started = time.perf_counter()
+        row["rsi"] = _value_at(get_indicator_series(symbol, "rsi"), as_of)
+        row["sma_50"] = _value_at(get_indicator_series(symbol, "close_50_sma"), as_of)
+        row["sma_200"] = _value_at(get_indicator_series(symbol, "close_200_sma"), as_of)
+        timings["indicators"] = time.perf_counter() - started
+    except Exception as e:
+        row["error"] = str(e)
+        return row, timings
+
+    if include_analyst:
+        started = time.perf_counter()
+        try:
+            row["analyst_recommendation"], row["analyst_votes"] = _analyst_vote(symbol)
+        except VendorUnavailableError as e:
+            # Prices and indicators are still useful without the vote
+            row["error"] = f"Analyst recommendations unavailable: {e}"
+        except Exception as e:
+            row["error"] = f"Analyst recommendations failed: {e}"
+        timings["analyst"] = time.perf_counter() - started
+    return row, timings
+
+
+def summarize_universe(
+    symbols: Annotated[List[str], "ticker symbols"],
+    as_of: Annotated[Optional[str], "Last date in yyyy-mm-dd format, None for latest"] = None,
+    include_analyst: Annotated[bool, "look up the analyst majority vote"] = True,
+) -> Tuple[ColumnarTable, Dict[str, Any]]:
+    """
+    Summarize symbols in parallel (at most `universe_max_workers` at a time).
+
+    Returns the summary table in request order and timing metadata: wall time
+    of the parallel phase and the summed per-symbol time of each stage.
+    """
+    started = time.perf_counter()
+    # Duplicates are computed once
+    unique = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    workers = max(1, min(get_settings().universe_max_workers, len(unique)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="universe") as pool:
+        results = list(
+            pool.map(propagate(lambda symbol: summarize_symbol(symbol, as_of, include_analyst)), unique)
+        )
+    compute_ms = (time.perf_counter() - started) * 1000
+
+    assemble_started = time.perf_counter()
+    stage_ms = dict.fromkeys(STAGES, 0.0)
+    for _, timings in results:
+        for stage, seconds in timings.items():
+            stage_ms[stage] += seconds * 1000
+    table = ColumnarTable(
+        SUMMARY_COLUMNS,
+        [[row[column] for row, _ in results] for column in SUMMARY_COLUMNS],
+    )
+    assemble_ms = (time.perf_counter() - assemble_started) * 1000
+
+    metadata = {
+        "symbols": len(unique),
+        "failed": sum(1 for row, _ in results if row["close"] is None),
+        "workers": workers,
+        "timings_ms": {
+            **{f"{stage}_total": round(ms, 1) for stage, ms in stage_ms.items()},
+            "compute_wall": round(compute_ms, 1),
+            "assemble": round(assemble_ms, 1),
+            "total": round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+    return table, metadata
@@ -0,0 +1,127 @@
+"""
+Benchmark: per-row dict results vs compact columnar result models
+
+Measures peak traced allocations (tracemalloc) and wall time for serializing
+a 15-year daily price history and a large insider-transactions frame through
+the legacy dict path (dataframe_to_json / csv_to_json + jsonable_encoder +
+json.dumps, as FastAPI renders a returned dict) and the columnar path (dataframe_to_table / csv_to_table + CompactJSONResponse).
+For the insider frame it also compares encoding its columns value by value
+(ColumnarTable) with the vectorized whole-column encoder (DataFrameTable).
+
+Usage:
+    python -m benchmarks.bench_result_models [--rows N]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from app.core.json_utils import (
+    ColumnarTable,
+    CompactJSONResponse,
+    csv_to_json,
+    csv_to_table,
+    dataframe_to_json,
+    dataframe_to_table,
+)
+
+
+def make_history_csv(rows: int) -> str:
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=rows)
+    rng = np.random.default_rng(0)
+    close = 100 + rng.standard_normal(rows).cumsum()
+    data = pd.DataFrame(
+        {
+            "Open": close + rng.random(rows),
+            "High": close + 1,
+            "Low": close - 1,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 90_000_000, rows),
+        },
+        index=pd.DatetimeIndex(dates, name="Date"),
+    ).round(2)
+    return "# Stock data\n# Total records\n\n" + data.to_csv()
+
+
+def make_insider_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    shares = rng.integers(1, 1_000_000, rows)
+    value = np.where(rng.random(rows) < 0.2, np.nan, shares * 150.0)
+    return pd.DataFrame(
+        {
+            "Shares": shares,
+            "Value": value,
+            "URL": [""] * rows,
+            "Text": ["Sale at price 150.00 - 155.00 per share."] * rows,
+            "Insider": [f"INSIDER {i % 40}" for i in range(rows)],
+            "Position": ["Officer"] * rows,
+            "Transaction": [""] * rows,
+            "Start Date": pd.Timestamp("2010-01-01") + pd.to_timedelta(np.arange(rows) % 5000, unit="D"),
+            "Ownership": ["D"] * rows,
+        }
+    )
+
+
+def measure(label: str, func) -> dict:
+    # Timed apart from the traced run: tracing slows each allocation down
+    started = time.perf_counter()
+    size = len(func())
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {"case": label, "peak_mb": round(peak / 2**20, 2), "ms": round(elapsed * 1000, 1), "bytes": size}
+    print(f"{label:<32} peak={result['peak_mb']:>8.2f} MB  time={result['ms']:>8.1f} ms  body={size} B")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3780, help="history rows (default: 15 years)")
+    parser.add_argument("--insider-rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    csv_string = make_history_csv(args.rows)
+    insider = make_insider_frame(args.insider_rows)
+
+    def history_dicts():
+        data = csv_to_json(csv_string)
+        return json.dumps(jsonable_encoder({"total_records": len(data), "data": data})).encode()
+
+    def history_table():
+        data = csv_to_table(csv_string)
+        return CompactJSONResponse({"total_records": len(data), "data": data}).body
+
+    def insider_dicts():
+        data = dataframe_to_json(insider)
+        return json.dumps(jsonable_encoder({"total_transactions": len(data), "transactions": data})).encode()
+
+    def insider_values():
+        frame = insider.reset_index()
+        data = ColumnarTable(
+            frame.columns,
+            [
+                frame[col].astype(str).tolist() if pd.api.types.is_datetime64_any_dtype(frame[col]) else frame[col].tolist()
+                for col in frame.columns
+            ],
+        )
+        return CompactJSONResponse({"total_transactions": len(data), "transactions": data}).body
+
+    def insider_table():
+        data = dataframe_to_table(insider)
+        return CompactJSONResponse({"total_transactions": len(data), "transactions": data}).body
+
+    measure("history: per-row dicts", history_dicts)
+    measure("history: columnar table", history_table)
+    measure("insider: per-row dicts", insider_dicts)
+    measure("insider: per-value columns", insider_values)
+    measure("insider: vectorized frame", insider_table)
+
+
+if __name__ == "__main__":
+    main()
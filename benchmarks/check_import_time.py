@@ -0,0 +1,71 @@
+"""
+Import-time budget for the API entry point.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+fails if any deferred data dependency is imported at startup, or if the
+fastest run's cumulative import time exceeds the budget.
+
+    python -m benchmarks.check_import_time [--budget-ms 600] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only be imported by handlers (or the background preload)
+DEFERRED = ("pandas", "numpy", "yfinance", "stockstats", "dateutil", "httpx")
+
+
+def profile(module: str = "app.main"):
+    """Return ({module: cumulative_us}, total_us) for importing `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+        # Top-level imports (no indentation) add up to the total
+        if not name.startswith("  "):
+            total += int(cumulative_us)
+    return cumulative, total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=600.0)
+    parser.add_argument("--runs", type=int, default=5, help="best of N runs is compared to the budget")
+    args = parser.parse_args()
+
+    # Import timings are noisy; the fastest run is the least disturbed one
+    cumulative, total_us = min((profile() for _ in range(args.runs)), key=lambda run: run[1])
+    loaded = [name for name in DEFERRED if name in cumulative]
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:10]
+
+    print(f"import app.main: {total_us / 1000:.1f} ms, best of {args.runs} (budget {args.budget_ms:.0f} ms)")
+    for name, us in slowest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if total_us / 1000 > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
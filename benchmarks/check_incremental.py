@@ -0,0 +1,99 @@
+"""
+Equivalence check: incremental indicator state vs the stockstats batch computation.
+
+Computes every supported indicator over synthetic daily histories (plus
+edge cases: flat prices, zero volume) both ways and fails if any value
+differs, or if an indicator has no incremental implementation. Values must
+be identical (NaN matching NaN) unless a tolerance is given with --rtol.
+It also checks that `peek` matches `update` and leaves the state unchanged,
+and that a state seeded from a prefix continues the full-history series.
+
+    python -m benchmarks.check_incremental [--rtol 0] [--symbols AAPL,MSFT,SPY]
+"""
+import argparse
+import copy
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from stockstats import wrap
+
+from app.core.incremental import Bar, BAR_COLUMNS, IndicatorState
+from app.core.indicators import SUPPORTED_INDICATORS
+from app.core.stub_vendor import synthetic_bars
+
+
+def batch(data: pd.DataFrame) -> dict:
+    frame = wrap(data.copy())
+    return {name: frame[name].to_numpy(dtype="float64") for name in SUPPORTED_INDICATORS}
+
+
+def mismatches(name: str, expected: np.ndarray, actual: np.ndarray, rtol: float) -> int:
+    close = np.isclose(actual, expected, rtol=rtol, atol=rtol, equal_nan=True)
+    if close.all():
+        return 0
+    first = int(np.argmin(close))
+    print(f"  {name}: {int((~close).sum())} of {len(close)} differ (first at {first}: {actual[first]!r} != {expected[first]!r})")
+    return int((~close).sum())
+
+
+def check(label: str, data: pd.DataFrame, rtol: float) -> int:
+    expected = batch(data)
+    started = time.perf_counter()
+    state = IndicatorState()
+    actual = state.extend(data)
+    elapsed = time.perf_counter() - started
+    failed = 0
+    for name in SUPPORTED_INDICATORS:
+        if name not in actual:
+            print(f"  {name}: no incremental implementation")
+            failed += 1
+            continue
+        failed += mismatches(name, expected[name], np.asarray(actual[name]), rtol)
+
+    # A state seeded from all but the last bars continues the series, and
+    # peeking at the next bar neither changes the state nor disagrees with update
+    split = max(len(data) - 5, 1)
+    seeded = IndicatorState.seed(data.iloc[:split])
+    for row in data.iloc[split:][list(BAR_COLUMNS)].itertuples(index=False):
+        bar = Bar(*map(float, row))
+        before = copy.deepcopy(seeded)
+        peeked = seeded.peek(bar)
+        if peeked != before.update(bar):
+            print("  peek disagrees with update")
+            failed += 1
+        seeded.update(bar)
+    tail = {name: values[-1] for name, values in actual.items()}
+    if not all(np.isclose(peeked[name], tail[name], rtol=0, equal_nan=True) for name in tail):
+        print("  seeded state diverges from the full history")
+        failed += 1
+
+    per_bar = elapsed / len(data) * 1e6
+    print(f"{label}: {len(data)} bars, {per_bar:.1f} us/bar, {'FAIL' if failed else 'OK'}")
+    return failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rtol", type=float, default=0.0, help="relative (and absolute) tolerance; 0 requires exact equality")
+    parser.add_argument("--symbols", default="AAPL,MSFT,SPY,NVDA")
+    args = parser.parse_args()
+
+    failed = 0
+    for symbol in args.symbols.split(","):
+        data = synthetic_bars(symbol.strip().upper()).reset_index()
+        failed += check(symbol, data, args.rtol)
+
+    base = synthetic_bars("FLAT").reset_index().iloc[:300]
+    flat = base.assign(Open=50.0, High=50.0, Low=50.0, Close=50.0)
+    failed += check("flat prices", flat, args.rtol)
+    failed += check("zero volume", base.assign(Volume=0.0), args.rtol)
+    failed += check("short history", base.iloc[:3], args.rtol)
+
+    print("FAIL" if failed else "OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
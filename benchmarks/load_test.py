@@ -0,0 +1,340 @@
+"""
+Load-test scenarios replaying the n8n workflow request shapes.
+
+Request templates come from `n8n-http-request-nodes.json`. Each scenario
+fires bursts of parallel per-symbol requests (one per node in the scenario,
+for every symbol), like an n8n fan-out, at a fixed burst rate against the
+app in-process. Upstream calls go to the stub vendor (benchmarks/stub_vendor.py)
+and data is cached in a temporary directory.
+
+Reports throughput, latency percentiles, error rate, response-cache hit
+ratio and upstream calls per scenario. With --baseline, exits 1 when a scenario regresses beyond
+the thresholds relative to the stored results; --update-baseline rewrites it.
+Baselines are host-specific: regenerate them on the machine that compares.
+
+    python -m benchmarks.load_test [--scenario all] [--symbols 5] [--bursts 3]
+        [--rate 1] [--concurrency 64] [--vendor-latency-ms 50]
+        [--baseline benchmarks/load_baseline.json] [--update-baseline]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NODES_FILE = os.path.join(ROOT, "n8n-http-request-nodes.json")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "load_baseline.json")
+
+SYMBOLS = (
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AVGO", "JPM", "V",
+    "WMT", "XOM", "UNH", "MA", "PG", "JNJ", "HD", "COST", "ORCL", "BAC",
+)
+
+# n8n node names per scenario; "Get Single Indicator" expands to every indicator
+SCENARIOS = {
+    "stock": ("Get Stock History", "Get Stock Info", "Get Dividends"),
+    "indicators": ("Get Single Indicator", "Get All Indicators"),
+    "fundamentals": ("Get Balance Sheet", "Get Income Statement", "Get Cash Flow", "Get All Fundamentals"),
+    "company": ("Get Company Info", "Get Insider Transactions", "Get Analyst Recommendations"),
+    "mixed": None,  # every per-symbol node
+}
+
+# Allowed change relative to the baseline before a scenario fails
+THRESHOLDS = {
+    "p95_ms": 0.5,           # 50% slower at p95
+    "throughput_rps": 0.3,   # 30% lower throughput
+    "error_rate": 0.01,      # one point more errors (absolute)
+    "cache_hit_ratio": 0.1,  # ten points fewer cache hits (absolute)
+    "upstream_requests": 0.5,  # 50% more upstream calls (a cache stampede)
+}
+
+_EXPRESSION = re.compile(r"\{\{\s*\$json\.(\w+)(?:\s*\|\|\s*'?([^'}]*?)'?)?\s*\}\}")
+
+
+class Template:
+    """One n8n HTTP Request node: method, path and query with $json placeholders."""
+
+    def __init__(self, node: dict, base_url: str):
+        parameters = node["parameters"]
+        self.name = node["name"]
+        self.method = parameters.get("method", "GET")
+        self.path = parameters["url"][len(base_url):] or "/"
+        self.query = [
+            (param["name"], param["value"].lstrip("="))
+            for param in parameters.get("queryParameters", {}).get("parameters", [])
+        ]
+
+    @property
+    def per_symbol(self) -> bool:
+        return "$json.symbol" in self.path
+
+    @staticmethod
+    def _fill(text: str, values: Dict[str, str]) -> str:
+        def replace(match):
+            value = values.get(match.group(1))
+            return str(value if value is not None else match.group(2) or "")
+        return _EXPRESSION.sub(replace, text)
+
+    def render(self, values: Dict[str, str]) -> Tuple[str, str]:
+        from urllib.parse import urlencode
+
+        query = [(name, self._fill(value, values)) for name, value in self.query]
+        return self._fill(self.path, values), urlencode([(k, v) for k, v in query if v != ""])
+
+
+def load_templates(path: str = NODES_FILE) -> Dict[str, Template]:
+    with open(path) as f:
+        workflow = json.load(f)
+    base_url = workflow["metadata"]["api_base_url"]
+    return {node["name"]: Template(node, base_url) for node in workflow["nodes"]}
+
+
+def build_burst(templates: Dict[str, Template], scenario: str, symbols: List[str], indicators: List[str]) -> List[Tuple[str, str, str]]:
+    """(node name, path, query) for every request of one burst."""
+    names = SCENARIOS[scenario] or [name for name, t in templates.items() if t.per_symbol]
+    today = date.today()
+    last_session = today - timedelta(days=1)
+    while last_session.weekday() >= 5:
+        last_session -= timedelta(days=1)
+    values = {
+        "start_date": (today - timedelta(days=182)).isoformat(),
+        "end_date": today.isoformat(),
+        "date": last_session.isoformat(),
+    }
+
+    requests = []
+    for symbol in symbols:
+        for name in names:
+            template = templates[name]
+            for indicator in indicators if name == "Get Single Indicator" else [None]:
+                path, query = template.render({**values, "symbol": symbol, "indicator": indicator})
+                requests.append((name, path, query))
+    return requests
+
+
+async def asgi_request(app, method: str, path: str, query: str) -> Tuple[int, Dict[str, str], int]:
+    """Call the ASGI app directly; returns (status, headers, body size)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"loadtest")], "client": ("127.0.0.1", 0), "server": ("loadtest", 80),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()  # no disconnect until the response is done
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    start: dict = {}
+    size = 0
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in start.get("headers", [])}
+    return start.get("status", 0), headers, size
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(app, requests: List[Tuple[str, str, str]], bursts: int, rate: float, concurrency: int) -> dict:
+    """Open-loop: burst i starts at i / rate seconds whether or not earlier ones finished."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    cache = {"HIT": 0, "MISS": 0}
+    per_node: Dict[str, List[float]] = {}
+
+    async def one(name: str, path: str, query: str):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status, headers, _ = await asgi_request(app, "GET", path, query)
+            except Exception as e:
+                print(f"  {path}?{query}: {e}")
+                status, headers = 599, {}
+            elapsed = (time.perf_counter() - started) * 1000
+        latencies.append(elapsed)
+        per_node.setdefault(name, []).append(elapsed)
+        statuses[status] = statuses.get(status, 0) + 1
+        if headers.get("x-cache") in cache:
+            cache[headers["x-cache"]] += 1
+
+    async def burst(index: int):
+        await asyncio.sleep(index / rate)
+        await asyncio.gather(*(one(*request) for request in requests))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(burst(i) for i in range(bursts)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    lookups = cache["HIT"] + cache["MISS"]
+    return {
+        "requests": len(latencies),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p90_ms": round(percentile(latencies, 90), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(latencies[-1], 1),
+        "error_rate": round(errors / len(latencies), 4),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "cache_hit_ratio": round(cache["HIT"] / lookups, 4) if lookups else None,
+        "slowest_node_p95_ms": max(
+            ((name, round(percentile(sorted(values), 95), 1)) for name, values in per_node.items()),
+            key=lambda item: item[1],
+        ),
+    }
+
+
+def reset_state(data_dir: str) -> None:
+    """Fresh cache directories and empty in-memory caches, so scenarios start cold."""
+    from app.core.config import set_config
+    from app.core.response_cache import get_response_cache
+
+    shutil.rmtree(data_dir, ignore_errors=True)
+    os.makedirs(data_dir)
+    set_config({
+        "data_cache_dir": data_dir,
+        "data_dir": data_dir,
+        "shared_memory_dir": os.path.join(data_dir, "shm"),
+    })
+    get_response_cache().clear()
+    for module, caches in (("app.core.indicators", ("_series", "_failures")), ("app.services.company", ("_parts",))):
+        loaded = sys.modules.get(module)
+        for name in caches if loaded is not None else ():
+            getattr(loaded, name).clear()
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict]) -> List[str]:
+    """Regressions beyond THRESHOLDS, one message each."""
+    failures = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + THRESHOLDS["p95_ms"]):
+            failures.append(f"{scenario}: p95 {result['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - THRESHOLDS["throughput_rps"]):
+            failures.append(f"{scenario}: throughput {result['throughput_rps']} req/s vs baseline {base['throughput_rps']} req/s")
+        if result["error_rate"] > base["error_rate"] + THRESHOLDS["error_rate"]:
+            failures.append(f"{scenario}: error rate {result['error_rate']:.2%} vs baseline {base['error_rate']:.2%}")
+        if (
+            base.get("cache_hit_ratio") is not None
+            and (result["cache_hit_ratio"] or 0) < base["cache_hit_ratio"] - THRESHOLDS["cache_hit_ratio"]
+        ):
+            failures.append(f"{scenario}: cache hit ratio {result['cache_hit_ratio']} vs baseline {base['cache_hit_ratio']}")
+        if (
+            base.get("upstream_requests") is not None
+            and result["upstream_requests"] > base["upstream_requests"] * (1 + THRESHOLDS["upstream_requests"])
+        ):
+            failures.append(f"{scenario}: {result['upstream_requests']} upstream calls vs baseline {base['upstream_requests']}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", default="all", choices=["all", *SCENARIOS])
+    parser.add_argument("--symbols", type=int, default=5, help=f"symbols per burst (max {len(SYMBOLS)})")
+    parser.add_argument("--bursts", type=int, default=3, help="bursts per scenario")
+    parser.add_argument("--rate", type=float, default=1.0, help="bursts per second")
+    parser.add_argument("--concurrency", type=int, default=64, help="requests in flight at most")
+    parser.add_argument("--vendor-latency-ms", type=float, default=50.0, help="simulated upstream latency")
+    parser.add_argument("--vendor-rate", type=float, default=1000.0, help="gateway rate limit (requests/s)")
+    parser.add_argument("--baseline", default=None, help=f"compare against this file (e.g. {os.path.relpath(DEFAULT_BASELINE, ROOT)})")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    args = parser.parse_args()
+
+    from app.core.config import get_config, set_config
+
+    # Stub upstream, no local files, no async client
+    data_vendors = dict(get_config()["data_vendors"], core_stock_apis="yfinance", technical_indicators="yfinance")
+    set_config({"data_vendors": data_vendors, "async_http_client": False, "preload_imports": False})
+
+    from app.main import app
+    from benchmarks.stub_vendor import install
+
+    gateway = install(latency_ms=args.vendor_latency_ms, rate_limit=args.vendor_rate)
+    templates = load_templates()
+    indicators = json.load(open(NODES_FILE))["metadata"]["supported_indicators"]
+    symbols = list(SYMBOLS[: args.symbols])
+    scenarios = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+
+    data_dir = tempfile.mkdtemp(prefix="market_data_load_")
+    results = {}
+    try:
+        for scenario in scenarios:
+            reset_state(data_dir)
+            requests = build_burst(templates, scenario, symbols, indicators)
+            upstream_before = gateway.stats()["upstream_requests"]
+            print(f"{scenario}: {args.bursts} bursts x {len(requests)} requests at {args.rate:g} bursts/s")
+            result = asyncio.run(run_scenario(app, requests, args.bursts, args.rate, args.concurrency))
+            result["upstream_requests"] = gateway.stats()["upstream_requests"] - upstream_before
+            results[scenario] = result
+            print(
+                f"  {result['throughput_rps']:>8.1f} req/s  p50={result['p50_ms']:.1f}  p95={result['p95_ms']:.1f}"
+                f"  p99={result['p99_ms']:.1f} ms  errors={result['error_rate']:.2%}"
+                f"  cache hits={result['cache_hit_ratio']}  upstream={result['upstream_requests']}"
+            )
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "settings": {k: v for k, v in vars(args).items() if k not in ("baseline", "update_baseline", "output")},
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        differing = {
+            name: value for name, value in baseline.get("settings", {}).items()
+            if name != "scenario" and report["settings"].get(name) != value
+        }
+        if differing:
+            print(f"WARNING: settings differ from the baseline's: {differing}")
+        failures = compare(results, baseline["scenarios"])
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            return 1
+        print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Run the API against the stub vendor, for the endpoint tests.
+
+Every data category is routed to the `stub` vendor (as with
+CORE_STOCK_VENDOR=stub, TECHNICAL_INDICATORS_VENDOR=stub and
+FUNDAMENTAL_DATA_VENDOR=stub) and the vendor gateway serves synthetic tickers,
+so company data and quotes never reach Yahoo either. Cached files go to a
+scratch directory instead of data_cache/.
+
+    python -m benchmarks.stub_server [--port 8000] [--vendor-latency-ms 0]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--vendor-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    from app.core.config import get_config, set_config
+
+    data_dir = tempfile.mkdtemp(prefix="market-data-stub-")
+    data_vendors = dict(
+        get_config()["data_vendors"], core_stock_apis="stub", technical_indicators="stub", fundamental_data="stub"
+    )
+    set_config({
+        "data_dir": data_dir,
+        "data_cache_dir": os.path.join(data_dir, "cache"),
+        "shared_memory_dir": os.path.join(data_dir, "shm"),
+        "data_vendors": data_vendors,
+        "async_http_client": False,
+    })
+
+    import uvicorn
+
+    from app.main import app
+    from benchmarks.stub_vendor import install
+
+    install(latency_ms=args.vendor_latency_ms)
+    try:
+        uvicorn.run(app, host=args.host, port=args.port)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Stub upstream vendor for benchmarks and load tests.
+
+`StubGateway` is a VendorGateway whose tickers and downloads return the
+deterministic synthetic data of app.core.stub_vendor after a configurable
+latency, instead of calling Yahoo Finance. Calls still go through the
+gateway's rate limit, concurrency cap, retries and circuit breaker.
+
+    from benchmarks.stub_vendor import install
+    install(latency_ms=50)
+"""
+import time
+
+import pandas as pd
+
+from app.core import vendor_gateway
+from app.core.stub_vendor import StubTicker, stub_download
+from app.core.vendor_gateway import GatewayTicker, VendorGateway
+
+
+class StubGatewayTicker(GatewayTicker):
+    def __init__(self, symbol: str, gateway: VendorGateway):
+        self.ticker = symbol.upper()
+        self._gateway = gateway
+        self._yf_ticker = StubTicker(self.ticker)
+
+
+class StubGateway(VendorGateway):
+    """VendorGateway serving synthetic data after `latency` seconds per upstream call."""
+
+    def __init__(self, latency: float = 0.05, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+
+    def call(self, key, func, *args, **kwargs):
+        def delayed(*call_args, **call_kwargs):
+            time.sleep(self.latency)
+            return func(*call_args, **call_kwargs)
+
+        return super().call(key, delayed, *args, **kwargs)
+
+    def ticker(self, symbol: str) -> GatewayTicker:
+        return StubGatewayTicker(symbol, self)
+
+    def download(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self.call(None, stub_download, symbol, **kwargs)
+
+
+def install(latency_ms: float = 50.0, rate_limit: float = 1000.0, max_concurrency: int = 64) -> StubGateway:
+    """Replace the process-wide vendor gateway with a StubGateway."""
+    gateway = StubGateway(
+        latency=latency_ms / 1000,
+        rate_limit=rate_limit,
+        burst=max(1, int(rate_limit)),
+        max_concurrency=max_concurrency,
+    )
+    vendor_gateway._gateway = gateway
+    return gateway
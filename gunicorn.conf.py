@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for multi-worker serving:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Runs WEB_CONCURRENCY uvicorn workers (default: one per CPU, at most
+MAX_DEFAULT_WORKERS; the vendor gateway splits its limits between them). With
+PRELOAD_APP (default true) the app and its data modules are imported once in
+the master before the workers are forked, so workers start warm and share
+those pages copy-on-write. Workers coordinate on data_cache_dir through
+app.core.shared_cache, and one of them runs the background cache refresh.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+MAX_DEFAULT_WORKERS = 4
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), MAX_DEFAULT_WORKERS)))
+# The app reads the worker count to share the vendor rate limit and concurrency cap
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD_APP", "true").lower() == "true"
+# Indicator requests can hold a worker for a while on cold symbols
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers are forked."""
+    if preload_app:
+        from app.core import startup
+
+        startup.preload()
@@ -1,17 +1,35 @@
 """
-Run API server and execute tests
+Run the offline checks, then the API server against the stub vendor and execute tests
 """
+import os
 import subprocess
 import time
 import sys
 import requests
 
-# Start the API server
-print("Starting API server...")
+# Checks that need no server; each exits non-zero on a regression
+CHECKS = [
+    ("Import-time budget", [sys.executable, "-m", "benchmarks.check_import_time"]),
+    ("Incremental indicators", [sys.executable, "-m", "benchmarks.check_incremental"]),
+    ("Async Yahoo client", [sys.executable, "test_async_yahoo.py"]),
+]
+
+failed = []
+for name, command in CHECKS:
+    print(f"Running check: {name}...")
+    if subprocess.run(command).returncode == 0:
+        print(f"✓ {name}\n")
+    else:
+        print(f"✗ {name}\n")
+        failed.append(name)
+
+# Start the API server with every data category routed to the stub vendor
+# (CORE_STOCK_VENDOR=stub etc.), so the tests do not depend on Yahoo Finance
+print("Starting API server (stub vendor)...")
 server_process = subprocess.Popen(
-    [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8000"],
-    stdout=subprocess.PIPE,
-    stderr=subprocess.PIPE
+    [sys.executable, "-m", "benchmarks.stub_server", "--host", "0.0.0.0", "--port", "8000"],
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.DEVNULL
 )
 
 # Wait for server to start
@@ -28,9 +46,19 @@ except:
 
 # Run the test script
 print("Running tests...\n")
-test_process = subprocess.run([sys.executable, "test_all_apis.py"])
+# Synthetic results go next to, not over, the recorded Yahoo Finance ones
+test_process = subprocess.run(
+    [sys.executable, "test_all_apis.py"],
+    env=dict(os.environ, TEST_RESULTS_DIR=os.path.join("test_results", "stub"))
+)
+if test_process.returncode != 0:
+    failed.append("API tests")
 
 # Cleanup
 print("\nShutting down API server...")
-server_process.kill()
+server_process.terminate()
+server_process.wait(timeout=10)
+if failed:
+    print(f"Failed: {', '.join(failed)}")
+    sys.exit(1)
 print("Done!")
@@ -1,18 +1,22 @@
 """
 Comprehensive API Testing Script
-Tests all Market Data API endpoints and saves results to JSON files
+Tests all Market Data API endpoints and saves results to JSON files.
+Exits 1 if any endpoint fails. run_tests.py runs it against the stub vendor
+(benchmarks/stub_server.py), so it needs no access to Yahoo Finance.
 """
 
 import requests
 import json
 from datetime import datetime, timedelta
 import os
+import sys
 import time
 
 # Configuration
-BASE_URL = "http://localhost:8000"
+BASE_URL = os.getenv("TEST_BASE_URL", "http://localhost:8000")
 SYMBOL = "AAPL"  # Test symbol
-OUTPUT_DIR = "test_results"
+UNIVERSE = ["AAPL", "MSFT", "NVDA"]  # Symbols for the multi-symbol endpoints
+OUTPUT_DIR = os.getenv("TEST_RESULTS_DIR", "test_results")
 
 # Create output directory
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -38,6 +42,83 @@ def test_endpoint(name, url, params=None):
         print(f"✗ Error: {name} - {str(e)}")
         return {"success": False, "error": str(e), "status_code": getattr(e.response, 'status_code', None)}
 
+def test_post_endpoint(name, url, body):
+    """Test a POST endpoint with a JSON body and return the response"""
+    try:
+        print(f"\nTesting: {name}")
+        print(f"URL: {url}")
+        response = requests.post(url, json=body, timeout=60)
+        response.raise_for_status()
+        data = response.json()
+        print(f"✓ Success: {name}")
+        return {"success": True, "data": data, "status_code": response.status_code}
+    except requests.exceptions.RequestException as e:
+        print(f"✗ Error: {name} - {str(e)}")
+        return {"success": False, "error": str(e), "status_code": getattr(e.response, 'status_code', None)}
+
+def test_ndjson_endpoint(name, url, body):
+    """Test a POST endpoint streaming NDJSON; the last line must be the summary"""
+    try:
+        print(f"\nTesting: {name}")
+        print(f"URL: {url}")
+        response = requests.post(url, json=body, timeout=60)
+        response.raise_for_status()
+        lines = [json.loads(line) for line in response.text.splitlines() if line]
+        if not lines or lines[-1].get("type") != "summary":
+            raise ValueError("stream did not end with a summary line")
+        if lines[-1]["failed"]:
+            raise ValueError(f"{lines[-1]['failed']} symbol(s) failed")
+        print(f"✓ Success: {name}")
+        return {"success": True, "data": lines, "status_code": response.status_code}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"✗ Error: {name} - {str(e)}")
+        return {"success": False, "error": str(e), "status_code": getattr(getattr(e, "response", None), 'status_code', None)}
+
+def test_sse_endpoint(name, url, params=None):
+    """Read the first Server-Sent Event of a stream; it must be a snapshot"""
+    try:
+        print(f"\nTesting: {name}")
+        print(f"URL: {url}")
+        with requests.get(url, params=params, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            event = {}
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event["event"] = line[len("event: "):]
+                elif line.startswith("data: "):
+                    event["data"] = json.loads(line[len("data: "):])
+                elif not line and "data" in event:
+                    break
+        if event.get("event") != "snapshot":
+            raise ValueError(f"expected a snapshot event, got {event.get('event')!r}")
+        print(f"✓ Success: {name}")
+        return {"success": True, "data": event, "status_code": response.status_code}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"✗ Error: {name} - {str(e)}")
+        return {"success": False, "error": str(e), "status_code": getattr(getattr(e, "response", None), 'status_code', None)}
+
+def test_websocket_endpoint(name, url, symbols):
+    """Subscribe over a WebSocket and read the confirmation and first snapshot"""
+    print(f"\nTesting: {name}")
+    print(f"URL: {url}")
+    try:
+        from websockets.sync.client import connect
+    except ImportError:
+        print(f"✗ Error: {name} - requires the websockets package (pip install websockets)")
+        return {"success": False, "error": "websockets is not installed", "status_code": None}
+    try:
+        with connect(url, open_timeout=10) as websocket:
+            websocket.send(json.dumps({"action": "subscribe", "symbols": symbols}))
+            # The first snapshot may arrive before the confirmation
+            messages = [json.loads(websocket.recv(timeout=30)) for _ in range(2)]
+        if sorted(message.get("type") for message in messages) != ["snapshot", "subscribed"]:
+            raise ValueError(f"unexpected messages: {[message.get('type') for message in messages]}")
+        print(f"✓ Success: {name}")
+        return {"success": True, "data": messages, "status_code": 101}
+    except Exception as e:
+        print(f"✗ Error: {name} - {str(e)}")
+        return {"success": False, "error": str(e), "status_code": None}
+
 def main():
     print("=" * 70)
     print("Market Data API - Comprehensive Test Suite")
@@ -57,7 +138,7 @@ def main():
         print(f"Please start the API server first:")
         print(f"  cd {os.path.dirname(os.path.abspath(__file__))}")
         print(f"  uvicorn app.main:app --reload")
-        return
+        return 1
     
     # Calculate dates for testing
     end_date = datetime.now().strftime("%Y-%m-%d")
@@ -124,6 +205,15 @@ def main():
     save_json(result, "indicators_list.json")
     all_results["endpoints"]["indicators_list"] = result
     
+    # Indicator over a date range (one page of the cached series)
+    result = test_endpoint(
+        "Technical Indicator Range: rsi",
+        f"{BASE_URL}/api/v1/indicators/{SYMBOL}/rsi/range",
+        params={"start": start_date, "end": end_date}
+    )
+    save_json(result, "technical_indicator_range.json")
+    all_results["endpoints"]["technical_indicator_range"] = result
+    
     # =================================================================
     # 2. STOCK DATA
     # =================================================================
@@ -156,6 +246,14 @@ def main():
     save_json(result, "stock_dividends.json")
     all_results["endpoints"]["stock_dividends"] = result
     
+    # Splits
+    result = test_endpoint(
+        "Stock Splits",
+        f"{BASE_URL}/api/v1/stock/{SYMBOL}/splits"
+    )
+    save_json(result, "stock_splits.json")
+    all_results["endpoints"]["stock_splits"] = result
+    
     # =================================================================
     # 3. FUNDAMENTALS
     # =================================================================
@@ -235,6 +333,24 @@ def main():
     save_json(result, "fundamentals_all_annual.json")
     all_results["endpoints"]["fundamentals_all_annual"] = result
     
+    # Line items and ratios across companies
+    result = test_post_endpoint(
+        "Fundamentals Query",
+        f"{BASE_URL}/api/v1/fundamentals/query",
+        {"symbols": UNIVERSE, "line_items": ["TotalRevenue", "NetIncome"], "ratios": ["net_margin"], "periods": 4}
+    )
+    save_json(result, "fundamentals_query.json")
+    all_results["endpoints"]["fundamentals_query"] = result
+    
+    # Statements for many symbols, streamed as NDJSON
+    result = test_ndjson_endpoint(
+        "Fundamentals Batch",
+        f"{BASE_URL}/api/v1/fundamentals/batch",
+        {"symbols": UNIVERSE, "statements": ["balance_sheet", "income_stmt"], "frequency": "annual"}
+    )
+    save_json(result, "fundamentals_batch.json")
+    all_results["endpoints"]["fundamentals_batch"] = result
+    
     # =================================================================
     # 4. COMPANY INFO
     # =================================================================
@@ -266,6 +382,52 @@ def main():
     save_json(result, "analyst_recommendations.json")
     all_results["endpoints"]["analyst_recommendations"] = result
     
+    # Company Snapshot
+    result = test_endpoint(
+        "Company Snapshot",
+        f"{BASE_URL}/api/v1/company/{SYMBOL}/snapshot"
+    )
+    save_json(result, "company_snapshot.json")
+    all_results["endpoints"]["company_snapshot"] = result
+    
+    # =================================================================
+    # 5. UNIVERSE
+    # =================================================================
+    print("\n" + "=" * 70)
+    print("5. TESTING UNIVERSE")
+    print("=" * 70)
+    
+    result = test_post_endpoint(
+        "Universe Summary",
+        f"{BASE_URL}/api/v1/universe/summary",
+        {"symbols": UNIVERSE}
+    )
+    save_json(result, "universe_summary.json")
+    all_results["endpoints"]["universe_summary"] = result
+    
+    # =================================================================
+    # 6. STREAMING
+    # =================================================================
+    print("\n" + "=" * 70)
+    print("6. TESTING STREAMING")
+    print("=" * 70)
+    
+    result = test_sse_endpoint(
+        "Quote Stream (SSE)",
+        f"{BASE_URL}/api/v1/stream/quotes",
+        params={"symbols": SYMBOL}
+    )
+    save_json(result, "stream_quotes.json")
+    all_results["endpoints"]["stream_quotes"] = result
+    
+    result = test_websocket_endpoint(
+        "Quote Stream (WebSocket)",
+        BASE_URL.replace("http", "ws", 1) + "/api/v1/stream/ws",
+        [SYMBOL]
+    )
+    save_json(result, "stream_websocket.json")
+    all_results["endpoints"]["stream_websocket"] = result
+    
     # =================================================================
     # SAVE COMPLETE RESULTS
     # =================================================================
@@ -285,7 +447,8 @@ def main():
     if "technical_indicators_individual" in all_results["endpoints"]:
         ind_results = all_results["endpoints"]["technical_indicators_individual"]
         total_tests += len(ind_results) - 1  # Subtract 1 because we already counted it
-        successful_tests += len([v for v in ind_results.values() if v.get("success")]) - 1
+        # The group itself has no "success" key, so it was not counted as successful
+        successful_tests += len([v for v in ind_results.values() if v.get("success")])
     
     print(f"Total Tests: {total_tests}")
     print(f"Successful: {successful_tests}")
@@ -293,6 +456,7 @@ def main():
     print(f"Success Rate: {(successful_tests/total_tests*100):.1f}%")
     print(f"\nAll results saved to: {OUTPUT_DIR}/")
     print("=" * 70)
+    return 0 if successful_tests == total_tests else 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Async Yahoo client test
+Serves canned chart, quoteSummary and fundamentals timeseries payloads from a
+local HTTP server, points yahoo_base_url / yahoo_cookie_url at it and checks
+that async_yahoo.get_history, get_info and get_statement parse them.
+Exits 1 on a failure.
+"""
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from app.core.config import set_config
+
+SYMBOL = "AAPL"
+CRUMB = "test-crumb"
+DAYS = [1704205800, 1704292200, 1704378600]  # 2024-01-02 .. 2024-01-04 14:30 UTC
+
+CHART = {
+    "chart": {
+        "result": [{
+            "meta": {"symbol": SYMBOL},
+            "timestamp": DAYS,
+            "indicators": {
+                "quote": [{
+                    "open": [100.0, 102.0, 104.0],
+                    "high": [101.0, 103.0, 105.0],
+                    "low": [99.0, 101.0, 103.0],
+                    "close": [100.0, 102.0, None],
+                    "volume": [1000, 2000, None],
+                }],
+                "adjclose": [{"adjclose": [50.0, 51.0, None]}],
+            },
+            "events": {
+                "dividends": {str(DAYS[1]): {"date": DAYS[1], "amount": 0.24}},
+                "splits": {str(DAYS[0]): {"date": DAYS[0], "numerator": 2, "denominator": 1}},
+            },
+        }],
+        "error": None,
+    }
+}
+
+QUOTE_SUMMARY = {
+    "quoteSummary": {
+        "result": [{
+            "quoteType": {"symbol": SYMBOL, "longName": "Apple\xa0Inc."},
+            "financialData": {"currentPrice": {"raw": 189.5, "fmt": "189.50"}, "targetMeanPrice": None},
+            "summaryDetail": {"dividendYield": {"raw": 0.005, "fmt": "0.50%"}},
+        }],
+        "error": None,
+    }
+}
+
+TIMESERIES = {
+    "timeseries": {
+        "result": [
+            {
+                "meta": {"symbol": [SYMBOL], "type": ["quarterlyTotalAssets"]},
+                "timestamp": [1703980800, 1711843200],
+                "quarterlyTotalAssets": [
+                    {"asOfDate": "2023-12-31", "reportedValue": {"raw": 353514000000.0}},
+                    {"asOfDate": "2024-03-31", "reportedValue": {"raw": 337411000000.0}},
+                ],
+            },
+            {
+                "meta": {"symbol": [SYMBOL], "type": ["quarterlyTotalDebt"]},
+                "timestamp": [1711843200],
+                "quarterlyTotalDebt": [
+                    None,
+                    {"asOfDate": "2024-03-31", "reportedValue": {"raw": 104590000000.0}},
+                ],
+            },
+            {"meta": {"symbol": [SYMBOL], "type": ["quarterlyNetDebt"]}},
+        ],
+        "error": None,
+    }
+}
+
+
+class YahooHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if self.path == "/cookie":
+            self.send_header("Set-Cookie", "A3=session; Path=/")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.requests.append((url.path, params))
+        if url.path == "/cookie":
+            self._send(200, "", "text/plain")
+        elif url.path == "/v1/test/getcrumb":
+            self._send(200, CRUMB, "text/plain")
+        elif url.path == f"/v8/finance/chart/{SYMBOL}":
+            self._send(200, CHART)
+        elif url.path == f"/v10/finance/quoteSummary/{SYMBOL}":
+            if params.get("crumb") != CRUMB:
+                self._send(401, {"finance": {"error": "Invalid Crumb"}})
+            else:
+                self._send(200, QUOTE_SUMMARY)
+        elif url.path == f"/ws/fundamentals-timeseries/v1/finance/timeseries/{SYMBOL}":
+            self._send(200, TIMESERIES)
+        else:
+            self._send(404, {"chart": {"result": None, "error": {"code": "Not Found"}}})
+
+
+failures = []
+
+
+def check(name, condition):
+    print(f"{'✓' if condition else '✗'} {name}")
+    if not condition:
+        failures.append(name)
+
+
+async def run_checks():
+    from app.core import async_yahoo
+
+    try:
+        history = await async_yahoo.get_history(SYMBOL, "2024-01-01", "2024-01-05")
+        check("history: rows with a close price", [str(d.date()) for d in history.index] == ["2024-01-02", "2024-01-03"])
+        check("history: OHLC adjusted by adjclose/close", list(history["Close"]) == [50.0, 51.0] and history["Open"].iloc[1] == 51.0)
+        check("history: integer volume", str(history["Volume"].dtype) == "int64" and list(history["Volume"]) == [1000, 2000])
+        check("history: dividend and split events", list(history["Dividends"]) == [0.0, 0.24] and list(history["Stock Splits"]) == [2.0, 0.0])
+        chart_params = next(params for path, params in YahooHandler.requests if path.startswith("/v8/"))
+        check("history: daily interval over the requested range", chart_params["interval"] == "1d" and chart_params["period1"] == "1704067200")
+
+        info = await async_yahoo.get_info(SYMBOL)
+        check("info: modules flattened with raw values", info.get("currentPrice") == 189.5 and info.get("dividendYield") == 0.005)
+        check("info: empty values dropped, non-breaking spaces replaced", "targetMeanPrice" not in info and info.get("longName") == "Apple Inc.")
+        check("info: crumb fetched once after the cookie", [path for path, _ in YahooHandler.requests].count("/v1/test/getcrumb") == 1)
+
+        statement = await async_yahoo.get_statement(SYMBOL, "balance_sheet", "quarterly")
+        check("statement: line items in yfinance order", list(statement.index) == ["TotalDebt", "TotalAssets"])
+        check("statement: periods newest first", [str(d.date()) for d in statement.columns] == ["2024-03-31", "2023-12-31"])
+        check("statement: reported values", statement.loc["TotalAssets", statement.columns[0]] == 337411000000.0)
+        series_params = next(params for path, params in YahooHandler.requests if path.startswith("/ws/"))
+        check("statement: quarterly types requested", series_params["type"].split(",")[0].startswith("quarterly"))
+
+        unknown = await async_yahoo.get_history("NOSUCH", "2024-01-01", "2024-01-05")
+        check("unknown symbol: empty frame", unknown.empty)
+    finally:
+        await async_yahoo.close_clients()
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), YahooHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    set_config({
+        "async_http_client": True,
+        "yahoo_base_url": base_url,
+        "yahoo_cookie_url": base_url + "/cookie",
+    })
+    try:
+        asyncio.run(run_checks())
+    finally:
+        server.shutdown()
+    print("FAIL" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())